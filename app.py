@@ -1,15 +1,35 @@
+import asyncio
 import os
-from typing import Optional
+import sqlite3
+import time
+from functools import lru_cache
+from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-import requests
-from news_source import list_sources, list_sources_full, get_search_url
+import anyio
+import httpx
+from http_client import get_client, close_client
+from response_cache import ResponseCache, cache_key
+from shared_cache import SharedCacheBackend
+from singleflight import SingleFlight
+from article_store import ArticleIngestor, ArticleStore
+from enrichment import EnrichmentPipeline
+from static_assets import AssetManifest, render_page
+from serialization import PrecomputedJSON, dumps, json_response, parse_fields, project_article, project_articles
+from dedupe import dedupe_response
+from metrics import REGISTRY, UPSTREAM_LATENCY, Counter, Gauge, MetricsMiddleware
+from quota import BACKGROUND, INTERACTIVE, QuotaExhausted, UpstreamScheduler
+from resilience import BudgetExceeded, CircuitBreaker, LatencyTracker, UpstreamUnavailable, breaker_status, hedged
+from live_feed import LiveFeedHub
+from prefetch import HeadlinePrefetcher, NEWSAPI_CATEGORIES, build_schedule
+from news_source import SUGGEST_LIMIT, get_catalog, list_sources_full, get_search_url, get_search_urls
 
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+# Comma-separated pool of keys; falls back to the single NEWSAPI_KEY
+NEWSAPI_KEYS = [k.strip() for k in os.getenv("NEWSAPI_KEYS", NEWSAPI_KEY or "").split(",") if k.strip()]
 
 app = FastAPI(title="Global News Proxy")
 
@@ -20,30 +40,330 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# outermost, so timings include CORS handling
+app.add_middleware(MetricsMiddleware)
 
 templates = Jinja2Templates(directory="templates")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Static files are read, fingerprinted and compressed once; the index page is rendered once
+STATIC_ASSETS = AssetManifest("static")
+INDEX_PAGE = render_page(templates, "index.html", STATIC_ASSETS)
 
-NEWSAPI_BASE = "https://newsapi.org/v2"
+# Point at a stand-in (e.g. bench/fake_newsapi.py) for offline benchmarking
+NEWSAPI_BASE = os.getenv("NEWSAPI_BASE", "https://newsapi.org/v2").rstrip("/")
 
+# Per-key rate limit (requests/s, burst) and daily budget (0 = unlimited)
+upstream_scheduler = UpstreamScheduler(
+    NEWSAPI_KEYS,
+    rate=float(os.getenv("NEWSAPI_RATE", "5")),
+    burst=float(os.getenv("NEWSAPI_BURST", "10")),
+    daily_budget=int(os.getenv("NEWSAPI_DAILY_BUDGET", "0")),
+    background_reserve=float(os.getenv("NEWSAPI_BACKGROUND_RESERVE", "0.2")),
+)
+
+# Upstream resilience: per-path circuit breakers, hedged interactive calls, and the longest a
+# request waits for NewsAPI before it is answered from stale cache (or with a 504)
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("BREAKER_RESET", "30"))
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "1") in ("1", "true", "True")
+HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", "1.0"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.2"))
+HEDGE_MAX_DELAY = float(os.getenv("HEDGE_MAX_DELAY", "3.0"))
+LATENCY_BUDGETS = {
+    "top-headlines": float(os.getenv("TOP_LATENCY_BUDGET", "3")),
+    "everything": float(os.getenv("SEARCH_LATENCY_BUDGET", "5")),
+}
+UPSTREAM_BREAKERS = {path: CircuitBreaker(path, BREAKER_FAILURES, BREAKER_RESET) for path in LATENCY_BUDGETS}
+UPSTREAM_TRACKERS = {path: LatencyTracker() for path in LATENCY_BUDGETS}
+HEDGE_COUNTS = {"fired": 0, "won": 0, "skipped": 0}
+
+# Per-endpoint response caches (TTL and stale-while-revalidate window in seconds)
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "1024"))
+CACHE_STALE_TTL = float(os.getenv("CACHE_STALE_TTL", "300"))
+# Set to a SQLite file path to share the response caches between uvicorn workers on one host
+SHARED_CACHE_FILE = os.getenv("SHARED_CACHE_FILE", "")
+
+
+def cache_backend(namespace: str):
+    if not SHARED_CACHE_FILE:
+        return None
+    return SharedCacheBackend(SHARED_CACHE_FILE, namespace, CACHE_MAXSIZE)
+
+
+RESPONSE_CACHES = {
+    path: ResponseCache(CACHE_MAXSIZE, ttl, CACHE_STALE_TTL, backend=cache_backend(path))
+    for path, ttl in (
+        ("top-headlines", float(os.getenv("TOP_CACHE_TTL", "60"))),
+        ("everything", float(os.getenv("SEARCH_CACHE_TTL", "300"))),
+    )
+}
+# Identical in-flight upstream requests share one call
+UPSTREAM_FLIGHTS = SingleFlight()
+
+# The source catalog never changes at runtime: it is loaded on first use and its full
+# dump is serialized, hashed and compressed once
+SOURCES_MAX_AGE = int(os.getenv("SOURCES_MAX_AGE", "3600"))
+SOURCES_CACHE_CONTROL = f"public, max-age={SOURCES_MAX_AGE}"
+SOURCES_PAGE_SIZE = int(os.getenv("SOURCES_PAGE_SIZE", "100"))
+SOURCES_MAX_PAGE_SIZE = 500
+# /api/source-search/batch: most URLs one response may carry, and the longest query accepted
+SOURCE_SEARCH_BATCH_MAX = int(os.getenv("SOURCE_SEARCH_BATCH_MAX", "500"))
+SOURCE_SEARCH_MAX_QUERY = 500
+
+# /api/multi-search fan-out: sub-queries per request, upstream calls in flight, and the time budget
+MULTI_SEARCH_MAX_QUERIES = int(os.getenv("MULTI_SEARCH_MAX_QUERIES", "64"))
+MULTI_SEARCH_CONCURRENCY = int(os.getenv("MULTI_SEARCH_CONCURRENCY", "40"))
+MULTI_SEARCH_DEADLINE = float(os.getenv("MULTI_SEARCH_DEADLINE", "8"))
+MULTI_SEARCH_MAX_RESULTS = int(os.getenv("MULTI_SEARCH_MAX_RESULTS", "500"))
+
+# Multi-page /api/search streaming
+SEARCH_PAGE_SIZE = 50
+SEARCH_MAX_PAGES = int(os.getenv("SEARCH_MAX_PAGES", "20"))
+SEARCH_PAGE_FANOUT = int(os.getenv("SEARCH_PAGE_FANOUT", "4"))
+
+# Background headline prefetch (opt-in: every query costs NewsAPI quota on each run)
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "0") in ("1", "true", "True")
+PREFETCH_COUNTRIES = [c for c in os.getenv("PREFETCH_COUNTRIES", "us,gb,de,fr,jp").split(",") if c]
+PREFETCH_CATEGORIES = [c for c in os.getenv("PREFETCH_CATEGORIES", ",".join(NEWSAPI_CATEGORIES)).split(",") if c]
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", "300"))
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", "0.1"))
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "4"))
+
+# Local article store: upstream responses are ingested for /api/local-search
+ARTICLE_STORE_ENABLED = os.getenv("ARTICLE_STORE_ENABLED", "1") in ("1", "true", "True")
+ARTICLE_DB_FILE = os.getenv("ARTICLE_DB_FILE", "articles.db")
+ARTICLE_INGEST_BATCH = int(os.getenv("ARTICLE_INGEST_BATCH", "500"))
+article_store: Optional[ArticleStore] = None
+article_ingestor: Optional[ArticleIngestor] = None
+
+# Article enrichment (language, keywords, entities), read with `enrich=true` (opt-in: it
+# starts ENRICH_WORKERS extra interpreters in every server worker process)
+ENRICH_ENABLED = os.getenv("ENRICH_ENABLED", "0") in ("1", "true", "True")
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "2"))
+ENRICH_BATCH = int(os.getenv("ENRICH_BATCH", "64"))
+ENRICH_MAX_PENDING = int(os.getenv("ENRICH_MAX_PENDING", "2000"))
+ENRICH_CACHE_SIZE = int(os.getenv("ENRICH_CACHE_SIZE", "20000"))
+ENRICH_CORPUS_SIZE = int(os.getenv("ENRICH_CORPUS_SIZE", "5000"))
+article_enricher: Optional[EnrichmentPipeline] = None
+
+
+# /api/stream/top: one poller per (country, category), shared by all connected clients
+LIVE_FEED_INTERVAL = float(os.getenv("LIVE_FEED_INTERVAL", os.getenv("TOP_CACHE_TTL", "60")))
+LIVE_FEED_QUEUE_SIZE = int(os.getenv("LIVE_FEED_QUEUE_SIZE", "32"))
+LIVE_FEED_HEARTBEAT = float(os.getenv("LIVE_FEED_HEARTBEAT", "15"))
+live_feeds = LiveFeedHub(LIVE_FEED_INTERVAL, LIVE_FEED_QUEUE_SIZE, LIVE_FEED_HEARTBEAT)
+
+
+@app.on_event("startup")
+async def startup():
+    # create the pooled upstream client once per worker process
+    get_client()
+    global article_store, article_ingestor, article_enricher
+    if ARTICLE_STORE_ENABLED:
+        article_store = ArticleStore(ARTICLE_DB_FILE)
+        article_ingestor = ArticleIngestor(article_store, batch_size=ARTICLE_INGEST_BATCH)
+        article_ingestor.start()
+    if ENRICH_ENABLED:
+        article_enricher = EnrichmentPipeline(
+            workers=ENRICH_WORKERS,
+            batch_size=ENRICH_BATCH,
+            max_pending=ENRICH_MAX_PENDING,
+            cache_size=ENRICH_CACHE_SIZE,
+            corpus_size=ENRICH_CORPUS_SIZE,
+        )
+        article_enricher.start()
+    if PREFETCH_ENABLED and upstream_scheduler:
+        prefetcher.start()
 
-def newsapi_get(path: str, params: dict):
-    if not NEWSAPI_KEY:
+
+@app.on_event("shutdown")
+async def shutdown():
+    await prefetcher.stop()
+    await live_feeds.stop()
+    if article_ingestor is not None:
+        await article_ingestor.stop()
+    if article_enricher is not None:
+        await article_enricher.stop()
+    await close_client()
+
+
+async def upstream_call(path: str, params: dict, key_state):
+    """Make one NewsAPI request with `key_state`; returns `(key_state, response)`."""
+    headers = {"X-Api-Key": key_state.key}
+    started = time.perf_counter()
+    try:
+        resp = await get_client().get(f"{NEWSAPI_BASE}/{path}", params=params, headers=headers)
+    except httpx.TimeoutException as e:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, path, "timeout")
+        raise UpstreamUnavailable(f"Upstream timeout: {e!r}", status_code=504)
+    except httpx.HTTPError as e:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, path, "error")
+        raise UpstreamUnavailable(f"Upstream error: {e!r}", status_code=502)
+    elapsed = time.perf_counter() - started
+    UPSTREAM_LATENCY.observe(elapsed, path, str(resp.status_code))
+    if resp.status_code == 200:
+        UPSTREAM_TRACKERS[path].observe(elapsed)
+    return key_state, resp
+
+
+async def hedged_upstream_call(path: str, params: dict, key_state):
+    """upstream_call, plus a duplicate request if the first is slower than the path's recent p95.
+
+    The duplicate only runs when a spare token is available right now (at background
+    priority, so hedges never eat into the interactive reserve); the slower call is cancelled.
+    """
+    def hedge():
+        spare = upstream_scheduler.try_acquire(BACKGROUND)
+        if spare is None:
+            HEDGE_COUNTS["skipped"] += 1
+            return None
+        HEDGE_COUNTS["fired"] += 1
+        return lambda: upstream_call(path, params, spare)
+
+    def hedge_won():
+        HEDGE_COUNTS["won"] += 1
+
+    delay = UPSTREAM_TRACKERS[path].hedge_delay(HEDGE_DELAY, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY)
+    return await hedged(lambda: upstream_call(path, params, key_state), delay, hedge, hedge_won)
+
+
+def retry_after_seconds(resp) -> Optional[float]:
+    """Return a numeric Retry-After header in seconds, or None if absent or not a number."""
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+async def newsapi_get(path: str, params: dict, priority: str = INTERACTIVE):
+    """Call NewsAPI with a key from the scheduler, rotating to another key on an upstream 429.
+
+    A 429 puts the key in a short, growing cooldown; `apiKeyExhausted` retires it for the day.
+
+    Raises QuotaExhausted when no key is available within the priority's wait limit,
+    CircuitOpen while the path's breaker is open, and UpstreamUnavailable for timeouts,
+    transport errors and 5xx responses (which count against the breaker).
+    """
+    if not upstream_scheduler:
         raise RuntimeError("NEWSAPI_KEY is not set. Obtain a key from https://newsapi.org/")
-    headers = {"X-Api-Key": NEWSAPI_KEY}
-    resp = requests.get(f"{NEWSAPI_BASE}/{path}", params=params, headers=headers, timeout=10)
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail=resp.text)
-    return resp.json()
+    breaker = UPSTREAM_BREAKERS[path]
+    probe = breaker.check()
+    try:
+        for _attempt in range(len(upstream_scheduler.keys)):
+            key_state = await upstream_scheduler.acquire(priority)
+            try:
+                if HEDGE_ENABLED and priority == INTERACTIVE:
+                    key_state, resp = await hedged_upstream_call(path, params, key_state)
+                else:
+                    key_state, resp = await upstream_call(path, params, key_state)
+            except UpstreamUnavailable:
+                breaker.record_failure()
+                raise
+            exhausted = resp.status_code in (401, 429) and "apiKeyExhausted" in resp.text
+            if resp.status_code == 429 or exhausted:
+                upstream_scheduler.report_rate_limited(key_state, exhausted, retry_after_seconds(resp))
+                continue
+            if resp.status_code >= 500:
+                breaker.record_failure()
+                raise UpstreamUnavailable(resp.text, status_code=resp.status_code)
+            breaker.record_success()
+            upstream_scheduler.report_success(key_state)
+            if resp.status_code != 200:
+                raise HTTPException(status_code=resp.status_code, detail=resp.text)
+            return resp.json()
+        retry_after = min(s.cooldown(time.monotonic()) for s in upstream_scheduler.keys)
+        raise QuotaExhausted("All NewsAPI keys are rate limited upstream", retry_after or None)
+    finally:
+        if probe:
+            breaker.release()
 
 
-@app.get("/", response_class=HTMLResponse)
-def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+async def fetch_and_ingest(path: str, params: dict, priority: str = INTERACTIVE):
+    """Call NewsAPI and queue the returned articles for the local store and enrichment."""
+    data = await newsapi_get(path, params, priority)
+    if article_ingestor is not None:
+        article_ingestor.submit(data.get("articles"))
+    if article_enricher is not None:
+        article_enricher.submit(data.get("articles"))
+    return data
 
 
-@app.get("/api/top")
-def top_headlines(country: Optional[str] = None, category: Optional[str] = None, q: Optional[str] = None, sources: Optional[str] = None):
+async def cached_newsapi_get(path: str, params: dict):
+    """Return `(data, cache_state, age_seconds)` for a NewsAPI call, served from cache when possible.
+
+    Background refreshes of stale entries run at BACKGROUND priority. A miss waits at most
+    the path's LATENCY_BUDGETS seconds; a slower upstream call keeps running and fills the
+    cache for later requests. When the quota is exhausted, the circuit is open, the budget
+    runs out or the upstream fails, an expired entry is served instead; with nothing cached
+    the caller gets a 429 (quota) or the upstream error status.
+    """
+    cache = RESPONSE_CACHES[path]
+    key = cache_key(path, params)
+    budget = LATENCY_BUDGETS[path]
+
+    def fetch(priority: str):
+        return UPSTREAM_FLIGHTS.do((key, priority), lambda: fetch_and_ingest(path, params, priority))
+
+    async def fetch_within_budget():
+        flight = asyncio.ensure_future(fetch(INTERACTIVE))
+        try:
+            done, _ = await asyncio.wait({flight}, timeout=budget)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        if done:
+            return flight.result()
+        flight.add_done_callback(lambda task: store_late_result(cache, key, task))
+        raise BudgetExceeded(f"NewsAPI did not answer within {budget:g}s", retry_after=budget)
+
+    try:
+        return await cache.get_or_fetch(
+            key,
+            fetch_within_budget,
+            refresh=lambda: fetch(BACKGROUND),
+            stale_if_error=(QuotaExhausted, UpstreamUnavailable),
+        )
+    except QuotaExhausted as e:
+        headers = {"Retry-After": str(int(e.retry_after or 1) + 1)}
+        raise HTTPException(status_code=429, detail=str(e), headers=headers)
+    except UpstreamUnavailable as e:
+        headers = {"Retry-After": str(int(e.retry_after) + 1)} if e.retry_after else None
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=headers)
+
+
+def store_late_result(cache: ResponseCache, key, task: asyncio.Future):
+    """Cache an upstream result that arrived after its request had already been answered."""
+    if not task.cancelled() and task.exception() is None:
+        cache.set_soon(key, task.result())
+
+
+def shape_articles(data, fields=None, dedupe: bool = False, enrich: bool = False):
+    """Apply the optional `enrich=true` metadata, `dedupe=true` clustering and `fields=` projection."""
+    if enrich:
+        if article_enricher is None:
+            raise HTTPException(status_code=400, detail="Article enrichment is disabled on this server")
+        data = article_enricher.enrich_response(data)
+    if dedupe:
+        data = dedupe_response(data)
+    return project_articles(data, fields)
+
+
+def cached_json_response(request: Request, path: str, data, cache_state: str, age: float, fields=None, dedupe: bool = False, enrich: bool = False):
+    """Build a cached article response with Age/X-Cache, an ETag and a max-age of the remaining TTL."""
+    max_age = max(0, int(RESPONSE_CACHES[path].ttl - age))
+    # enrichment fills in after the upstream response is cached, so don't let it be reused as-is
+    cache_control = "no-cache" if enrich else f"public, max-age={max_age}"
+    headers = {"Age": str(int(age)), "X-Cache": cache_state, "Cache-Control": cache_control}
+    return json_response(request, shape_articles(data, fields, dedupe, enrich), headers=headers, etag=True)
+
+
+def fields_or_400(fields: Optional[str]):
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def top_headlines_params(country: Optional[str] = None, category: Optional[str] = None, q: Optional[str] = None, sources: Optional[str] = None) -> dict:
     params = {}
     if country:
         params["country"] = country
@@ -57,36 +377,495 @@ def top_headlines(country: Optional[str] = None, category: Optional[str] = None,
     if not params:
         params["country"] = "us"
     params["pageSize"] = 50
+    return params
+
+
+async def refresh_top_headlines(filters: dict):
+    """Fetch top headlines for `filters` and store them in the response cache (used by the prefetcher)."""
+    params = top_headlines_params(**filters)
+    key = cache_key("top-headlines", params)
+    cache = RESPONSE_CACHES["top-headlines"]
+    token = None
+    if cache.backend.shared:
+        # every worker runs a prefetcher; skip keys another worker refreshed recently or is refreshing now
+        entry, _ = await cache.lookup_async(key)
+        if entry is not None and entry.age() < cache.ttl / 2:
+            return
+        token = await cache.try_lock(key)
+        if token is None:
+            return
     try:
-        data = newsapi_get("top-headlines", params)
+        data = await UPSTREAM_FLIGHTS.do((key, BACKGROUND), lambda: fetch_and_ingest("top-headlines", params, BACKGROUND))
+        await cache.set_async(key, data)
+    finally:
+        await cache.unlock(key, token)
+
+
+def _cache_counts():
+    counts = {}
+    for path, cache in RESPONSE_CACHES.items():
+        counts[(path, "hit")] = cache.hits
+        counts[(path, "stale")] = cache.stale_hits
+        counts[(path, "miss")] = cache.misses
+    return counts
+
+
+def _threadpool_usage():
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {("busy",): limiter.borrowed_tokens, ("total",): limiter.total_tokens}
+
+
+def _enrichment_counts():
+    if article_enricher is None:
+        return {}
+    e = article_enricher
+    return {("enriched",): e.enriched, ("dropped",): e.dropped, ("failed",): e.failed}
+
+
+def _quota_remaining():
+    return {(k["key"],): k["remaining_today"] for k in upstream_scheduler.status() if k["remaining_today"] is not None}
+
+
+REGISTRY.register(Counter("response_cache_lookups_total", "Response cache lookups by endpoint and result.", ("path", "result"), collect=_cache_counts))
+# approx_len: the shared backend would otherwise run a blocking COUNT(*) on the event loop per scrape
+REGISTRY.register(Gauge("response_cache_entries", "Entries held per response cache (approximate for the shared cache).", ("path",), collect=lambda: {(p,): c.approx_len() for p, c in RESPONSE_CACHES.items()}))
+REGISTRY.register(Counter("upstream_singleflight_total", "Upstream flights started and callers merged into them.", ("kind",), collect=lambda: {("flights",): UPSTREAM_FLIGHTS.flights, ("merged",): UPSTREAM_FLIGHTS.merged}))
+REGISTRY.register(Gauge("threadpool_tokens", "Starlette/anyio worker threads in use and available.", ("state",), collect=_threadpool_usage))
+REGISTRY.register(Gauge("live_feed_subscribers", "Connected /api/stream/top clients per topic.", ("topic",), collect=lambda: {("/".join(filter(None, t)),): n for t, n in live_feeds.subscriber_counts().items()}))
+REGISTRY.register(Counter("live_feed_dropped_total", "Slow /api/stream/top clients disconnected because their queue was full.", (), collect=lambda: {(): live_feeds.dropped_total()}))
+REGISTRY.register(Gauge("upstream_circuit_open", "1 while the circuit breaker for an upstream path is open or probing.", ("path",), collect=lambda: {(p,): int(b.state != "closed") for p, b in UPSTREAM_BREAKERS.items()}))
+REGISTRY.register(Counter("upstream_hedges_total", "Hedged upstream requests fired, won by the hedge, or skipped for lack of quota.", ("result",), collect=lambda: {(k,): v for k, v in HEDGE_COUNTS.items()}))
+REGISTRY.register(Counter("article_enrichment_total", "Articles enriched, dropped because the queue was full, or failed.", ("result",), collect=_enrichment_counts))
+REGISTRY.register(Gauge("article_enrichment_pending", "Articles queued or being analyzed for enrichment.", (), collect=lambda: {(): article_enricher.pending()} if article_enricher is not None else {}))
+REGISTRY.register(Gauge("newsapi_quota_remaining", "Remaining daily NewsAPI budget per key.", ("key",), collect=_quota_remaining))
+
+
+prefetcher = HeadlinePrefetcher(
+    build_schedule(PREFETCH_COUNTRIES, PREFETCH_CATEGORIES),
+    refresh_top_headlines,
+    interval=PREFETCH_INTERVAL,
+    jitter=PREFETCH_JITTER,
+    concurrency=PREFETCH_CONCURRENCY,
+)
+
+
+@app.get("/", response_class=HTMLResponse)
+async def index(request: Request):
+    return INDEX_PAGE.response(request)
+
+
+@app.api_route("/static/{name:path}", methods=["GET", "HEAD"])
+async def static_asset(request: Request, name: str):
+    """Serve a static file; fingerprinted URLs (see AssetManifest) are cached as immutable."""
+    asset, cache_control = STATIC_ASSETS.lookup(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return asset.response(request, cache_control)
+
+
+@app.get("/api/top")
+async def top_headlines(
+    request: Request,
+    country: Optional[str] = None,
+    category: Optional[str] = None,
+    q: Optional[str] = None,
+    sources: Optional[str] = None,
+    fields: Optional[str] = None,
+    dedupe: bool = False,
+    enrich: bool = False,
+):
+    """Proxy NewsAPI `top-headlines`.
+
+    `fields=title,url,...` trims each article to those keys; `dedupe=true` collapses
+    near-duplicate stories into one representative with a `duplicates` list. `enrich=true`
+    adds each article's `enrichment` (language, keywords, entities), or null while it is
+    still being computed.
+    """
+    projection = fields_or_400(fields)
+    params = top_headlines_params(country, category, q, sources)
+    try:
+        data, cache_state, age = await cached_newsapi_get("top-headlines", params)
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return JSONResponse(content=data)
+    return cached_json_response(request, "top-headlines", data, cache_state, age, projection, dedupe, enrich)
+
+
+@app.get("/api/stream/top")
+async def stream_top_headlines(country: str = "us", category: Optional[str] = None):
+    """Server-sent events with live top headlines for one country/category.
+
+    The first event (`snapshot`) carries the current headlines; each later `articles`
+    event carries only articles not sent before. Clients that fall LIVE_FEED_QUEUE_SIZE
+    events behind receive a `dropped` event and are disconnected.
+    """
+    country = country.strip().lower()
+    if len(country) != 2 or not country.isalpha():
+        raise HTTPException(status_code=400, detail="`country` must be a two-letter code")
+    if category is not None and category not in NEWSAPI_CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"`category` must be one of: {', '.join(NEWSAPI_CATEGORIES)}")
+    if not upstream_scheduler:
+        raise HTTPException(status_code=500, detail="NEWSAPI_KEY is not set. Obtain a key from https://newsapi.org/")
+    params = top_headlines_params(country, category)
+
+    async def fetch():
+        data, _state, _age = await cached_newsapi_get("top-headlines", params)
+        return data
+
+    feed = live_feeds.feed((country, category), fetch)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(live_feeds.stream(feed), media_type="text/event-stream", headers=headers)
+
+
+async def fetch_search_page(params: dict, n: int) -> dict:
+    data, _state, _age = await cached_newsapi_get("everything", {**params, "page": n})
+    return data
+
+
+async def stream_search_pages(params: dict, first: dict, pages: int, limit: Optional[int], fields=None):
+    """Yield NDJSON lines (one article each) for pages 1..`pages` of an `everything` search.
+
+    `first` is page 1, fetched by the caller before the response starts so that an
+    immediate upstream error still gets a real status code. At most SEARCH_PAGE_FANOUT
+    later pages are in flight at once and articles are written as soon as their page
+    arrives, so memory stays bounded regardless of `pages`. Pages past `totalResults` are
+    never requested. An upstream error on a later page, after the 200 has been sent, is
+    written as an `{"error": ...}` line and stops further pages from being requested.
+    """
+    pending = set()
+    next_page = 2
+    last_page = pages
+    sent = 0
+
+    def refill():
+        nonlocal next_page
+        while next_page <= last_page and len(pending) < SEARCH_PAGE_FANOUT:
+            pending.add(asyncio.ensure_future(fetch_search_page(params, next_page)))
+            next_page += 1
+
+    def emit(data: dict):
+        nonlocal last_page, sent
+        total = data.get("totalResults")
+        if isinstance(total, int):
+            last_page = min(last_page, -(-total // SEARCH_PAGE_SIZE))
+        for article in data.get("articles") or []:
+            if limit is not None and sent >= limit:
+                return
+            yield dumps(project_article(article, fields)) + b"\n"
+            sent += 1
+
+    for line in emit(first):
+        yield line
+    refill()
+    try:
+        while pending and (limit is None or sent < limit):
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                try:
+                    data = task.result()
+                except HTTPException as e:
+                    last_page = 0
+                    yield dumps({"error": {"status": e.status_code, "detail": e.detail}}) + b"\n"
+                    continue
+                except RuntimeError as e:
+                    last_page = 0
+                    yield dumps({"error": {"status": 500, "detail": str(e)}}) + b"\n"
+                    continue
+                for line in emit(data):
+                    yield line
+            refill()
+    finally:
+        for task in pending:
+            task.cancel()
 
 
 @app.get("/api/search")
-def everything(q: str, language: Optional[str] = None, from_param: Optional[str] = None, to: Optional[str] = None):
+async def everything(
+    request: Request,
+    q: str,
+    language: Optional[str] = None,
+    from_param: Optional[str] = None,
+    to: Optional[str] = None,
+    pages: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    dedupe: bool = False,
+    enrich: bool = False,
+):
+    """Search NewsAPI `everything`.
+
+    With `pages=N` or `limit=M` the first N pages (or enough pages for M articles) are
+    fetched concurrently and streamed back as NDJSON, one article per line. `fields=`
+    trims each article to the listed keys; `dedupe=true` collapses near-duplicate stories
+    and `enrich=true` adds each article's `enrichment`. Both need the whole result, so
+    they are rejected with 400 in streaming mode.
+    """
+    projection = fields_or_400(fields)
     if not q:
         raise HTTPException(status_code=400, detail="Query parameter `q` is required")
-    params = {"q": q, "pageSize": 50}
+    params = {"q": q, "pageSize": SEARCH_PAGE_SIZE}
     if language:
         params["language"] = language
     if from_param:
         params["from"] = from_param
     if to:
         params["to"] = to
+    if pages is not None or limit is not None:
+        if limit is not None and limit < 1:
+            raise HTTPException(status_code=400, detail="`limit` must be positive")
+        unsupported = [name for name, on in (("dedupe", dedupe), ("enrich", enrich)) if on]
+        if unsupported:
+            detail = f"{' and '.join(unsupported)} cannot be combined with streaming (`pages`/`limit`)"
+            raise HTTPException(status_code=400, detail=detail)
+        n_pages = pages if pages is not None else -(-limit // SEARCH_PAGE_SIZE)
+        n_pages = max(1, min(n_pages, SEARCH_MAX_PAGES))
+        try:
+            first = await fetch_search_page(params, 1)
+        except RuntimeError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        stream = stream_search_pages(params, first, n_pages, limit, projection)
+        return StreamingResponse(stream, media_type="application/x-ndjson")
     try:
-        data = newsapi_get("everything", params)
+        data, cache_state, age = await cached_newsapi_get("everything", params)
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return JSONResponse(content=data)
+    return cached_json_response(request, "everything", data, cache_state, age, projection, dedupe, enrich)
+
+
+def merge_articles(results):
+    """Merge `(label, articles)` pairs into one list, newest first, deduplicated by URL.
+
+    Each merged article is a copy carrying a `matched` list of the labels that returned it;
+    the first copy seen wins for the other fields.
+    """
+    merged = {}
+    for label, articles in results:
+        for article in articles:
+            url = article.get("url")
+            if not url:
+                continue
+            entry = merged.get(url)
+            if entry is None:
+                entry = merged[url] = dict(article, matched=[])
+            if label not in entry["matched"]:
+                entry["matched"].append(label)
+    # ISO-8601 timestamps sort chronologically as strings; undated articles go last
+    return sorted(merged.values(), key=lambda a: a.get("publishedAt") or "", reverse=True)
+
+
+@app.get("/api/multi-search")
+async def multi_search(
+    request: Request,
+    q: Optional[List[str]] = Query(None),
+    country: Optional[List[str]] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    language: Optional[str] = None,
+    limit: int = 100,
+    deadline: Optional[float] = None,
+    fields: Optional[str] = None,
+    dedupe: bool = False,
+):
+    """Run many searches in one request and return a single merged, newest-first article list.
+
+    Each `q` (repeatable) is an `everything` search; each `country` (repeatable) is a
+    top-headlines query, crossed with every `category` when given. Sub-queries run
+    concurrently (at most MULTI_SEARCH_CONCURRENCY upstream calls at once), and those still
+    pending after `deadline` seconds are abandoned. Articles are deduplicated by URL and
+    carry a `matched` list of sub-query labels; `queries` reports each sub-query's outcome
+    and `complete` is false when any of them failed or timed out. `totalResults` counts the
+    unique merged articles (before `dedupe` and `limit`), not NewsAPI's match totals. With
+    `dedupe`, each kept article's `matched` also lists the labels of the copies it absorbed.
+    """
+    projection = fields_or_400(fields)
+    if category and not country:
+        raise HTTPException(status_code=400, detail="`category` needs at least one `country`")
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="`limit` must be positive")
+    limit = min(limit, MULTI_SEARCH_MAX_RESULTS)
+    deadline = min(deadline, MULTI_SEARCH_DEADLINE) if deadline is not None and deadline > 0 else MULTI_SEARCH_DEADLINE
+
+    subqueries = {}
+    for term in dict.fromkeys(t.strip() for t in q or [] if t.strip()):
+        params = {"q": term, "pageSize": SEARCH_PAGE_SIZE}
+        if language:
+            params["language"] = language
+        subqueries[f"q:{term}"] = ("everything", params)
+    for c in dict.fromkeys(c.strip().lower() for c in country or [] if c.strip()):
+        for cat in dict.fromkeys(category or [None]):
+            subqueries[f"top:{c}/{cat}" if cat else f"top:{c}"] = ("top-headlines", top_headlines_params(c, cat))
+    if not subqueries:
+        raise HTTPException(status_code=400, detail="Pass at least one `q` or `country`")
+    if len(subqueries) > MULTI_SEARCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MULTI_SEARCH_MAX_QUERIES} sub-queries per request")
+    if not upstream_scheduler:
+        raise HTTPException(status_code=500, detail="NEWSAPI_KEY is not set. Obtain a key from https://newsapi.org/")
+
+    sem = asyncio.Semaphore(MULTI_SEARCH_CONCURRENCY)
+
+    async def run(path: str, params: dict):
+        async with sem:
+            return await cached_newsapi_get(path, params)
+
+    tasks = {label: asyncio.create_task(run(path, params)) for label, (path, params) in subqueries.items()}
+    _done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        # only this request's wait is cancelled; single-flight keeps shared upstream calls alive
+        task.cancel()
+
+    results = []
+    report = []
+    for label, task in tasks.items():
+        if task in pending:
+            report.append({"query": label, "status": "timeout"})
+            continue
+        try:
+            data, cache_state, _age = task.result()
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else repr(e)
+            report.append({"query": label, "status": "error", "error": str(detail)})
+            continue
+        articles = data.get("articles") or []
+        results.append((label, articles))
+        report.append({"query": label, "status": "ok", "cache": cache_state, "results": len(articles)})
+
+    articles = merge_articles(results)
+    payload = {
+        "status": "ok",
+        "totalResults": len(articles),
+        "complete": all(r["status"] == "ok" for r in report),
+        "queries": report,
+        "articles": articles,
+    }
+    if dedupe:
+        payload = dedupe_response(payload, merge_fields=("matched",))
+    payload["articles"] = payload["articles"][:limit]
+    return json_response(request, project_articles(payload, projection), headers={"Cache-Control": "no-store"})
+
+
+@app.get("/api/local-search")
+def local_search(
+    request: Request,
+    q: Optional[str] = None,
+    source: Optional[str] = None,
+    from_param: Optional[str] = None,
+    to: Optional[str] = None,
+    sort_by: str = "publishedAt",
+    page_size: int = 50,
+    page: int = 1,
+    fields: Optional[str] = None,
+    dedupe: bool = False,
+):
+    """Search articles previously returned by NewsAPI without spending upstream quota.
+
+    `totalResults` is the number of matches across all pages; `page`/`page_size` select one page.
+    """
+    projection = fields_or_400(fields)
+    if article_store is None:
+        raise HTTPException(status_code=503, detail="Local article store is disabled")
+    page_size = max(1, min(page_size, 100))
+    page = max(1, page)
+    try:
+        articles = article_store.search(q, source, from_param, to, sort_by, page_size, (page - 1) * page_size)
+        total = article_store.count_matches(q, source, from_param, to)
+    except sqlite3.OperationalError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search: {e}")
+    # totalResults counts every match, as in NewsAPI, so clients can page through them
+    data = {"status": "ok", "totalResults": total, "articles": articles}
+    return json_response(request, shape_articles(data, projection, dedupe))
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of request, upstream, cache and threadpool metrics."""
+    # async so the threadpool gauge reads the limiter of this event loop
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/quota")
+async def quota_status():
+    """Return each NewsAPI key's remaining budget and tokens, and each upstream path's breaker state."""
+    # async so the scheduler's state is only ever touched from the event loop
+    return JSONResponse(content={"keys": upstream_scheduler.status(), "breakers": breaker_status(UPSTREAM_BREAKERS)})
+
+
+@app.get("/api/prefetch/status")
+def prefetch_status():
+    """Return the background prefetcher's schedule size and last-run timings."""
+    return JSONResponse(content=prefetcher.status())
+
+
+@lru_cache(maxsize=None)
+def sources_payload() -> PrecomputedJSON:
+    return PrecomputedJSON(list_sources_full(), SOURCES_CACHE_CONTROL)
 
 
 @app.get("/api/sources")
-def api_list_sources():
-    """Return available categories and source names (link-only mapping available via `/api/source-search`)."""
-    # return full mapping so the frontend can build search URLs synchronously
-    return JSONResponse(content=list_sources_full())
+def api_list_sources(request: Request):
+    """Return the whole catalog as `{category: {source: url_template}}`.
+
+    Kept for the desktop client, which caches it on disk; browsers page through
+    `/api/sources/categories/{category}` and `/api/sources/suggest` instead.
+    """
+    # clients revalidate with If-None-Match and get a 304 while the catalog is unchanged
+    return sources_payload().response(request)
+
+
+@app.get("/api/sources/suggest")
+def api_sources_suggest(
+    request: Request,
+    prefix: str = Query(..., max_length=100),
+    limit: int = Query(SUGGEST_LIMIT, ge=1, le=50),
+    category: Optional[str] = None,
+):
+    """Return sources whose name, a word in it, or domain starts with `prefix`, best match first."""
+    catalog = get_catalog()
+    if category is not None and category not in catalog.categories:
+        raise HTTPException(status_code=400, detail=f"Unknown category: {category}")
+    suggestions = [s.to_dict() for s in catalog.suggest(prefix, limit, category)]
+    return json_response(request, {"prefix": prefix, "suggestions": suggestions}, headers={"Cache-Control": SOURCES_CACHE_CONTROL})
+
+
+@app.get("/api/sources/categories")
+def api_source_categories(request: Request):
+    """Return every category with its source count, in catalog order."""
+    catalog = get_catalog()
+    categories = [
+        {"name": name, "count": len(sources)} for name, sources in catalog.categories.items()
+    ]
+    return json_response(request, {"categories": categories}, headers={"Cache-Control": SOURCES_CACHE_CONTROL}, etag=True)
+
+
+@app.get("/api/sources/categories/{category}")
+def api_source_category_page(
+    request: Request,
+    category: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(SOURCES_PAGE_SIZE, ge=1, le=SOURCES_MAX_PAGE_SIZE),
+):
+    """Return one page of a category's sources with their URL templates.
+
+    `next_offset` is the offset of the following page, or null on the last page.
+    """
+    try:
+        total, sources = get_catalog().page(category, offset, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    next_offset = offset + limit if offset + limit < total else None
+    payload = {
+        "category": category,
+        "total": total,
+        "offset": offset,
+        "next_offset": next_offset,
+        "sources": [{"name": s.name, "domain": s.domain, "url": s.url} for s in sources],
+    }
+    return json_response(request, payload, headers={"Cache-Control": SOURCES_CACHE_CONTROL}, etag=True)
+
+
+@app.get("/api/sources/domain/{domain}")
+def api_sources_by_domain(request: Request, domain: str):
+    """Return the sources published on `domain` or its closest listed parent domain."""
+    sources = get_catalog().lookup_domain(domain)
+    return json_response(request, {"domain": domain, "sources": [s.to_dict() for s in sources]}, headers={"Cache-Control": SOURCES_CACHE_CONTROL})
 
 
 @app.get("/api/source-search")
@@ -99,6 +878,33 @@ def api_source_search(category: str, source: str, q: str):
     return JSONResponse(content={"url": url})
 
 
+@app.get("/api/source-search/batch")
+def api_source_search_batch(
+    request: Request,
+    q: str = Query(..., max_length=SOURCE_SEARCH_MAX_QUERY),
+    category: Optional[List[str]] = Query(None),
+    source: Optional[List[str]] = Query(None),
+):
+    """Return encoded search URLs for many sources in one response.
+
+    `category` (repeatable) selects whole categories, default all; `source` (repeatable)
+    narrows to those source names. Response: `{"urls": {category: {source: url}}}`.
+    Selections of more than SOURCE_SEARCH_BATCH_MAX sources are rejected with a 400.
+    """
+    if source and len(source) > SOURCE_SEARCH_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {SOURCE_SEARCH_BATCH_MAX} sources per request")
+    try:
+        urls = get_search_urls(q, category, source)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if sum(len(by_source) for by_source in urls.values()) > SOURCE_SEARCH_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"More than {SOURCE_SEARCH_BATCH_MAX} sources selected; narrow the request with `category` or `source`",
+        )
+    return json_response(request, {"urls": urls})
+
+
 if __name__ == "__main__":
     import uvicorn
 
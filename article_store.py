@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT UNIQUE NOT NULL,
+    source_id TEXT,
+    source_name TEXT,
+    author TEXT,
+    title TEXT,
+    description TEXT,
+    content TEXT,
+    url_to_image TEXT,
+    published_at TEXT,
+    ingested_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles(published_at);
+CREATE INDEX IF NOT EXISTS idx_articles_source_name ON articles(source_name COLLATE NOCASE);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, content,
+    content='articles', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, description, content)
+    VALUES (new.id, new.title, new.description, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+    VALUES ('delete', old.id, old.title, old.description, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+    VALUES ('delete', old.id, old.title, old.description, old.content);
+    INSERT INTO articles_fts(rowid, title, description, content)
+    VALUES (new.id, new.title, new.description, new.content);
+END;
+"""
+
+UPSERT_SQL = """
+INSERT INTO articles (url, source_id, source_name, author, title, description, content, url_to_image, published_at, ingested_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(url) DO UPDATE SET
+    source_id=excluded.source_id,
+    source_name=excluded.source_name,
+    author=excluded.author,
+    title=excluded.title,
+    description=excluded.description,
+    content=excluded.content,
+    url_to_image=excluded.url_to_image,
+    published_at=excluded.published_at
+WHERE articles.title IS NOT excluded.title
+   OR articles.description IS NOT excluded.description
+   OR articles.content IS NOT excluded.content
+"""
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query that ANDs each term as a quoted phrase.
+
+    Quoting keeps user input such as `AT&T` or `covid-19` from being parsed as FTS5 syntax.
+    """
+    terms = [t.replace('"', '""') for t in text.split()]
+    return " ".join(f'"{t}"' for t in terms if t)
+
+
+def _row_to_article(row: sqlite3.Row) -> Dict[str, Any]:
+    # same shape as NewsAPI articles so clients can render local results unchanged
+    return {
+        "source": {"id": row["source_id"], "name": row["source_name"]},
+        "author": row["author"],
+        "title": row["title"],
+        "description": row["description"],
+        "url": row["url"],
+        "urlToImage": row["url_to_image"],
+        "publishedAt": row["published_at"],
+        "content": row["content"],
+    }
+
+
+class ArticleStore:
+    """SQLite article store, deduplicated by URL, with an FTS5 index over title/description/content."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self._writer = conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        # one read connection per thread; WAL lets readers run alongside the writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def ingest_batch(self, articles: List[Dict[str, Any]]) -> int:
+        """Upsert a batch of NewsAPI articles in a single transaction; returns rows written."""
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        rows = []
+        for a in articles:
+            url = a.get("url")
+            if not url:
+                continue
+            source = a.get("source") or {}
+            rows.append((
+                url,
+                source.get("id"),
+                source.get("name"),
+                a.get("author"),
+                a.get("title"),
+                a.get("description"),
+                a.get("content"),
+                a.get("urlToImage"),
+                a.get("publishedAt"),
+                now,
+            ))
+        if not rows:
+            return 0
+        with self._write_lock:
+            with self._writer:
+                self._writer.executemany(UPSERT_SQL, rows)
+        return len(rows)
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def _filter(
+        self,
+        q: Optional[str],
+        source: Optional[str],
+        date_from: Optional[str],
+        date_to: Optional[str],
+    ) -> Tuple[str, List[Any], bool]:
+        """Return `(FROM ... WHERE ... clause, args, uses_fts)` for the search filters."""
+        where = []
+        args: List[Any] = []
+        match = fts_query(q) if q else ""
+        if match:
+            sql = "FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+            where.append("articles_fts MATCH ?")
+            args.append(match)
+        else:
+            sql = "FROM articles a"
+        if source:
+            where.append("a.source_name = ? COLLATE NOCASE")
+            args.append(source)
+        if date_from:
+            where.append("a.published_at >= ?")
+            args.append(date_from)
+        if date_to:
+            # a bare date is inclusive of the whole day
+            where.append("a.published_at <= ?")
+            args.append(date_to + "T23:59:59Z" if len(date_to) == 10 else date_to)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return sql, args, bool(match)
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        source: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        sort_by: str = "publishedAt",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Search stored articles by keywords, source name and ISO date range.
+
+        `sort_by` is `publishedAt` (newest first) or `relevancy` (FTS5 bm25 rank, needs `q`).
+        Raises sqlite3.OperationalError for queries FTS5 cannot parse.
+        """
+        sql, args, match = self._filter(q, source, date_from, date_to)
+        sql = "SELECT a.* " + sql
+        if match and sort_by == "relevancy":
+            sql += " ORDER BY articles_fts.rank"
+        else:
+            sql += " ORDER BY a.published_at DESC"
+        sql += " LIMIT ? OFFSET ?"
+        args.extend([limit, offset])
+        return [_row_to_article(r) for r in self._reader().execute(sql, args)]
+
+    def count_matches(
+        self,
+        q: Optional[str] = None,
+        source: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> int:
+        """Return how many stored articles `search` would find with these filters, across all pages."""
+        sql, args, _ = self._filter(q, source, date_from, date_to)
+        return self._reader().execute("SELECT COUNT(*) " + sql, args).fetchone()[0]
+
+
+class ArticleIngestor:
+    """Queue articles from request handlers and write them to the store in batches.
+
+    `submit` never blocks: articles go on a bounded queue (dropped with a warning when
+    full) and a background task writes up to `batch_size` articles per transaction in a
+    worker thread, flushing at least every `flush_interval` seconds.
+    """
+
+    def __init__(self, store: ArticleStore, batch_size: int = 500, flush_interval: float = 2.0, max_pending: int = 10000):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self.ingested = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # write whatever is still queued before shutting down
+        await self._flush(self._drain(self._queue.qsize()))
+
+    def submit(self, articles: Optional[List[Dict[str, Any]]]):
+        for a in articles or ():
+            try:
+                self._queue.put_nowait(a)
+            except asyncio.QueueFull:
+                self.dropped += 1
+        if self.dropped and self._queue.full():
+            logger.warning("Article ingest queue full; %d article(s) dropped so far", self.dropped)
+
+    def _drain(self, n: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < n and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        try:
+            self.ingested += await asyncio.to_thread(self.store.ingest_batch, batch)
+        except Exception as e:
+            logger.warning("Failed to ingest %d article(s): %r", len(batch), e)
+
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            # give concurrent responses a moment to pile up into one transaction
+            if self._queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.flush_interval)
+            batch = [first] + self._drain(self.batch_size - 1)
+            await self._flush(batch)
@@ -0,0 +1,14 @@
+"""Offline benchmarks for the news proxy.
+
+    # 1. fake NewsAPI on :9000 (20 ms latency, 1% errors)
+    python -m bench.fake_newsapi --port 9000 --latency-ms 20 --error-rate 0.01
+    # 2. the app, pointed at it
+    NEWSAPI_KEY=bench NEWSAPI_BASE=http://127.0.0.1:9000/v2 uvicorn app:app --port 8000
+    # 3. load + micro benchmarks, then compare against a previous run
+    python -m bench.loadgen --base http://127.0.0.1:8000 --concurrency 64 --requests 5000 --output load.json
+    python -m bench.micro --output micro.json
+    python -m bench.compare old/load.json load.json
+
+Add `--slow-rate 0.03 --slow-ms 4000` to the fake server to measure tail latency with
+hedging (HEDGE_ENABLED) and the per-endpoint latency budgets.
+"""
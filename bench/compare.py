@@ -0,0 +1,53 @@
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+# metric name -> True if higher is better
+LOAD_METRICS = {"rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+MICRO_METRICS = {"per_call_us": False}
+
+
+def metric_pairs(old: Dict, new: Dict) -> Iterator[Tuple[str, str, float, float, bool]]:
+    """Yield `(name, metric, old_value, new_value, higher_is_better)` for results present in both runs."""
+    if old.get("kind") != new.get("kind"):
+        raise ValueError(f"Cannot compare a {old.get('kind')!r} run with a {new.get('kind')!r} run")
+    if new.get("kind") == "load":
+        sections = {**old["endpoints"], "overall": old["overall"]}, {**new["endpoints"], "overall": new["overall"]}
+        metrics = LOAD_METRICS
+    else:
+        sections = old["benchmarks"], new["benchmarks"]
+        metrics = MICRO_METRICS
+    for name, new_values in sections[1].items():
+        old_values = sections[0].get(name)
+        if old_values is None:
+            continue
+        for metric, higher_is_better in metrics.items():
+            if metric in old_values and metric in new_values:
+                yield name, metric, old_values[metric], new_values[metric], higher_is_better
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON files and flag regressions.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    regressions = 0
+    for name, metric, before, after, higher_is_better in metric_pairs(old, new):
+        change = (after - before) / before * 100 if before else 0.0
+        worse = -change if higher_is_better else change
+        flag = "REGRESSION" if worse > args.threshold else ""
+        regressions += bool(flag)
+        print(f"{name:40} {metric:12} {before:>12.3f} -> {after:>12.3f}  {change:+7.1f}%  {flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Defaults; overridable from the command line or env when run under another ASGI server
+LATENCY_MS = float(os.getenv("FAKE_NEWSAPI_LATENCY_MS", "50"))
+JITTER_MS = float(os.getenv("FAKE_NEWSAPI_JITTER_MS", "10"))
+ERROR_RATE = float(os.getenv("FAKE_NEWSAPI_ERROR_RATE", "0"))
+RATE_LIMIT_RATE = float(os.getenv("FAKE_NEWSAPI_429_RATE", "0"))
+TOTAL_RESULTS = int(os.getenv("FAKE_NEWSAPI_TOTAL_RESULTS", "500"))
+CONTENT_CHARS = int(os.getenv("FAKE_NEWSAPI_CONTENT_CHARS", "200"))
+# a fraction of requests stall for SLOW_MS instead of LATENCY_MS, to exercise tail latency
+SLOW_RATE = float(os.getenv("FAKE_NEWSAPI_SLOW_RATE", "0"))
+SLOW_MS = float(os.getenv("FAKE_NEWSAPI_SLOW_MS", "5000"))
+
+app = FastAPI(title="Fake NewsAPI")
+app.state.requests = 0
+
+_WORDS = (
+    "election market storm court minister talks inflation vaccine summit climate "
+    "strike border rates energy launch trial protest budget ceasefire merger"
+).split()
+_SOURCES = ["Reuters", "Associated Press", "BBC", "CNN", "Al Jazeera", "The Guardian", "NPR", "Bloomberg"]
+
+
+def make_article(seed: str, index: int) -> dict:
+    rnd = random.Random(f"{seed}:{index}")
+    title = " ".join(rnd.choice(_WORDS) for _ in range(8)).capitalize()
+    source = rnd.choice(_SOURCES)
+    published = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rnd.randrange(0, 60 * 24 * 30))
+    return {
+        "source": {"id": None, "name": source},
+        "author": f"{source} staff",
+        "title": title,
+        "description": " ".join(rnd.choice(_WORDS) for _ in range(25)),
+        "url": f"https://example.com/{seed}/{index}",
+        "urlToImage": f"https://example.com/img/{index}.jpg",
+        "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "content": ("lorem ipsum " * (CONTENT_CHARS // 12 + 1))[:CONTENT_CHARS],
+    }
+
+
+async def respond(request: Request):
+    app.state.requests += 1
+    delay = max(0.0, LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS)) / 1000
+    if random.random() < SLOW_RATE:
+        delay = SLOW_MS / 1000
+    await asyncio.sleep(delay)
+    roll = random.random()
+    if roll < RATE_LIMIT_RATE:
+        return JSONResponse(status_code=429, content={"status": "error", "code": "rateLimited", "message": "fake rate limit"})
+    if roll < RATE_LIMIT_RATE + ERROR_RATE:
+        return JSONResponse(status_code=500, content={"status": "error", "code": "unexpectedError", "message": "fake error"})
+    params = request.query_params
+    page_size = min(int(params.get("pageSize", 20)), 100)
+    page = int(params.get("page", 1))
+    seed = "-".join(f"{k}={v}" for k, v in sorted(params.items()) if k not in ("page", "pageSize"))
+    start = (page - 1) * page_size
+    articles = [make_article(seed, i) for i in range(start, min(start + page_size, TOTAL_RESULTS))]
+    return JSONResponse(content={"status": "ok", "totalResults": TOTAL_RESULTS, "articles": articles})
+
+
+@app.get("/v2/top-headlines")
+async def top_headlines(request: Request):
+    return await respond(request)
+
+
+@app.get("/v2/everything")
+async def everything(request: Request):
+    return await respond(request)
+
+
+@app.get("/stats")
+def stats():
+    return {"requests": app.state.requests}
+
+
+def main():
+    global LATENCY_MS, JITTER_MS, ERROR_RATE, RATE_LIMIT_RATE, TOTAL_RESULTS, CONTENT_CHARS, SLOW_RATE, SLOW_MS
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the NewsAPI v2 endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=JITTER_MS)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=RATE_LIMIT_RATE, help="fraction answered with 429")
+    parser.add_argument("--total-results", type=int, default=TOTAL_RESULTS)
+    parser.add_argument("--content-chars", type=int, default=CONTENT_CHARS, help="length of each article's content field")
+    parser.add_argument("--slow-rate", type=float, default=SLOW_RATE, help="fraction of requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=SLOW_MS)
+    args = parser.parse_args()
+    LATENCY_MS, JITTER_MS = args.latency_ms, args.jitter_ms
+    ERROR_RATE, RATE_LIMIT_RATE = args.error_rate, args.rate_limit_rate
+    TOTAL_RESULTS, CONTENT_CHARS = args.total_results, args.content_chars
+    SLOW_RATE, SLOW_MS = args.slow_rate, args.slow_ms
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
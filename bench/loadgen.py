@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Dict, Iterator, List, Tuple
+
+import httpx
+
+from bench.stats import run_metadata, summarize, write_results
+
+COUNTRIES = ["us", "gb", "de", "fr", "jp"]
+KEYWORDS = ["election", "climate", "markets", "vaccine", "ceasefire", "energy", "ai", "football"]
+SOURCE_SEARCHES = [("United States", "CNN"), ("United Kingdom", "BBC"), ("Europe", "Le Monde"), ("Japan", "NHK")]
+
+ENDPOINTS = ("top", "search", "sources", "source-search")
+
+
+def request_plan(endpoints: List[str]) -> Iterator[Tuple[str, str, dict]]:
+    """Yield `(endpoint, path, params)` forever, round-robin over endpoints and their inputs."""
+    generators = {
+        "top": (("/api/top", {"country": c}) for c in itertools.cycle(COUNTRIES)),
+        "search": (("/api/search", {"q": q}) for q in itertools.cycle(KEYWORDS)),
+        "sources": (("/api/sources", {}) for _ in itertools.count()),
+        "source-search": (
+            ("/api/source-search", {"category": c, "source": s, "q": q})
+            for (c, s), q in zip(itertools.cycle(SOURCE_SEARCHES), itertools.cycle(KEYWORDS))
+        ),
+    }
+    for name in itertools.cycle(endpoints):
+        path, params = next(generators[name])
+        yield name, path, params
+
+
+async def run_load(base: str, endpoints: List[str], concurrency: int, total: int, timeout: float) -> Dict:
+    plan = request_plan(endpoints)
+    latencies: Dict[str, List[float]] = {e: [] for e in endpoints}
+    errors: Dict[str, int] = {e: 0 for e in endpoints}
+    remaining = total
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=timeout) as client:
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                name, path, params = next(plan)
+                started = time.perf_counter()
+                try:
+                    resp = await client.get(path, params=params)
+                    await resp.aread()
+                    ok = resp.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies[name].append(time.perf_counter() - started)
+                if not ok:
+                    errors[name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {}
+    for name in endpoints:
+        count = len(latencies[name])
+        results[name] = {"requests": count, "errors": errors[name], "rps": round(count / elapsed, 1), **summarize(latencies[name])}
+    all_latencies = [x for values in latencies.values() for x in values]
+    overall = {
+        "requests": len(all_latencies),
+        "errors": sum(errors.values()),
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(all_latencies) / elapsed, 1),
+        **summarize(all_latencies),
+    }
+    return {"endpoints": results, "overall": overall}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the news proxy at a fixed concurrency and report latency percentiles.")
+    parser.add_argument("--base", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"comma-separated subset of {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="total requests across all endpoints")
+    parser.add_argument("--warmup", type=int, default=100, help="requests sent (and discarded) before measuring")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", default="-", help="JSON results file ('-' for stdout)")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoint(s): {', '.join(sorted(unknown))}")
+
+    if args.warmup:
+        asyncio.run(run_load(args.base, endpoints, args.concurrency, args.warmup, args.timeout))
+    measured = asyncio.run(run_load(args.base, endpoints, args.concurrency, args.requests, args.timeout))
+    results = {
+        "kind": "load",
+        "meta": {**run_metadata(), "base": args.base, "concurrency": args.concurrency, "requests": args.requests},
+        **measured,
+    }
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
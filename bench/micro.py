@@ -0,0 +1,91 @@
+import argparse
+import os
+import tempfile
+import timeit
+from typing import Callable, Dict
+
+from bench.stats import run_metadata, write_results
+
+
+def measure(fn: Callable[[], object], repeat: int = 5) -> Dict[str, float]:
+    """Return the best and median per-call time in microseconds over `repeat` autoranged runs."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = sorted(t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number))
+    return {"per_call_us": round(runs[0], 3), "median_us": round(runs[len(runs) // 2], 3), "loops": number}
+
+
+def url_benchmarks() -> Dict[str, Callable[[], object]]:
+    from news_source import get_catalog, get_search_url
+    import tk_client
+
+    catalog = get_catalog()
+
+    query = tk_client.build_query("climate policy", "2024-01-01", "bbc.co.uk")
+    return {
+        "get_search_url": lambda: get_search_url("United States", "CNN", "climate change policy"),
+        "catalog.suggest.short_prefix": lambda: catalog.suggest("the"),
+        "catalog.suggest.word_prefix": lambda: catalog.suggest("york"),
+        "route_query.query_string": lambda: tk_client.route_query(query, "https://www.cnn.com/search?q={query}"),
+        "route_query.path": lambda: tk_client.route_query(query, "https://www.newyorker.com/search/q/{query}"),
+        "route_query.no_placeholder": lambda: tk_client.route_query(query, "https://example.com/search"),
+        "build_query": lambda: tk_client.build_query("climate policy", "2024-01-01", "bbc.co.uk"),
+    }
+
+
+def enrichment_benchmarks() -> Dict[str, Callable[[], object]]:
+    from enrichment import RollingCorpus, analyze_article
+
+    text = (
+        "Prime Minister Keir Starmer met President Emmanuel Macron in Paris on Tuesday\n"
+        "The Bank of England held rates as the European Union weighed new tariffs on Chinese steel.\n"
+        "Officials from NATO and the United Nations said talks would resume in Geneva next week, "
+        "after Microsoft Corp and Reuters reported a sharp rise in cyber attacks across Europe."
+    )
+    _, counts, _ = analyze_article(text)
+    corpus = RollingCorpus(5000)
+    for i in range(5000):
+        corpus.add(frozenset(list(counts)[: i % len(counts)] + [f"term{i % 700}"]))
+    return {
+        "enrichment.analyze_article": lambda: analyze_article(text),
+        "enrichment.keywords[5000 docs]": lambda: corpus.keywords(counts, 8),
+    }
+
+
+def sqlite_benchmarks(db_path: str, sessions: int) -> Dict[str, Callable[[], object]]:
+    import tk_client
+
+    tk_client.DB_FILE = db_path
+    tk_client.init_db()
+    rows = [{"url": f"https://example.com/{i}?q={{query}}", "keyword": f"kw{i}"} for i in range(12)]
+    archive = [{"name": f"bulk-{i}", "created_at": "2024-01-01T00:00:00", "data": {"rows": rows}} for i in range(sessions)]
+    tk_client.import_sessions_list_to_db(archive, True)
+    counter = iter(range(10 ** 9))
+    return {
+        "save_session_to_db": lambda: tk_client.save_session_to_db(f"bench-{next(counter) % 100}", {"rows": rows}),
+        "load_session_from_db": lambda: tk_client.load_session_from_db("bulk-0"),
+        f"list_sessions[{sessions}]": tk_client.list_sessions,
+        f"load_all_sessions[{sessions}]": tk_client.load_all_sessions,
+        f"import_sessions_list_to_db[{sessions}]": lambda: tk_client.import_sessions_list_to_db(archive, True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for URL building, article enrichment and the Tk client's SQLite helpers.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=1000, help="sessions preloaded for the SQLite benchmarks")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", default="-", help="JSON results file ('-' for stdout)")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmarks = {**url_benchmarks(), **enrichment_benchmarks(), **sqlite_benchmarks(os.path.join(tmp, "bench_sessions.db"), args.sessions)}
+        for name, fn in benchmarks.items():
+            if args.filter in name:
+                results[name] = measure(fn, args.repeat)
+    write_results(args.output, {"kind": "micro", "meta": run_metadata(), "benchmarks": results})
+
+
+if __name__ == "__main__":
+    main()
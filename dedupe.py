@@ -0,0 +1,142 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+# 64-bit SimHash split into 6 bands of 10-11 bits: two signatures within Hamming distance 5
+# must agree exactly on at least one band (pigeonhole), so bucketing by band finds every
+# near-duplicate pair without comparing all pairs. Headline-length texts that differ by a
+# word or an agency suffix land 3-5 bits apart; unrelated texts average 32.
+SIMHASH_BITS = 64
+BAND_WIDTHS = (11, 11, 11, 11, 10, 10)
+LSH_BANDS = len(BAND_WIDTHS)
+_BANDS = [(sum(BAND_WIDTHS[:i]), (1 << w) - 1) for i, w in enumerate(BAND_WIDTHS)]
+MAX_DISTANCE = LSH_BANDS - 1
+# cap on candidates checked per bucket so a degenerate bucket cannot go quadratic
+MAX_BUCKET_SCAN = 64
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _features(text: str) -> List[str]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    # unigrams plus bigrams so word order carries some weight
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+# SimHash bit counting is done in one big integer with a 16-bit lane per signature bit:
+# adding a feature's "spread" hash increments all 64 lane counters in a single addition.
+_LANE_BITS = 16
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_MAX_FEATURES = _LANE_MASK
+_BYTE_SPREAD = [sum(((v >> b) & 1) << (b * _LANE_BITS) for b in range(8)) for v in range(256)]
+_S0, _S1, _S2, _S3, _S4, _S5, _S6, _S7 = (
+    [x << (8 * _LANE_BITS * k) for x in _BYTE_SPREAD] for k in range(8)
+)
+
+
+def _spread(h: int) -> int:
+    return (
+        _S0[h & 0xFF] + _S1[(h >> 8) & 0xFF] + _S2[(h >> 16) & 0xFF] + _S3[(h >> 24) & 0xFF]
+        + _S4[(h >> 32) & 0xFF] + _S5[(h >> 40) & 0xFF] + _S6[(h >> 48) & 0xFF] + _S7[(h >> 56) & 0xFF]
+    )
+
+
+@lru_cache(maxsize=16384)
+def simhash(text: str) -> int:
+    """Return the 64-bit SimHash of `text` (0 for text without word characters).
+
+    Feature hashes use the built-in `hash`, so signatures are only comparable within
+    one process.
+    """
+    features = _features(text)[:_MAX_FEATURES]
+    if not features:
+        return 0
+    acc = 0
+    for f in features:
+        acc += _spread(hash(f))
+    half = len(features) / 2
+    sig = 0
+    for bit in range(SIMHASH_BITS):
+        if (acc >> (bit * _LANE_BITS)) & _LANE_MASK > half:
+            sig |= 1 << bit
+    return sig
+
+
+def article_text(article: Dict[str, Any]) -> str:
+    return f"{article.get('title') or ''} {article.get('description') or ''}".strip()
+
+
+def cluster_articles(articles: List[Dict[str, Any]], max_distance: int = MAX_DISTANCE) -> List[List[int]]:
+    """Group near-duplicate articles; returns clusters as lists of indexes in input order.
+
+    Articles are near-duplicates when their title+description SimHashes differ in at most
+    `max_distance` bits (max_distance must be below LSH_BANDS), or when they share a URL.
+    """
+    parent = list(range(len(articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            # keep the earliest article as the root so it becomes the representative
+            parent[max(ri, rj)] = min(ri, rj)
+
+    buckets: Dict[Any, List[int]] = {}
+    sigs: List[Optional[int]] = []
+    for i, article in enumerate(articles):
+        url = article.get("url")
+        if url:
+            buckets.setdefault(("url", url), []).append(i)
+            union(i, buckets[("url", url)][0])
+        text = article_text(article)
+        sig = simhash(text) if text else None
+        sigs.append(sig)
+        if sig is None:
+            continue
+        for band, (shift, mask) in enumerate(_BANDS):
+            bucket = buckets.setdefault((band, (sig >> shift) & mask), [])
+            for j in bucket[-MAX_BUCKET_SCAN:]:
+                if (sig ^ sigs[j]).bit_count() <= max_distance:
+                    union(i, j)
+            bucket.append(i)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(articles)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values(), key=lambda c: c[0])
+
+
+def dedupe_articles(articles: List[Dict[str, Any]], merge_fields: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """Return one representative per cluster, with the other copies listed under `duplicates`.
+
+    List-valued `merge_fields` of the copies are merged into the representative's, in
+    order and without repeats.
+    """
+    out = []
+    for cluster in cluster_articles(articles):
+        rep = dict(articles[cluster[0]])
+        rep["duplicates"] = [
+            {"source": (articles[i].get("source") or {}).get("name"), "url": articles[i].get("url")}
+            for i in cluster[1:]
+        ]
+        for field in merge_fields:
+            values = [v for i in cluster for v in articles[i].get(field) or []]
+            if values:
+                rep[field] = list(dict.fromkeys(values))
+        out.append(rep)
+    return out
+
+
+def dedupe_response(data: Dict[str, Any], merge_fields: Iterable[str] = ()) -> Dict[str, Any]:
+    """Return a copy of a NewsAPI response with near-duplicate articles collapsed."""
+    if not isinstance(data.get("articles"), list):
+        return data
+    out = dict(data)
+    out["articles"] = dedupe_articles(data["articles"], merge_fields)
+    out["clusters"] = len(out["articles"])
+    return out
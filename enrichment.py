@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import re
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# NewsAPI truncates `content` and appends e.g. "… [+1234 chars]"
+_TRUNCATION_RE = re.compile(r"\s*(?:…|\.\.\.)?\s*\[\+\d+ chars\]\s*$")
+_WORD_RE = re.compile(r"[^\W\d_][\w'’-]*", re.UNICODE)
+# runs of capitalized words or dotted initials, optionally joined by short connectors
+# ("Bank of England", "U.S. Senate")
+_NAME_WORD = r"(?:[A-Z]\.){2,}|[A-Z][\w'’-]*"
+_ENTITY_RE = re.compile(rf"\b(?:{_NAME_WORD})(?:\s+(?:(?:of|de|del|la|al|the|&)\s+)?(?:{_NAME_WORD}))*")
+_ACRONYM_RE = re.compile(r"^[A-Z]{2,6}s?$")
+
+# the most frequent function words per language; the language whose list covers the most
+# tokens wins. Scripts without Latin letters are recognised by character range instead.
+STOPWORDS: Dict[str, frozenset] = {
+    "en": frozenset("the of and to in a is that for on it with as was by at from he his are be has have its an this which or said were not but after will".split()),
+    "es": frozenset("el la de que y en los del las un por con una para es se no al lo como su más pero sus le ha este según".split()),
+    "fr": frozenset("le la les de des et en un une du est que pour dans qui au sur pas par avec il a ne ce plus se aux été selon".split()),
+    "de": frozenset("der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an werden aus er hat dass sie nach bei".split()),
+    "it": frozenset("il di che la e in un per non una del della le si da al con sono dei gli ha nel alla più anche come ma".split()),
+    "pt": frozenset("de que e o a do da em um para com não uma os no se na por mais as dos como mas ao ele das foi".split()),
+    "nl": frozenset("de het een en van in is dat op te zijn met voor niet aan er die ook als bij door om naar heeft werd".split()),
+}
+SCRIPTS = (
+    ("ko", re.compile(r"[가-힯]")),
+    ("ja", re.compile(r"[぀-ヿ]")),
+    ("zh", re.compile(r"[一-鿿]")),
+    ("ru", re.compile(r"[Ѐ-ӿ]")),
+    ("ar", re.compile(r"[؀-ۿ]")),
+    ("he", re.compile(r"[֐-׿]")),
+    ("hi", re.compile(r"[ऀ-ॿ]")),
+    ("el", re.compile(r"[Ͱ-Ͽ]")),
+)
+ALL_STOPWORDS = frozenset().union(*STOPWORDS.values())
+
+PERSON_TITLES = frozenset(
+    "mr mrs ms dr sir president prime minister senator sen rep governor gov chancellor king queen prince pope judge ceo general gen".split()
+)
+ORG_WORDS = frozenset(
+    "inc corp corporation co ltd llc plc group bank party ministry department agency university council committee court "
+    "association union federation institute commission company army police news times post fund foundation league club "
+    "nations senate congress parliament government council".split()
+)
+PLACES = frozenset(
+    """
+    afghanistan argentina australia austria bangladesh belgium brazil britain canada chile china colombia cuba denmark egypt
+    england ethiopia europe france germany ghana greece india indonesia iran iraq ireland israel italy japan jordan kenya korea
+    lebanon libya malaysia mexico morocco netherlands nigeria norway pakistan palestine peru philippines poland portugal qatar
+    russia scotland singapore somalia spain sudan sweden switzerland syria taiwan thailand turkey uganda ukraine venezuela
+    vietnam wales yemen africa asia america gaza kyiv moscow beijing london paris berlin tokyo washington delhi brussels
+    jerusalem tehran seoul sydney toronto dubai
+    """.split()
+)
+PLACE_PHRASES = frozenset(
+    ("united states", "united kingdom", "new york", "hong kong", "south africa", "south korea", "north korea",
+     "saudi arabia", "new zealand", "los angeles", "san francisco", "middle east", "european union")
+)
+SENTENCE_STARTERS = frozenset(("the", "a", "an", "in", "on", "at", "as", "but", "and", "if", "when", "after", "this", "it"))
+SPAN_PREFIXES = SENTENCE_STARTERS | PERSON_TITLES
+
+MAX_ENTITIES = 20
+
+
+def article_text(article: Dict[str, Any]) -> str:
+    content = _TRUNCATION_RE.sub("", article.get("content") or "")
+    return "\n".join(t for t in (article.get("title"), article.get("description"), content) if t)
+
+
+def detect_language(text: str, tokens: List[str]) -> Optional[str]:
+    """Guess an ISO 639-1 code from the script or from stopword coverage; None if unsure."""
+    for lang, pattern in SCRIPTS:
+        if len(pattern.findall(text)) >= 5:
+            return lang
+    if not tokens:
+        return None
+    scores = {lang: sum(1 for t in tokens if t in words) for lang, words in STOPWORDS.items()}
+    lang, best = max(scores.items(), key=lambda item: item[1])
+    return lang if best >= 2 else None
+
+
+def term_counts(tokens: List[str]) -> Dict[str, int]:
+    """Count the keyword candidates in `tokens`: non-stopwords of three or more letters."""
+    return dict(Counter(t for t in tokens if len(t) > 2 and t not in ALL_STOPWORDS))
+
+
+def _entity_type(words: List[str], previous: str) -> str:
+    lowered = [w.lower().rstrip(".") for w in words]
+    phrase = " ".join(lowered)
+    if previous in PERSON_TITLES:
+        return "person"
+    if phrase in PLACE_PHRASES or (len(words) == 1 and phrase in PLACES):
+        return "location"
+    if ORG_WORDS.intersection(lowered) or (len(words) == 1 and _ACRONYM_RE.match(words[0])):
+        return "organization"
+    if len(words) in (2, 3) and all(w[:1].isupper() and w[1:].islower() for w in words):
+        return "person"
+    return "other"
+
+
+def tag_entities(text: str) -> List[Dict[str, str]]:
+    """Tag capitalized spans as person, organization, location or other, using simple rules.
+
+    A span is a run of capitalized words, minus any leading titles or function words that
+    are only capitalized because they start a sentence. Rules, in order: a preceding title
+    (Mr, President) makes a person, the place gazetteer a location, an organization keyword
+    or a bare acronym an organization, and two or three plain capitalized words a person.
+    """
+    entities: "OrderedDict[str, str]" = OrderedDict()
+    for m in _ENTITY_RE.finditer(text):
+        words = m.group(0).split()
+        before = text[max(0, m.start() - 40):m.start()].split()
+        previous = before[-1].lower().rstrip(".,") if before else ""
+        # peel titles and capitalized function words off the front of the span
+        while words and words[0].lower().rstrip(".") in SPAN_PREFIXES:
+            previous = words.pop(0).lower().rstrip(".")
+        span = " ".join(words)
+        if len(span) < 2 or span in entities:
+            continue
+        entities[span] = _entity_type(words, previous)
+        if len(entities) >= MAX_ENTITIES:
+            break
+    return [{"text": span, "type": kind} for span, kind in entities.items()]
+
+
+def analyze_article(text: str) -> Tuple[Optional[str], Dict[str, int], List[Dict[str, str]]]:
+    """Return `(language, term_counts, entities)` for one article's text."""
+    tokens = [t.lower() for t in _WORD_RE.findall(text)]
+    return detect_language(text, tokens), term_counts(tokens), tag_entities(text)
+
+
+def analyze_batch(batch: List[Tuple[str, str]]) -> List[Tuple[str, Optional[str], Dict[str, int], List[Dict[str, str]]]]:
+    """Worker-process entry point: analyze `(url, text)` pairs."""
+    return [(url, *analyze_article(text)) for url, text in batch]
+
+
+class RollingCorpus:
+    """Document frequencies over the last `size` analyzed articles, for IDF weights."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.documents: Deque[frozenset] = deque()
+        self.df: Counter = Counter()
+
+    def add(self, terms: frozenset):
+        self.documents.append(terms)
+        self.df.update(terms)
+        if len(self.documents) > self.size:
+            old = self.documents.popleft()
+            self.df.subtract(old)
+            for term in old:
+                if self.df[term] <= 0:
+                    del self.df[term]
+
+    def keywords(self, counts: Dict[str, int], top: int) -> List[str]:
+        """Return the `top` terms of one document by TF-IDF against the corpus."""
+        n = len(self.documents)
+        total = sum(counts.values()) or 1
+        scores = {t: c / total * (math.log((1 + n) / (1 + self.df[t])) + 1) for t, c in counts.items()}
+        return sorted(scores, key=lambda t: (-scores[t], t))[:top]
+
+
+class EnrichmentPipeline:
+    """Derive language, keywords and entities for ingested articles on a process pool.
+
+    `submit` never blocks: articles that are neither cached nor already pending go on a
+    bounded queue, and are dropped (counted) when it is full. A background task sends
+    batches of up to `batch_size` to at most `workers` processes at a time, so a burst
+    waits in the queue instead of piling up work in the pool. Text analysis runs in the
+    workers; TF-IDF weights are applied here against the rolling corpus, since the corpus
+    has to see every article. Results are cached by URL (LRU, `cache_size` entries) and
+    read with `lookup`, which never waits for analysis.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        batch_size: int = 64,
+        max_pending: int = 2000,
+        cache_size: int = 20000,
+        corpus_size: int = 5000,
+        top_keywords: int = 8,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.top_keywords = top_keywords
+        self.corpus = RollingCorpus(corpus_size)
+        self._queue: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue(maxsize=max_pending)
+        self._slots = asyncio.Semaphore(workers)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending: Set[str] = set()
+        self._batches: Set[asyncio.Task] = set()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enriched = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is None:
+            self._pool = self._new_pool()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        for task in list(self._batches):
+            task.cancel()
+        await asyncio.gather(self._task, *self._batches, return_exceptions=True)
+        self._task = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def submit(self, articles: Optional[List[Dict[str, Any]]]):
+        for a in articles or ():
+            url = a.get("url")
+            if not url or url in self._cache or url in self._pending:
+                continue
+            try:
+                self._queue.put_nowait((url, article_text(a)))
+            except asyncio.QueueFull:
+                self.dropped += 1
+                continue
+            self._pending.add(url)
+
+    def lookup(self, url: Optional[str]) -> Optional[Dict[str, Any]]:
+        return self._cache.get(url) if url else None
+
+    def enrich_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of a NewsAPI response with each article's cached `enrichment` (or null).
+
+        Articles without a result yet are queued, so a later request will have it.
+        """
+        if not isinstance(data.get("articles"), list):
+            return data
+        out = dict(data)
+        out["articles"] = [dict(a, enrichment=self.lookup(a.get("url"))) for a in data["articles"]]
+        self.submit([a for a in data["articles"] if self.lookup(a.get("url")) is None])
+        return out
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _store(self, url: str, language: Optional[str], counts: Dict[str, int], entities: List[Dict[str, str]]):
+        self.corpus.add(frozenset(counts))
+        self._cache[url] = {
+            "language": language,
+            "keywords": self.corpus.keywords(counts, self.top_keywords),
+            "entities": entities,
+        }
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the server process has threads and an event loop running
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def _process(self, batch: List[Tuple[str, str]]):
+        pool = self._pool
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(pool, analyze_batch, batch)
+            for result in results:
+                self._store(*result)
+            self.enriched += len(results)
+        except BrokenProcessPool as e:
+            self.failed += len(batch)
+            if self._pool is pool:
+                logger.warning("Enrichment worker died (%r); restarting the pool", e)
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+        except Exception as e:
+            self.failed += len(batch)
+            logger.warning("Failed to enrich %d article(s): %r", len(batch), e)
+        finally:
+            self._pending.difference_update(url for url, _ in batch)
+            self._slots.release()
+
+    async def _run(self):
+        while True:
+            # wait for a free worker first, so backpressure lands on the bounded queue
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            task = asyncio.get_running_loop().create_task(self._process(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
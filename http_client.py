@@ -0,0 +1,56 @@
+import os
+from typing import Optional
+
+import httpx
+
+# Pool / timeout settings for the shared upstream client (all overridable via env)
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "200"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "50"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3"))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10"))
+UPSTREAM_WRITE_TIMEOUT = float(os.getenv("UPSTREAM_WRITE_TIMEOUT", "5"))
+UPSTREAM_POOL_TIMEOUT = float(os.getenv("UPSTREAM_POOL_TIMEOUT", "5"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "1") not in ("0", "false", "False")
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def http2_available() -> bool:
+    """Return True if HTTP/2 is enabled and the optional `h2` package is installed."""
+    if not UPSTREAM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled upstream client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=http2_available(),
+            limits=httpx.Limits(
+                max_connections=UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+                keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=UPSTREAM_CONNECT_TIMEOUT,
+                read=UPSTREAM_READ_TIMEOUT,
+                write=UPSTREAM_WRITE_TIMEOUT,
+                pool=UPSTREAM_POOL_TIMEOUT,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client and release its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Sentinel queued for a subscriber that fell too far behind
+DROPPED = b"event: dropped\ndata: {\"reason\": \"slow consumer\"}\n\n"
+HEARTBEAT = b": keep-alive\n\n"
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one server-sent event; the JSON payload is always a single line."""
+    return b"event: " + event.encode("ascii") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscriber:
+    """One connected client: a bounded queue of pre-encoded SSE events."""
+
+    def __init__(self, maxsize: int):
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    def offer(self, event: bytes) -> bool:
+        """Queue `event`, or return False if the client is too far behind to keep."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def drop(self):
+        # discard the backlog so the drop notice is the next (and last) thing delivered
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(DROPPED)
+
+
+class TopicFeed:
+    """One upstream poller for a topic, fanning new articles out to every subscriber.
+
+    `fetch()` is awaited every `interval` seconds while at least one client is subscribed,
+    so upstream cost depends on the number of topics, not clients. Each poll is diffed
+    against the URLs already seen; only unseen articles are broadcast, encoded once and
+    shared by all queues. A subscriber whose queue is full is dropped rather than slowing
+    the poller or growing memory.
+    """
+
+    def __init__(
+        self,
+        topic: Hashable,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        interval: float,
+        queue_size: int,
+        seen_limit: int = 2000,
+        max_backoff: float = 600.0,
+    ):
+        self.topic = topic
+        self.fetch = fetch
+        self.interval = interval
+        self.queue_size = queue_size
+        self.seen_limit = seen_limit
+        self.max_backoff = max_backoff
+        self.subscribers: Set[Subscriber] = set()
+        self.snapshot: Optional[List[Dict[str, Any]]] = None
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.broadcasts = 0
+        self.dropped = 0
+        self.consecutive_failures = 0
+
+    def subscribe(self) -> Subscriber:
+        sub = Subscriber(self.queue_size)
+        if self.snapshot is not None:
+            sub.offer(sse_event("snapshot", {"articles": self.snapshot}))
+        self.subscribers.add(sub)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self.subscribers.discard(sub)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def diff(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return articles whose URL was not seen before and remember them."""
+        new = []
+        for article in articles:
+            url = article.get("url")
+            if not url or url in self._seen:
+                continue
+            self._seen[url] = None
+            new.append(article)
+        while len(self._seen) > self.seen_limit:
+            self._seen.popitem(last=False)
+        return new
+
+    def publish(self, data: Dict[str, Any]):
+        articles = data.get("articles") or []
+        first = self.snapshot is None
+        new = self.diff(articles)
+        self.snapshot = articles
+        if first:
+            # subscribers that arrived before the first poll get the snapshot, not a diff
+            event = sse_event("snapshot", {"articles": articles})
+        elif new:
+            event = sse_event("articles", {"articles": new})
+        else:
+            return
+        self.broadcasts += 1
+        for sub in list(self.subscribers):
+            if not sub.offer(event):
+                sub.drop()
+                self.subscribers.discard(sub)
+                self.dropped += 1
+
+    async def _loop(self):
+        while True:
+            try:
+                self.publish(await self.fetch())
+                self.consecutive_failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.consecutive_failures += 1
+                logger.warning("Live feed poll failed for %s: %r", self.topic, e)
+            self.polls += 1
+            delay = min(self.interval * 2 ** self.consecutive_failures, max(self.interval, self.max_backoff))
+            await asyncio.sleep(delay * random.uniform(0.9, 1.1))
+
+
+class LiveFeedHub:
+    """TopicFeeds created on demand, one per topic (e.g. `(country, category)`)."""
+
+    def __init__(self, interval: float = 60.0, queue_size: int = 32, heartbeat: float = 15.0):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.feeds: Dict[Hashable, TopicFeed] = {}
+
+    def feed(self, topic: Hashable, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> TopicFeed:
+        feed = self.feeds.get(topic)
+        if feed is None:
+            feed = self.feeds[topic] = TopicFeed(topic, fetch, self.interval, self.queue_size)
+        return feed
+
+    async def stream(self, feed: TopicFeed):
+        """Yield SSE bytes for one client until it disconnects or is dropped."""
+        sub = feed.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    event = HEARTBEAT
+                yield event
+                if event is DROPPED:
+                    return
+        finally:
+            feed.unsubscribe(sub)
+
+    async def stop(self):
+        for feed in self.feeds.values():
+            await feed.stop()
+
+    def subscriber_counts(self) -> Dict[Hashable, int]:
+        return {topic: len(feed.subscribers) for topic, feed in self.feeds.items()}
+
+    def dropped_total(self) -> int:
+        return sum(feed.dropped for feed in self.feeds.values())
@@ -0,0 +1,157 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds (Prometheus-style cumulative `le` bounds)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """A monotonically increasing value.
+
+    `collect` (if given) returns `{label_values: value}` at scrape time, for counts that
+    another component already keeps (e.g. cache hits), so the hot path pays nothing.
+    """
+
+    type_name = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.collect = collect
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        values = self.collect() if self.collect is not None else self._values
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        for labels, value in values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        self._values[labels] = value
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [per-bucket counts (non-cumulative, +Inf last), sum]
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            cumulative += counts[-1]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram("http_request_duration_seconds", "Request latency by route, method and status.", ("route", "method", "status")))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge("http_requests_in_flight", "Requests currently being served."))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram("newsapi_request_duration_seconds", "NewsAPI call latency by path and status.", ("path", "status")))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each request against its route template.
+
+    Routes are labelled by their path template (`/api/top`, `/static`), never the raw
+    URL, so label cardinality stays fixed; unmatched requests are labelled `unmatched`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict] = None
+
+    def _route_label(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None:
+            router = scope["app"].router
+            self._route_paths = {getattr(r, "endpoint", None) or getattr(r, "app", None): r.path for r in router.routes}
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        # the route is only known once the router has run, so in-flight is tracked in aggregate
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_LATENCY.observe(time.perf_counter() - started, self._route_label(scope), scope["method"], status[0])
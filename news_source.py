@@ -1,135 +1,191 @@
-from typing import Dict, Any
-
-NEWS_SOURCES: Dict[str, Dict[str, str]] = {
-    "Global Agencies": {
-        "Reuters": "https://www.reuters.com/site-search/?query={query}",
-        "Associated Press": "https://apnews.com/search?q={query}",
-        "AFP": "https://www.afp.com/en/search/site/{query}",
-        "Xinhua": "https://search.news.cn/?lang=en&q={query}",
-        "Anadolu Agency": "https://www.aa.com.tr/en/search?searchText={query}",
-        "TASS": "https://tass.com/search?q={query}",
-        "Kyodo News": "https://english.kyodonews.net/search.html?keyword={query}",
-        "DPA": "https://www.dpa-international.com/search?q={query}",
-        "PTI": "https://www.ptinews.com/search.aspx?query={query}",
-    },
-    "United States": {
-        "CNN": "https://www.cnn.com/search?q={query}",
-        "ABC News": "https://abcnews.go.com/search?searchtext={query}",
-        "NPR": "https://www.npr.org/search?query={query}",
-        "USA Today": "https://www.usatoday.com/search/?q={query}",
-        "The New York Times": "https://www.nytimes.com/search/?query={query}",
-        "The Washington Post": "https://www.washingtonpost.com/newssearch/?query={query}",
-        "Los Angeles Times": "https://www.latimes.com/search?q={query}",
-        "Chicago Tribune": "https://www.chicagotribune.com/search/?q={query}",
-        "The Wall Street Journal": "https://www.wsj.com/search?query={query}",
-        "The Atlantic": "https://www.theatlantic.com/search/?q={query}",
-        "Vox": "https://www.vox.com/search?q={query}",
-        "FiveThirtyEight": "https://fivethirtyeight.com/search/?q={query}",
-        "ProPublica": "https://www.propublica.org/search?q={query}",
-        "The Hill": "https://thehill.com/search/?q={query}",
-        "Axios": "https://www.axios.com/search?q={query}",
-        "Newsweek": "https://www.newsweek.com/search/site/{query}",
-        "Time": "https://time.com/search/?q={query}",
-        "The New Yorker": "https://www.newyorker.com/search/q/{query}",
-        "The Intercept": "https://theintercept.com/search/?q={query}",
-        "Mother Jones": "https://www.motherjones.com/search/?q={query}",
-        "The Daily Beast": "https://www.thedailybeast.com/search?q={query}",
-        "Business Insider": "https://www.businessinsider.com/s?q={query}",
-        "MarketWatch": "https://www.marketwatch.com/search?q={query}",
-        "The Verge": "https://www.theverge.com/search?q={query}",
-        "Wired": "https://www.wired.com/search/?q={query}",
-        "Politifact": "https://www.politifact.com/search/?q={query}",
-        "Snopes": "https://www.snopes.com/search/?q={query}",
-    },
-    "United Kingdom": {
-        "BBC": "https://www.bbc.co.uk/search?q={query}",
-        "Sky News": "https://news.sky.com/search?q={query}",
-        "ITV News": "https://www.itv.com/news/search?q={query}",
-        "The Guardian": "https://www.theguardian.com/search?q={query}",
-        "The Times": "https://www.thetimes.co.uk/search?q={query}",
-        "The Telegraph": "https://www.telegraph.co.uk/search.html?queryText={query}",
-        "The Independent": "https://www.independent.co.uk/search?q={query}",
-        "Financial Times": "https://www.ft.com/search?q={query}",
-        "The Economist": "https://www.economist.com/search?q={query}",
-        "Daily Mail": "https://www.dailymail.co.uk/home/search.html?searchPhrase={query}",
-    },
-    "Europe": {
-        "Der Spiegel": "https://www.spiegel.de/suche/?suchbegriff={query}",
-        "Die Welt": "https://www.welt.de/suche/?query={query}",
-        "Le Monde": "https://www.lemonde.fr/recherche/?search_keywords={query}",
-        "Le Figaro": "https://recherche.lefigaro.fr/recherche/{query}",
-        "El País": "https://elpais.com/buscador/?q={query}",
-        "La Repubblica": "https://www.repubblica.it/ricerca/?query={query}",
-        "Corriere della Sera": "https://www.corriere.it/ricerca/?query={query}",
-        "NOS": "https://nos.nl/zoeken?q={query}",
-        "NRC": "https://www.nrc.nl/zoeken/?q={query}",
-        "Politico Europe": "https://www.politico.eu/?s={query}",
-    },
-    "Canada": {
-        "CBC": "https://www.cbc.ca/search?q={query}",
-        "CTV News": "https://www.ctvnews.ca/search-results/search-ctv-news-7.137?q={query}",
-        "Global News": "https://globalnews.ca/?s={query}",
-        "Toronto Star": "https://www.thestar.com/search.html?q={query}",
-        "National Post": "https://nationalpost.com/search/?q={query}",
-    },
-    "Australia": {
-        "ABC News Australia": "https://www.abc.net.au/news/search/?q={query}",
-        "SBS News": "https://www.sbs.com.au/news/search/{query}",
-        "The Sydney Morning Herald": "https://www.smh.com.au/search?text={query}",
-        "The Age": "https://www.theage.com.au/search?text={query}",
-        "News.com.au": "https://www.news.com.au/search-results?q={query}",
-    },
-    "India": {
-        "The Hindu": "https://www.thehindu.com/search/?q={query}",
-        "Times of India": "https://timesofindia.indiatimes.com/topic/{query}",
-        "Hindustan Times": "https://www.hindustantimes.com/search?q={query}",
-        "NDTV": "https://www.ndtv.com/search?searchtext={query}",
-        "India Today": "https://www.indiatoday.in/topic/{query}",
-        "The Indian Express": "https://indianexpress.com/?s={query}",
-    },
-    "Japan": {
-        "NHK": "https://www3.nhk.or.jp/nhkworld/en/search/?q={query}",
-        "Asahi Shimbun": "https://www.asahi.com/english/search/?q={query}",
-        "Yomiuri Shimbun": "https://www.yomiuri.co.jp/search/?q={query}",
-        "Nikkei Asia": "https://asia.nikkei.com/search?q={query}",
-    },
-    "South Korea": {
-        "Yonhap News": "https://en.yna.co.kr/search/index?query={query}",
-        "The Korea Herald": "http://www.koreaherald.com/search/index.php?query={query}",
-        "The Korea Times": "https://www.koreatimes.co.kr/www2/common/search.asp?kwd={query}",
-    },
-    "China": {
-        "China Daily": "https://www.chinadaily.com.cn/search?query={query}",
-        "Global Times": "https://www.globaltimes.cn/search?keyword={query}",
-        "South China Morning Post": "https://www.scmp.com/search/{query}",
-    },
-    "Middle East": {
-        "Al Jazeera": "https://www.aljazeera.com/Search/?q={query}",
-        "Al Arabiya": "https://english.alarabiya.net/tools/search?query={query}",
-        "Gulf News": "https://gulfnews.com/search?q={query}",
-        "The National (UAE)": "https://www.thenationalnews.com/search?q={query}",
-        "Haaretz": "https://www.haaretz.com/search?q={query}",
-        "Jerusalem Post": "https://www.jpost.com/search?q={query}",
-    },
-    "Africa": {
-        "AllAfrica": "https://allafrica.com/search/?search_string={query}",
-        "Daily Nation": "https://nation.africa/search?q={query}",
-        "Mail & Guardian": "https://mg.co.za/search/?q={query}",
-        "The Guardian Nigeria": "https://guardian.ng/?s={query}",
-    },
-    "Latin America": {
-        "Folha de S.Paulo": "https://search.folha.uol.com.br/?q={query}",
-        "O Globo": "https://oglobo.globo.com/busca/?q={query}",
-        "Clarín": "https://www.clarin.com/tema/{query}.html",
-        "El Universal (Mexico)": "https://www.eluniversal.com.mx/buscador?search_api_fulltext={query}",
-        "La Nación (Argentina)": "https://www.lanacion.com.ar/buscar/?query={query}",
-    },
-}
+import bisect
+import heapq
+import json
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, quote_plus, urlsplit
+
+# {category: {source: url_template}}, or a list of records for large external catalogs
+SOURCES_FILE = os.getenv("NEWS_SOURCES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "news_sources.json"))
+SUGGEST_LIMIT = 10
+
+# index tiers, in ranking order: whole-name prefix, later-word prefix, domain prefix
+NAME, WORD, DOMAIN = 0, 1, 2
+_WORD_START = re.compile(r"(?<!\w)\w")
+
+
+class SearchTemplate(NamedTuple):
+    """A search URL template split around its `{query}` placeholder(s).
+
+    `in_query_string` records whether the placeholder sits after the `?`, which decides
+    the encoding: `quote_plus` for query-string values, `quote(safe='')` for path segments.
+    Templates without a placeholder get `q=` appended to their query string.
+    """
+
+    template: str
+    parts: Tuple[str, ...]
+    in_query_string: bool
+    has_placeholder: bool
+
+    def encode(self, query: str) -> str:
+        if not query:
+            return ""
+        return quote_plus(query) if self.in_query_string else quote(query, safe="")
+
+    def render(self, query: str) -> str:
+        if not self.has_placeholder and not query:
+            return self.template
+        return self.encode(query).join(self.parts)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str) -> SearchTemplate:
+    """Split a URL template into literal parts and pick the encoding for its placeholder."""
+    if "{query}" in template:
+        pos_qmark = template.find("?")
+        in_query_string = pos_qmark != -1 and pos_qmark < template.find("{query}")
+        return SearchTemplate(template, tuple(template.split("{query}")), in_query_string, True)
+    sep = "&" if "?" in template else "?"
+    return SearchTemplate(template, (f"{template}{sep}q=", ""), True, False)
+
+
+def fold(text: str) -> str:
+    """Normalize a name for matching: accents stripped, case-folded, whitespace collapsed."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+
+def source_domain(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class Source(NamedTuple):
+    name: str
+    category: str
+    url: str
+    domain: str
+    key: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"name": self.name, "category": self.category, "domain": self.domain, "url": self.url}
+
+
+class SourceCatalog:
+    """Search sources indexed for autocomplete, paging and reverse lookups.
+
+    Suggestions come from one sorted list of folded keys: each source's full name, the
+    tail of its name from every later word (so "york" finds "The New York Times") and its
+    domain. A prefix query is two bisections plus a scan over the keys that actually
+    match. `by_domain` is a reverse index; categories keep file order.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, str]]):
+        self.sources: List[Source] = []
+        self.categories: Dict[str, List[Source]] = {}
+        self.by_domain: Dict[str, List[Source]] = {}
+        self.mapping: Dict[str, Dict[str, str]] = {}
+        self.compiled: Dict[str, Dict[str, SearchTemplate]] = {}
+        keys = []
+        for record in records:
+            name, category, url = record["name"], record["category"], record["url"]
+            domain = record.get("domain") or source_domain(url)
+            source = Source(name, category, url, domain, fold(name))
+            idx = len(self.sources)
+            self.sources.append(source)
+            self.categories.setdefault(category, []).append(source)
+            if domain:
+                self.by_domain.setdefault(domain, []).append(source)
+                keys.append((domain, DOMAIN, idx))
+            self.mapping.setdefault(category, {})[name] = url
+            self.compiled.setdefault(category, {})[name] = compile_template(url)
+            keys.append((source.key, NAME, idx))
+            for m in _WORD_START.finditer(source.key):
+                if m.start():
+                    keys.append((source.key[m.start():], WORD, idx))
+        keys.sort()
+        self._keys = [k for k, _, _ in keys]
+        self._entries = [(tier, idx) for _, tier, idx in keys]
+
+    @classmethod
+    def load(cls, path: str = SOURCES_FILE) -> "SourceCatalog":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [{"category": cat, "name": name, "url": url} for cat, sources in data.items() for name, url in sources.items()]
+        return cls(data)
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_LIMIT, category: Optional[str] = None) -> List[Source]:
+        """Return up to `limit` sources matching `prefix`, best first, optionally within one category.
+
+        Exact names rank first, then name prefixes, word prefixes and domain prefixes;
+        ties go to the shorter name.
+        """
+        p = fold(prefix)
+        if not p or limit <= 0:
+            return []
+        lo = bisect.bisect_left(self._keys, p)
+        # smallest string greater than every string starting with p
+        hi = bisect.bisect_left(self._keys, p[:-1] + chr(ord(p[-1]) + 1), lo)
+        best: Dict[int, Tuple] = {}
+        for i in range(lo, hi):
+            tier, idx = self._entries[i]
+            source = self.sources[idx]
+            if category is not None and source.category != category:
+                continue
+            rank = (source.key != p, tier, len(source.key), source.key, idx)
+            if idx not in best or rank < best[idx]:
+                best[idx] = rank
+        return [self.sources[idx] for idx in heapq.nsmallest(limit, best, key=best.__getitem__)]
+
+    def page(self, category: str, offset: int = 0, limit: int = 100) -> Tuple[int, List[Source]]:
+        """Return `(total, sources)` for one page of a category. Raises KeyError if unknown."""
+        sources = self.categories.get(category)
+        if sources is None:
+            raise KeyError(f"Unknown category: {category}")
+        return len(sources), sources[offset:offset + limit]
+
+    def lookup_domain(self, host: str) -> List[Source]:
+        """Return sources for `host` or its closest parent domain (news.bbc.co.uk -> bbc.co.uk)."""
+        host = source_domain(host if "//" in host else f"//{host}")
+        while host:
+            sources = self.by_domain.get(host)
+            if sources:
+                return sources
+            _, _, host = host.partition(".")
+        return []
+
+
+_catalog: Optional[SourceCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> SourceCatalog:
+    """Return the catalog, reading and indexing SOURCES_FILE on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = SourceCatalog.load()
+    return _catalog
+
+
+def __getattr__(name: str):
+    # the former module-level dicts, now built lazily from the catalog
+    if name == "NEWS_SOURCES":
+        return get_catalog().mapping
+    if name == "COMPILED_SOURCES":
+        return get_catalog().compiled
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def list_sources() -> Dict[str, Any]:
     """Return the available categories and sources (names only)."""
-    return {cat: list(sources.keys()) for cat, sources in NEWS_SOURCES.items()}
+    return {cat: list(sources.keys()) for cat, sources in get_catalog().mapping.items()}
 
 
 def list_sources_full() -> Dict[str, Dict[str, str]]:
@@ -137,18 +193,49 @@ def list_sources_full() -> Dict[str, Dict[str, str]]:
 
     Useful for clients that want to format URLs locally to avoid extra server round-trips.
     """
-    return NEWS_SOURCES
+    return get_catalog().mapping
 
 
 def get_search_url(category: str, source: str, query: str) -> str:
-    """Return a formatted search URL for the given source and query.
+    """Return an encoded search URL for the given source and query.
 
     Raises KeyError if category/source not found.
     """
-    cat = NEWS_SOURCES.get(category)
+    cat = get_catalog().compiled.get(category)
     if not cat:
         raise KeyError(f"Unknown category: {category}")
     template = cat.get(source)
     if not template:
         raise KeyError(f"Unknown source: {source} in category {category}")
-    return template.format(query=query)
+    return template.render(query)
+
+
+def get_search_urls(query: str, categories: Optional[Iterable[str]] = None, sources: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, str]]:
+    """Return `{category: {source: url}}` for many sources at once.
+
+    `categories` limits the result to those categories (default: all). `sources` limits
+    it to sources with those names within the selected categories.
+    Raises KeyError for unknown categories or for source names that match nothing.
+    """
+    compiled = get_catalog().compiled
+    if categories:
+        for category in categories:
+            if category not in compiled:
+                raise KeyError(f"Unknown category: {category}")
+        selected = {c: compiled[c] for c in categories}
+    else:
+        selected = compiled
+    wanted = set(sources) if sources else None
+    result: Dict[str, Dict[str, str]] = {}
+    found = set()
+    for category, templates in selected.items():
+        urls = {}
+        for name, template in templates.items():
+            if wanted is None or name in wanted:
+                urls[name] = template.render(query)
+                found.add(name)
+        if urls:
+            result[category] = urls
+    if wanted is not None and wanted - found:
+        raise KeyError(f"Unknown source(s): {', '.join(sorted(wanted - found))}")
+    return result
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# NewsAPI top-headlines categories
+NEWSAPI_CATEGORIES = ["business", "entertainment", "general", "health", "science", "sports", "technology"]
+
+
+def build_schedule(countries: List[str], categories: List[str]) -> List[Dict[str, str]]:
+    """Return the cross product of countries x categories as top-headlines filters.
+
+    An empty `categories` list refreshes each country's overall headlines only.
+    """
+    schedule = []
+    for country in countries:
+        if not categories:
+            schedule.append({"country": country})
+        for category in categories:
+            schedule.append({"country": country, "category": category})
+    return schedule
+
+
+class HeadlinePrefetcher:
+    """Periodically refresh a fixed set of queries so user requests hit a warm cache.
+
+    `refresh` is awaited once per query per run; at most `concurrency` refreshes run at a
+    time. Runs are spaced `interval` seconds apart (+/- `jitter` fraction). A query that
+    fails sits out 1, 3, 7, ... runs (up to `max_backoff` seconds' worth) without holding
+    up the others; the delay between runs only doubles while most queries in a run fail,
+    which points at the upstream rather than at one bad query.
+    """
+
+    def __init__(
+        self,
+        queries: List[Dict[str, Any]],
+        refresh: Callable[[Dict[str, Any]], Awaitable[Any]],
+        interval: float = 300.0,
+        jitter: float = 0.1,
+        concurrency: int = 4,
+        max_backoff: float = 3600.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.queries = queries
+        self.refresh = refresh
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = max(1, concurrency)
+        self.max_backoff = max_backoff
+        self._rng = rng or random.Random()
+        # per query index: consecutive failures, and the run number it may next be tried in
+        self._query_failures: Dict[int, int] = {}
+        self._retry_at_run: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.consecutive_failures = 0
+        self.last_run_started: Optional[float] = None
+        self.last_run_duration: Optional[float] = None
+        self.last_run_errors = 0
+        self.last_error: Optional[str] = None
+        self.next_run_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running and self.queries:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def next_delay(self) -> float:
+        delay = self.interval * (2 ** self.consecutive_failures)
+        delay = min(delay, max(self.interval, self.max_backoff))
+        return max(0.0, delay * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+
+    def _record(self, index: int, ok: bool):
+        if ok:
+            self._query_failures.pop(index, None)
+            self._retry_at_run.pop(index, None)
+            return
+        failures = self._query_failures.get(index, 0) + 1
+        self._query_failures[index] = failures
+        max_skip = int(self.max_backoff // self.interval) if self.interval > 0 else 0
+        self._retry_at_run[index] = self.runs + 1 + min(2 ** failures - 1, max_skip)
+
+    async def run_once(self):
+        """Refresh every query that is not backing off, bounded by the concurrency limit."""
+        sem = asyncio.Semaphore(self.concurrency)
+        errors = 0
+        outcomes: Dict[int, bool] = {}
+
+        async def one(index, params):
+            nonlocal errors
+            async with sem:
+                try:
+                    await self.refresh(params)
+                    outcomes[index] = True
+                except Exception as e:
+                    errors += 1
+                    outcomes[index] = False
+                    self.last_error = f"{params}: {e!r}"
+                    logger.warning("Prefetch failed for %s: %r", params, e)
+
+        due = [(i, p) for i, p in enumerate(self.queries) if self._retry_at_run.get(i, 0) <= self.runs]
+        self.last_run_started = time.time()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i, p) for i, p in due))
+        self.last_run_duration = time.perf_counter() - started
+        self.last_run_errors = errors
+        for index, ok in outcomes.items():
+            self._record(index, ok)
+        self.runs += 1
+        self.consecutive_failures = self.consecutive_failures + 1 if due and errors * 2 > len(due) else 0
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            delay = self.next_delay()
+            self.next_run_at = time.time() + delay
+            await asyncio.sleep(delay)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queries": len(self.queries),
+            "interval": self.interval,
+            "concurrency": self.concurrency,
+            "runs": self.runs,
+            "consecutive_failures": self.consecutive_failures,
+            "backing_off": sum(1 for run in self._retry_at_run.values() if run > self.runs),
+            "last_run_started": self.last_run_started,
+            "last_run_duration": self.last_run_duration,
+            "last_run_errors": self.last_run_errors,
+            "last_error": self.last_error,
+            "next_run_at": self.next_run_at,
+        }
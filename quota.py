@@ -0,0 +1,202 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class QuotaExhausted(Exception):
+    """No API key can serve the request within its wait limit (rate or daily budget spent)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def _seconds_until_utc_midnight() -> float:
+    now = datetime.now(timezone.utc)
+    return 86400 - (now.hour * 3600 + now.minute * 60 + now.second)
+
+
+# Cooldown after an upstream 429 that is not a spent daily quota: doubles per consecutive 429
+COOLDOWN_BASE = 5.0
+COOLDOWN_MAX = 300.0
+
+
+class KeyState:
+    """Token bucket, daily budget and 429 cooldown for a single API key."""
+
+    def __init__(self, key: str, rate: float, burst: float, daily_budget: int, index: int = 0):
+        self.key = key
+        self.index = index
+        self.rate = rate
+        self.burst = burst
+        self.daily_budget = daily_budget
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.day = _today()
+        self.used_today = 0
+        self.exhausted_day: Optional[str] = None
+        self.upstream_429s = 0
+        self.cooldown_until = 0.0
+        self.consecutive_429s = 0
+
+    @property
+    def label(self) -> str:
+        # position in NEWSAPI_KEY; no part of the key itself is ever exposed
+        return f"key{self.index}"
+
+    def refresh(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        today = _today()
+        if today != self.day:
+            self.day = today
+            self.used_today = 0
+        if self.exhausted_day is not None and self.exhausted_day != today:
+            self.exhausted_day = None
+
+    def remaining(self) -> Optional[int]:
+        """Requests left today, or None when the budget is unlimited."""
+        if self.exhausted_day is not None:
+            return 0
+        if not self.daily_budget:
+            return None
+        return max(0, self.daily_budget - self.used_today)
+
+    def cooldown(self, now: float) -> float:
+        return max(0.0, self.cooldown_until - now)
+
+    def ready(self, now: float) -> bool:
+        return self.tokens >= 1 and self.cooldown_until <= now
+
+    def token_wait(self, now: float) -> float:
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.cooldown(now))
+
+
+class UpstreamScheduler:
+    """Hand out API keys under per-key rate limits and daily budgets.
+
+    Keys are rotated by remaining daily budget. Background requests never take a token
+    while interactive requests are waiting, and they may not spend the last
+    `background_reserve` fraction of a key's daily budget. `acquire` waits up to the
+    priority's `max_wait` seconds for a token and raises QuotaExhausted otherwise.
+    A key that got an upstream 429 sits out a cooldown that doubles with each consecutive
+    429; only a spent daily quota takes it out of rotation until UTC midnight.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        rate: float = 5.0,
+        burst: float = 10.0,
+        daily_budget: int = 0,
+        background_reserve: float = 0.2,
+        max_wait: Optional[Dict[str, float]] = None,
+    ):
+        self.keys = [KeyState(k, rate, burst, daily_budget, i) for i, k in enumerate(keys)]
+        self.background_reserve = background_reserve
+        self.max_wait = {INTERACTIVE: 2.0, BACKGROUND: 30.0, **(max_wait or {})}
+        self._interactive_waiting = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def _eligible(self, state: KeyState, priority: str) -> bool:
+        remaining = state.remaining()
+        if remaining is None:
+            return True
+        if priority == BACKGROUND:
+            return remaining > state.daily_budget * self.background_reserve
+        return remaining > 0
+
+    def _pick(self, priority: str) -> List[KeyState]:
+        now = time.monotonic()
+        candidates = []
+        for state in self.keys:
+            state.refresh(now)
+            if self._eligible(state, priority):
+                candidates.append(state)
+        # most remaining budget first; unlimited keys sort first
+        candidates.sort(key=lambda s: (s.remaining() is not None, -(s.remaining() or 0), -s.tokens))
+        return candidates
+
+    async def acquire(self, priority: str = INTERACTIVE) -> KeyState:
+        deadline = time.monotonic() + self.max_wait[priority]
+        if priority == INTERACTIVE:
+            self._interactive_waiting += 1
+        try:
+            while True:
+                candidates = self._pick(priority)
+                if not candidates:
+                    raise QuotaExhausted("Daily NewsAPI budget exhausted for all keys", _seconds_until_utc_midnight())
+                yield_to_interactive = priority == BACKGROUND and self._interactive_waiting > 0
+                now = time.monotonic()
+                if not yield_to_interactive:
+                    for state in candidates:
+                        if state.ready(now):
+                            state.tokens -= 1
+                            state.used_today += 1
+                            return state
+                wait = min(s.token_wait(now) for s in candidates) or 0.05
+                if time.monotonic() + wait > deadline:
+                    raise QuotaExhausted("NewsAPI rate limit reached for all keys", wait)
+                await asyncio.sleep(wait)
+        finally:
+            if priority == INTERACTIVE:
+                self._interactive_waiting -= 1
+
+    def try_acquire(self, priority: str = BACKGROUND) -> Optional[KeyState]:
+        """Take a token only if one is available right now (used for optional extra calls)."""
+        if priority == BACKGROUND and self._interactive_waiting > 0:
+            return None
+        now = time.monotonic()
+        for state in self._pick(priority):
+            if state.ready(now):
+                state.tokens -= 1
+                state.used_today += 1
+                return state
+        return None
+
+    def report_rate_limited(self, state: KeyState, exhausted: bool = False, retry_after: Optional[float] = None):
+        """Back a key off after an upstream 429.
+
+        `exhausted=True` (NewsAPI's `apiKeyExhausted`) marks the key spent until UTC
+        midnight. Otherwise the key cools down for COOLDOWN_BASE seconds, doubling per
+        consecutive 429 up to COOLDOWN_MAX, or for the upstream's `retry_after` if longer.
+        """
+        state.upstream_429s += 1
+        if exhausted:
+            state.exhausted_day = _today()
+            return
+        cooldown = min(COOLDOWN_BASE * 2 ** state.consecutive_429s, COOLDOWN_MAX)
+        state.consecutive_429s += 1
+        state.cooldown_until = time.monotonic() + max(cooldown, retry_after or 0.0)
+
+    def report_success(self, state: KeyState):
+        """Reset a key's 429 backoff after a request it served went through."""
+        state.consecutive_429s = 0
+
+    def status(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        out = []
+        for state in self.keys:
+            state.refresh(now)
+            out.append({
+                "key": state.label,
+                "daily_budget": state.daily_budget or None,
+                "used_today": state.used_today,
+                "remaining_today": state.remaining(),
+                "tokens": round(state.tokens, 2),
+                "upstream_429s": state.upstream_429s,
+                "cooldown": round(state.cooldown(now), 1),
+                "exhausted": state.exhausted_day is not None,
+            })
+        return out
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream could not produce a response in time; callers may fall back to stale data."""
+
+    status_code = 502
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        if status_code is not None:
+            self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpen(UpstreamUnavailable):
+    status_code = 503
+
+
+class BudgetExceeded(UpstreamUnavailable):
+    status_code = 504
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures instead of making every caller wait.
+
+    After `failure_threshold` consecutive failures the circuit opens and `check()` raises
+    CircuitOpen for `reset_timeout` seconds. The first call after that is let through as a
+    probe (half-open); its success closes the circuit, its failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_inflight = False
+
+    def check(self) -> bool:
+        """Raise CircuitOpen unless a call may go ahead; returns True if that call is the probe."""
+        if self.state == CLOSED:
+            return False
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if self.state == OPEN and remaining <= 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probe_inflight:
+            self._probe_inflight = True
+            return True
+        raise CircuitOpen(f"Circuit for {self.name} is open", retry_after=max(remaining, 1.0))
+
+    def release(self):
+        """Free the half-open probe slot when the probe ended without a success or failure."""
+        self._probe_inflight = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._probe_inflight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_inflight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent upstream latencies for one path, used to pick the hedge delay."""
+
+    def __init__(self, window: int = 256, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._p95: Optional[float] = None
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self._p95 = None
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        if self._p95 is None:
+            ordered = sorted(self.samples)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return self._p95
+
+    def hedge_delay(self, default: float, floor: float, ceiling: float) -> float:
+        p95 = self.p95()
+        return min(max(p95 if p95 is not None else default, floor), ceiling)
+
+
+async def hedged(
+    call: Callable[[], Awaitable[Any]],
+    delay: float,
+    hedge: Optional[Callable[[], Optional[Callable[[], Awaitable[Any]]]]] = None,
+    on_hedge_won: Optional[Callable[[], None]] = None,
+) -> Any:
+    """Await `call()`; if it has not finished after `delay` seconds, race a second attempt.
+
+    `hedge()` returns the coroutine function for the duplicate attempt, or None to skip
+    hedging (e.g. when no spare quota is available); by default `call` is reused. The first
+    attempt to succeed wins and the other is cancelled. If one attempt fails the other is
+    still awaited; the error is raised only when both fail. `on_hedge_won()` is called when
+    the duplicate succeeds while the first attempt is still running.
+    """
+    primary = asyncio.ensure_future(call())
+    attempts = {primary}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=delay)
+        if not done:
+            second_call = hedge() if hedge is not None else call
+            if second_call is not None:
+                attempts.add(asyncio.ensure_future(second_call()))
+        error: Optional[BaseException] = None
+        while attempts:
+            done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+            # look at every finished attempt so no exception goes unretrieved
+            winners = [task for task in done if task.exception() is None]
+            for task in done:
+                error = task.exception() or error
+            if winners:
+                if primary in winners:
+                    return primary.result()
+                if on_hedge_won is not None and not primary.done():
+                    on_hedge_won()
+                return winners[0].result()
+        raise error
+    finally:
+        for task in attempts:
+            task.cancel()
+
+
+def breaker_status(breakers: Dict[str, CircuitBreaker]) -> Dict[str, Dict[str, Any]]:
+    return {
+        name: {"state": b.state, "consecutive_failures": b.failures, "times_opened": b.times_opened}
+        for name, b in breakers.items()
+    }
@@ -0,0 +1,268 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple, Type
+
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def cache_key(path: str, params: Dict[str, Any]) -> CacheKey:
+    """Return a normalized, hashable key for an upstream request.
+
+    Parameter names and values are lowercased and sorted; empty values are dropped so
+    `?country=us&q=` and `?q=&country=US` share an entry. Callers must apply their
+    defaults (e.g. `country=us`, `pageSize=50`) before building the key.
+    """
+    items = []
+    for k, v in params.items():
+        if v is None or v == "":
+            continue
+        items.append((str(k).lower(), str(v).strip().lower()))
+    items.sort()
+    return path, tuple(items)
+
+
+class CacheEntry:
+    __slots__ = ("value", "stored_at")
+
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        # wall-clock time so entries can be shared between processes
+        self.stored_at = stored_at
+
+    def age(self, now: Optional[float] = None) -> float:
+        return max(0.0, (now if now is not None else time.time()) - self.stored_at)
+
+
+class MemoryBackend:
+    """In-process LRU storage for a ResponseCache (the default backend)."""
+
+    shared = False
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, CacheEntry]" = OrderedDict()
+        self._locks: Dict[Any, int] = {}
+        self._tokens = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def approx_len(self) -> int:
+        return len(self._data)
+
+    def get(self, key) -> Optional[CacheEntry]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key, entry: CacheEntry, expires_in: float):
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def try_lock(self, key, ttl: float) -> Optional[Hashable]:
+        """Return a token for the key's lock, or None if it is already held."""
+        if key in self._locks:
+            return None
+        token = self._locks[key] = next(self._tokens)
+        return token
+
+    def unlock(self, key, token: Hashable):
+        """Release the key's lock if `token` still holds it."""
+        if self._locks.get(key) == token:
+            del self._locks[key]
+
+
+class ResponseCache:
+    """Bounded LRU cache with a TTL and a stale-while-revalidate window.
+
+    Entries younger than `ttl` are served as HIT. Entries older than `ttl` but within
+    `ttl + stale_ttl` are served as STALE while a single background task refreshes them;
+    anything older is treated as a MISS and fetched inline. Expired entries are kept until
+    LRU eviction so they can still be served if the inline fetch fails (`stale_if_error`).
+
+    Storage is pluggable: `backend` defaults to an in-process MemoryBackend; a shared
+    backend (see shared_cache.SharedCacheBackend) lets several worker processes use one
+    cache, and its cross-process lock ensures only one of them refreshes a given key.
+    Shared-backend I/O runs in a worker thread, and concurrent misses for one key in this
+    process are coalesced before any of them waits on the cross-process lock.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        backend=None,
+        lock_wait: float = 5.0,
+        lock_ttl: float = 30.0,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.backend = backend if backend is not None else MemoryBackend(maxsize)
+        # how long a worker waits for another worker's in-flight fetch of the same key, and
+        # how long a lock survives a worker that died while holding it
+        self.lock_wait = lock_wait
+        self.lock_ttl = lock_ttl
+        self._tasks: Set[asyncio.Task] = set()
+        self._misses = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    def approx_len(self) -> int:
+        """Entry count without blocking I/O (exact for the memory backend), for metrics."""
+        return self.backend.approx_len()
+
+    def lookup(self, key) -> Tuple[Optional[CacheEntry], str]:
+        """Return `(entry, state)` without fetching; `state` is HIT, STALE or MISS.
+
+        On a MISS `entry` is the expired entry, if one is still held, else None.
+        """
+        return self._classify(self.backend.get(key))
+
+    def _classify(self, entry: Optional[CacheEntry]) -> Tuple[Optional[CacheEntry], str]:
+        if entry is None:
+            return None, MISS
+        age = entry.age()
+        if age < self.ttl:
+            return entry, HIT
+        if age < self.ttl + self.stale_ttl:
+            return entry, STALE
+        return entry, MISS
+
+    def set(self, key, value: Any):
+        self.backend.set(key, CacheEntry(value, time.time()), self.ttl + self.stale_ttl)
+
+    def clear(self):
+        self.backend.clear()
+
+    async def _io(self, fn: Callable, *args):
+        # a shared backend does file I/O that may wait on other processes' writes
+        if self.backend.shared:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def lookup_async(self, key) -> Tuple[Optional[CacheEntry], str]:
+        """`lookup` without blocking the event loop on a shared backend."""
+        return self._classify(await self._io(self.backend.get, key))
+
+    async def set_async(self, key, value: Any):
+        await self._io(self.set, key, value)
+
+    def set_soon(self, key, value: Any):
+        """Store `value` from synchronous code running on the event loop (e.g. a done callback)."""
+        self._spawn(self.set_async(key, value))
+
+    async def try_lock(self, key) -> Optional[Hashable]:
+        """Take the key's refresh lock; returns the token to unlock with, or None if held."""
+        return await self._io(self.backend.try_lock, key, self.lock_ttl)
+
+    async def unlock(self, key, token: Optional[Hashable]):
+        """Release a lock taken with `try_lock`; a None token (lock not taken) is a no-op."""
+        if token is not None:
+            await self._io(self.backend.unlock, key, token)
+
+    async def get_or_fetch(
+        self,
+        key,
+        fetch: Callable[[], Awaitable[Any]],
+        refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+        stale_if_error: Tuple[Type[BaseException], ...] = (),
+    ) -> Tuple[Any, str, float]:
+        """Return `(value, state, age_seconds)`, calling `fetch` on a miss.
+
+        A stale entry is returned immediately and `refresh` (default: `fetch`) is scheduled
+        in the background, so a refresh never blocks the caller. If `fetch` raises one of
+        `stale_if_error` and an expired entry is still held, that entry is served as STALE.
+        Concurrent misses for the same key share one fetch.
+        """
+        entry, state = await self.lookup_async(key)
+        if state == HIT:
+            self.hits += 1
+            return entry.value, HIT, entry.age()
+        if state == STALE:
+            self.stale_hits += 1
+            self._schedule_refresh(key, refresh or fetch)
+            return entry.value, STALE, entry.age()
+        return await self._misses.do(key, lambda: self._fetch_miss(key, entry, fetch, stale_if_error))
+
+    async def _fetch_miss(self, key, entry: Optional[CacheEntry], fetch, stale_if_error) -> Tuple[Any, str, float]:
+        token = None
+        if self.backend.shared:
+            # another worker may already be fetching this key; wait for its result
+            token, waited = await self._wait_for_other_worker(key)
+            if waited is not None:
+                self.hits += 1
+                return waited.value, HIT, waited.age()
+        self.misses += 1
+        try:
+            value = await fetch()
+            # store before unlocking so waiting workers find the entry, not a free lock
+            await self.set_async(key, value)
+        except stale_if_error:
+            if entry is None:
+                raise
+            self.stale_hits += 1
+            return entry.value, STALE, entry.age()
+        finally:
+            await self.unlock(key, token)
+        return value, MISS, 0.0
+
+    async def _wait_for_other_worker(self, key) -> Tuple[Optional[Hashable], Optional[CacheEntry]]:
+        """Take the key's lock, or poll until the lock holder stores a fresh entry.
+
+        Returns `(token, None)` once this worker holds the lock, `(None, entry)` when the
+        holder stored a fresh entry, or `(None, None)` if it gave up waiting and should
+        fetch without the lock.
+        """
+        deadline = time.monotonic() + self.lock_wait
+        while True:
+            token = await self.try_lock(key)
+            if token is not None:
+                return token, None
+            if time.monotonic() >= deadline:
+                return None, None
+            await asyncio.sleep(0.05)
+            entry, state = await self.lookup_async(key)
+            if state == HIT:
+                return None, entry
+
+    def _schedule_refresh(self, key, fetch: Callable[[], Awaitable[Any]]):
+        async def refresh():
+            token = await self.try_lock(key)
+            if token is None:
+                return
+            try:
+                await self.set_async(key, await fetch())
+            except Exception as e:
+                logger.warning("Background refresh failed for %s: %r", key, e)
+            finally:
+                await self.unlock(key, token)
+
+        self._spawn(refresh())
+
+    def _spawn(self, coro: Awaitable[Any]):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,202 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed (compression would cost more than it saves)
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Keys of a NewsAPI article object; `fields=` may select any of them
+ARTICLE_FIELDS = ("source", "author", "title", "description", "url", "urlToImage", "publishedAt", "content")
+# Keys added by this server (e.g. `dedupe=true`, `enrich=true`); kept through projection when present
+DERIVED_FIELDS = ("duplicates", "matched", "enrichment")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize `obj` to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated `fields=` value; returns None when no projection is requested.
+
+    Raises ValueError for names that are not NewsAPI article keys.
+    """
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [n for n in names if n not in ARTICLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown article field(s): {', '.join(unknown)}. Allowed: {', '.join(ARTICLE_FIELDS)}")
+    return names or None
+
+
+def project_article(article: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return article
+    out = {f: article.get(f) for f in fields}
+    for f in DERIVED_FIELDS:
+        if f in article:
+            out[f] = article[f]
+    return out
+
+
+def project_articles(data: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Return a copy of a NewsAPI response with each article trimmed to `fields`.
+
+    The input is left untouched, so it is safe to call on cached responses.
+    """
+    if fields is None or not isinstance(data.get("articles"), list):
+        return data
+    out = dict(data)
+    out["articles"] = [project_article(a, fields) for a in data["articles"]]
+    return out
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick `br` or `gzip` from an Accept-Encoding header, preferring brotli when available."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        token, *opts = part.split(";")
+        q = 1.0
+        for opt in opts:
+            key, _, value = opt.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(token.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def make_etag(body: bytes) -> str:
+    """Return a weak ETag for a JSON body (weak because the same entity may be sent gzip/br/identity)."""
+    return 'W/"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists `etag` (weak comparison) or is `*`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    headers = dict(headers or {})
+    headers["ETag"] = etag
+    headers["Vary"] = "Accept-Encoding"
+    return Response(status_code=304, headers=headers)
+
+
+def json_response(
+    request: Request,
+    data: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+    etag: bool = False,
+) -> Response:
+    """Serialize `data` and compress it when the client accepts it and it is large enough.
+
+    With `etag=True` the response carries an ETag and a matching If-None-Match gets a 304.
+    """
+    body = dumps(data)
+    headers = dict(headers or {})
+    if etag:
+        tag = make_etag(body)
+        if etag_matches(request, tag):
+            return not_modified(tag, headers)
+        headers["ETag"] = tag
+    headers["Vary"] = "Accept-Encoding"
+    if len(body) >= COMPRESS_MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+class PrecomputedBody:
+    """A response body that is hashed and compressed once, then served as bytes.
+
+    Use it for content that never changes while the process runs (e.g. the source catalog,
+    the rendered index page, static assets). Bodies below COMPRESS_MIN_SIZE, or created
+    with `compressible=False` (already-compressed images), are always sent as-is.
+    """
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str, compressible: bool = True):
+        self.body = body
+        self.media_type = media_type
+        self.etag = make_etag(self.body)
+        self.cache_control = cache_control
+        self.encoded = {}
+        if compressible and len(body) >= COMPRESS_MIN_SIZE:
+            self.encoded["gzip"] = compress(self.body, "gzip")
+            if brotli is not None:
+                self.encoded["br"] = compress(self.body, "br")
+
+    def response(self, request: Request, cache_control: Optional[str] = None) -> Response:
+        headers = {"Cache-Control": cache_control or self.cache_control}
+        if etag_matches(request, self.etag):
+            return not_modified(self.etag, headers)
+        headers["ETag"] = self.etag
+        body = self.body
+        if self.encoded:
+            headers["Vary"] = "Accept-Encoding"
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+            if encoding in self.encoded:
+                body = self.encoded[encoding]
+                headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+class PrecomputedJSON(PrecomputedBody):
+    """A JSON document serialized once and served through PrecomputedBody."""
+
+    def __init__(self, data: Any, cache_control: str):
+        super().__init__(dumps(data), "application/json", cache_control)
@@ -0,0 +1,196 @@
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from response_cache import CacheEntry
+from serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_entries_lru ON cache_entries(ns, last_access);
+CREATE TABLE IF NOT EXISTS cache_locks (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+"""
+
+# last_access is only rewritten when older than this, so hits stay read-only
+TOUCH_INTERVAL = 10.0
+# run size-bound eviction once every this many writes
+EVICT_EVERY = 64
+# how long a statement waits for another process's write lock before giving up (seconds)
+BUSY_TIMEOUT = 0.25
+
+
+class SharedCacheBackend:
+    """ResponseCache storage in a WAL-mode SQLite file shared by all workers on a host.
+
+    Every statement runs in autocommit mode, so each write is atomic and readers never
+    block. Decoded values are memoized per process by `(key, stored_at)`, so a hit costs a
+    single primary-key lookup plus, only when another worker refreshed the entry, one
+    JSON decode. `try_lock`/`unlock` implement a lease in the same file so only one
+    worker refreshes a key; each lease carries a per-call token, and a lease left by a
+    dead worker expires after its TTL. Methods are blocking and thread-safe (one
+    connection per thread); ResponseCache calls them from worker threads.
+    Database errors are logged and degrade to a miss rather than failing the request.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, namespace: str, maxsize: int, memo_size: int = 256, busy_timeout: float = BUSY_TIMEOUT):
+        self.path = path
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.busy_timeout = busy_timeout
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._tokens = itertools.count(1)
+        self._memo: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._memo_size = memo_size
+        self._memo_lock = threading.Lock()
+        self._writes = 0
+        self._local = threading.local()
+        # the schema is created once, with a generous timeout since it runs at startup
+        conn = sqlite3.connect(path, isolation_level=None, timeout=5.0)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._approx_len = conn.execute("SELECT COUNT(*) FROM cache_entries WHERE ns = ?", (namespace,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=self.busy_timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(key: Any) -> str:
+        return dumps(key).decode("utf-8")
+
+    def __len__(self) -> int:
+        row = self._conn.execute("SELECT COUNT(*) FROM cache_entries WHERE ns = ?", (self.namespace,)).fetchone()
+        return row[0]
+
+    def approx_len(self) -> int:
+        """Entry count as of the last eviction pass plus this process's new keys since; no I/O."""
+        return self._approx_len
+
+    def get(self, key) -> Optional[CacheEntry]:
+        k = self._key(key)
+        try:
+            row = self._conn.execute(
+                "SELECT stored_at, last_access, value FROM cache_entries WHERE ns = ? AND key = ?",
+                (self.namespace, k),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Shared cache read failed: %r", e)
+            return None
+        with self._memo_lock:
+            if row is None:
+                self._memo.pop(k, None)
+                return None
+            stored_at, last_access, value = row
+            entry = self._memo.get(k)
+            if entry is None or entry.stored_at != stored_at:
+                entry = CacheEntry(loads(value), stored_at)
+                self._memo[k] = entry
+                while len(self._memo) > self._memo_size:
+                    self._memo.popitem(last=False)
+            self._memo.move_to_end(k)
+        now = time.time()
+        if now - last_access > TOUCH_INTERVAL:
+            self._execute("UPDATE cache_entries SET last_access = ? WHERE ns = ? AND key = ?", (now, self.namespace, k))
+        return entry
+
+    def set(self, key, entry: CacheEntry, expires_in: float):
+        k = self._key(key)
+        ok = self._execute(
+            "INSERT OR REPLACE INTO cache_entries (ns, key, value, stored_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, k, dumps(entry.value), entry.stored_at, entry.stored_at),
+        )
+        with self._memo_lock:
+            if ok:
+                if k not in self._memo:
+                    self._approx_len += 1
+                self._memo[k] = entry
+            self._writes += 1
+            evict = self._writes % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries beyond `maxsize`."""
+        self._execute(
+            """
+            DELETE FROM cache_entries WHERE ns = ? AND key IN (
+                SELECT key FROM cache_entries WHERE ns = ? ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.namespace, self.namespace, self.maxsize),
+        )
+        try:
+            self._approx_len = len(self)
+        except sqlite3.Error as e:
+            logger.warning("Shared cache count failed: %r", e)
+
+    def clear(self):
+        self._execute("DELETE FROM cache_entries WHERE ns = ?", (self.namespace,))
+        with self._memo_lock:
+            self._memo.clear()
+            self._approx_len = 0
+
+    def try_lock(self, key, ttl: float) -> Optional[str]:
+        """Take the key's lease; returns the token to `unlock` with, or None if it is held."""
+        now = time.time()
+        token = f"{self.owner}-{next(self._tokens)}"
+        try:
+            cur = self._conn.execute(
+                """
+                INSERT INTO cache_locks (ns, key, owner, expires_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(ns, key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE cache_locks.expires_at < ?
+                """,
+                (self.namespace, self._key(key), token, now + ttl, now),
+            )
+        except sqlite3.Error as e:
+            # without a working lock, fetching is better than waiting forever
+            logger.warning("Shared cache lock failed: %r", e)
+            return token
+        return token if cur.rowcount == 1 else None
+
+    def unlock(self, key, token: str):
+        """Release the key's lease if `token` still holds it."""
+        self._execute(
+            "DELETE FROM cache_locks WHERE ns = ? AND key = ? AND owner = ?",
+            (self.namespace, self._key(key), token),
+        )
+
+    def _execute(self, sql: str, args: tuple) -> bool:
+        try:
+            self._conn.execute(sql, args)
+        except sqlite3.Error as e:
+            logger.warning("Shared cache write failed: %r", e)
+            return False
+        return True
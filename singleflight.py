@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single upstream call.
+
+    The first caller for a key starts the call as a task; callers arriving while it is
+    in flight await the same task and receive its result or exception. The task is
+    shielded, so a cancelled caller (e.g. a disconnected client) does not cancel the
+    call for everyone else.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, List[Any]] = {}
+        self.flights = 0
+        self.merged = 0
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        slot = self._inflight.get(key)
+        if slot is not None:
+            slot[1] += 1
+            self.merged += 1
+            return await asyncio.shield(slot[0])
+
+        task = asyncio.get_running_loop().create_task(fn())
+        slot = [task, 1]
+        self._inflight[key] = slot
+        self.flights += 1
+
+        def done(_task):
+            self._inflight.pop(key, None)
+            if not _task.cancelled():
+                # mark the exception retrieved even if every caller went away
+                _task.exception()
+            if slot[1] > 1:
+                logger.debug("single-flight %s served %d callers with one call", key, slot[1])
+
+        task.add_done_callback(done)
+        return await asyncio.shield(task)
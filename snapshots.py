@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_CONCURRENCY = int(os.getenv("SNAPSHOT_CONCURRENCY", "16"))
+SNAPSHOT_TIMEOUT = float(os.getenv("SNAPSHOT_TIMEOUT", "15"))
+SNAPSHOT_MAX_BYTES = int(os.getenv("SNAPSHOT_MAX_BYTES", str(10 * 1024 * 1024)))
+USER_AGENT = "news-source-snapshot/1.0"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session TEXT NOT NULL,
+    url TEXT NOT NULL,
+    sha256 TEXT,
+    status INTEGER,
+    content_type TEXT,
+    size INTEGER,
+    error TEXT,
+    fetched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_session ON snapshots(session, fetched_at);
+"""
+
+
+class SnapshotStore:
+    """Gzip-compressed, content-addressed page bodies plus an index linking them to sessions.
+
+    Bodies live at `<root>/objects/<sha[:2]>/<sha>.gz`, keyed by the SHA-256 of the raw
+    bytes, so identical pages fetched for different rows or sessions are stored once.
+    `<root>/index.db` records every fetch (including failures) under its session name.
+    """
+
+    def __init__(self, root: str = SNAPSHOT_DIR):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.gz")
+
+    def put(self, body: bytes) -> str:
+        """Store `body` (if not already present) and return its SHA-256 hex digest."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.path_for(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp, path)
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        with open(self.path_for(digest), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def record(self, session: str, url: str, digest: Optional[str], status: Optional[int], content_type: str, size: int, error: str = ""):
+        fetched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO snapshots (session, url, sha256, status, content_type, size, error, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session, url, digest, status, content_type, size, error or None, fetched_at),
+            )
+
+    def list_snapshots(self, session: str) -> List[Dict]:
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT url, sha256, status, content_type, size, error, fetched_at FROM snapshots WHERE session = ? ORDER BY fetched_at DESC, id DESC",
+                (session,),
+            )
+            columns = [c[0] for c in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def sessions(self) -> List[Dict]:
+        """Return `{'session', 'count', 'last_fetched_at'}` for every session with snapshots, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session, COUNT(*), MAX(fetched_at) FROM snapshots GROUP BY session ORDER BY MAX(fetched_at) DESC, MAX(id) DESC"
+            ).fetchall()
+        return [{"session": s, "count": n, "last_fetched_at": last} for s, n, last in rows]
+
+    def open_copy(self, digest: str, content_type: str = "", directory: Optional[str] = None) -> str:
+        """Write the stored body to a plain file a browser can open and return its path.
+
+        The extension follows `content_type` so the page renders as HTML, PDF, etc. Copies go
+        to a per-user temp directory by default and are reused when already present.
+        """
+        directory = directory or os.path.join(tempfile.gettempdir(), "news-source-snapshots")
+        os.makedirs(directory, exist_ok=True)
+        ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) if content_type else None
+        path = os.path.join(directory, f"{digest}{ext or '.html'}")
+        if not os.path.exists(path):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(self.read(digest))
+            os.replace(tmp, path)
+        return path
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _make_session(concurrency: int) -> requests.Session:
+    http = requests.Session()
+    # one pooled connection per worker so concurrent fetches to the same host reuse sockets
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    http.mount("http://", adapter)
+    http.mount("https://", adapter)
+    http.headers["User-Agent"] = USER_AGENT
+    return http
+
+
+def _fetch_one(http: requests.Session, store: SnapshotStore, session: str, url: str, timeout: float) -> Dict:
+    try:
+        with http.get(url, timeout=timeout, stream=True) as r:
+            chunks = []
+            size = 0
+            for chunk in r.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > SNAPSHOT_MAX_BYTES:
+                    raise ValueError(f"body larger than {SNAPSHOT_MAX_BYTES} bytes")
+                chunks.append(chunk)
+            body = b"".join(chunks)
+            digest = store.put(body)
+            content_type = r.headers.get("Content-Type", "")
+            store.record(session, url, digest, r.status_code, content_type, size)
+            return {"url": url, "sha256": digest, "status": r.status_code, "size": size, "error": ""}
+    except Exception as e:
+        store.record(session, url, None, None, "", 0, repr(e))
+        return {"url": url, "sha256": None, "status": None, "size": 0, "error": repr(e)}
+
+
+def fetch_snapshots(
+    urls: Iterable[str],
+    store: SnapshotStore,
+    session: str,
+    concurrency: int = SNAPSHOT_CONCURRENCY,
+    timeout: float = SNAPSHOT_TIMEOUT,
+    progress: Optional[Callable[[int, int, Dict], None]] = None,
+) -> List[Dict]:
+    """Download every URL on a bounded thread pool and store the bodies under `session`.
+
+    Duplicate URLs are fetched once. `progress(done, total, result)` is called after each
+    URL from the thread running this function; GUI callers run it in a background thread
+    and hand progress back to their own.
+    Per-URL failures are recorded and returned, never raised.
+    """
+    unique = list(dict.fromkeys(u for u in urls if u))
+    results = []
+    if not unique:
+        return results
+    with _make_session(concurrency) as http, ThreadPoolExecutor(max_workers=min(concurrency, len(unique))) as pool:
+        futures = [pool.submit(_fetch_one, http, store, session, url, timeout) for url in unique]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if progress is not None:
+                progress(len(results), len(unique), result)
+    return results
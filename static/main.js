@@ -1,19 +1,60 @@
+// only the article fields renderArticles uses; keeps responses small
+const ARTICLE_FIELDS = 'source,title,description,url,urlToImage,publishedAt';
+
 async function fetchTop(country) {
-  const params = new URLSearchParams();
+  const params = new URLSearchParams({ fields: ARTICLE_FIELDS });
   if (country) params.set('country', country);
   const res = await fetch('/api/top?' + params.toString());
   return res.json();
 }
 
 async function fetchSearch(q) {
-  const params = new URLSearchParams({ q });
+  const params = new URLSearchParams({ q, fields: ARTICLE_FIELDS });
   const res = await fetch('/api/search?' + params.toString());
   return res.json();
 }
 
-async function fetchSources() {
-  const res = await fetch('/api/sources');
-  return res.json();
+async function fetchSourceCategories() {
+  const res = await fetch('/api/sources/categories');
+  return (await res.json()).categories;
+}
+
+// {category: {source: url_template}}, filled one category at a time as it is shown
+const sources = {};
+
+async function loadCategorySources(cat) {
+  if (sources[cat]) return sources[cat];
+  const templates = {};
+  let offset = 0;
+  while (offset !== null) {
+    const params = new URLSearchParams({ offset: String(offset), limit: '500' });
+    const res = await fetch('/api/sources/categories/' + encodeURIComponent(cat) + '?' + params.toString());
+    if (!res.ok) break;
+    const page = await res.json();
+    for (const s of page.sources) templates[s.name] = s.url;
+    offset = page.next_offset;
+  }
+  sources[cat] = templates;
+  return templates;
+}
+
+async function fetchSourceSuggestions(prefix) {
+  const params = new URLSearchParams({ prefix, limit: '10' });
+  const res = await fetch('/api/sources/suggest?' + params.toString());
+  return (await res.json()).suggestions;
+}
+
+function articleCard(a) {
+  const card = document.createElement('article');
+  card.className = 'article';
+  const img = a.urlToImage ? `<img src="${a.urlToImage}" alt=""/>` : '';
+  card.innerHTML = `
+    <h3><a href="${a.url}" target="_blank" rel="noopener">${a.title}</a></h3>
+    <p class="meta">${a.source.name} · ${a.publishedAt ? new Date(a.publishedAt).toLocaleString() : ''}</p>
+    ${img}
+    <p>${a.description || ''}</p>
+  `;
+  return card;
 }
 
 function renderArticles(container, articles) {
@@ -23,26 +64,47 @@ function renderArticles(container, articles) {
     return;
   }
   for (const a of articles) {
-    const card = document.createElement('article');
-    card.className = 'article';
-    const img = a.urlToImage ? `<img src="${a.urlToImage}" alt=""/>` : '';
-    card.innerHTML = `
-      <h3><a href="${a.url}" target="_blank" rel="noopener">${a.title}</a></h3>
-      <p class="meta">${a.source.name} · ${a.publishedAt ? new Date(a.publishedAt).toLocaleString() : ''}</p>
-      ${img}
-      <p>${a.description || ''}</p>
-    `;
-    container.appendChild(card);
+    container.appendChild(articleCard(a));
+  }
+}
+
+// Live top stories: new headlines are pushed by /api/stream/top and prepended to the list
+let liveFeed = null;
+
+function stopLiveTop() {
+  if (liveFeed) {
+    liveFeed.close();
+    liveFeed = null;
   }
 }
 
+function startLiveTop(country) {
+  stopLiveTop();
+  if (!window.EventSource) return;
+  const params = new URLSearchParams();
+  if (country) params.set('country', country);
+  liveFeed = new EventSource('/api/stream/top?' + params.toString());
+  liveFeed.addEventListener('articles', (ev) => {
+    const results = document.getElementById('results');
+    const { articles } = JSON.parse(ev.data);
+    for (const a of articles.slice().reverse()) {
+      results.prepend(articleCard(a));
+    }
+  });
+  // the server disconnects clients that fall behind; stop here instead of auto-reconnecting
+  liveFeed.addEventListener('dropped', () => stopLiveTop());
+}
+
 document.getElementById('searchBtn').addEventListener('click', async () => {
   const q = document.getElementById('q').value.trim();
   const results = document.getElementById('results');
   results.textContent = 'Loading...';
+  stopLiveTop();
   try {
-    const data = q ? await fetchSearch(q) : await fetchTop(document.getElementById('country').value);
+    const country = document.getElementById('country').value;
+    const data = q ? await fetchSearch(q) : await fetchTop(country);
     renderArticles(results, data.articles);
+    if (!q) startLiveTop(country);
   } catch (e) {
     results.textContent = 'Error fetching articles.';
     console.error(e);
@@ -53,8 +115,10 @@ document.getElementById('topBtn').addEventListener('click', async () => {
   const results = document.getElementById('results');
   results.textContent = 'Loading top stories...';
   try {
-    const data = await fetchTop(document.getElementById('country').value);
+    const country = document.getElementById('country').value;
+    const data = await fetchTop(country);
     renderArticles(results, data.articles);
+    startLiveTop(country);
   } catch (e) {
     results.textContent = 'Error fetching top stories.';
     console.error(e);
@@ -66,14 +130,14 @@ document.addEventListener('DOMContentLoaded', async () => {
   document.getElementById('topBtn').click();
   // populate sources with persistence
   try {
-    const sources = await fetchSources();
+    const categories = await fetchSourceCategories();
     const catEl = document.getElementById('sourceCategory');
     const srcEl = document.getElementById('sourceSelect');
     catEl.innerHTML = '';
-    for (const cat of Object.keys(sources)) {
+    for (const c of categories) {
       const opt = document.createElement('option');
-      opt.value = cat;
-      opt.textContent = cat;
+      opt.value = c.name;
+      opt.textContent = `${c.name} (${c.count})`;
       catEl.appendChild(opt);
     }
 
@@ -90,9 +154,10 @@ document.addEventListener('DOMContentLoaded', async () => {
     // map to track previous selections per category so we can detect newly-added selections
     const prevSelections = {};
 
-    function populateSourcesForCategory() {
+    async function populateSourcesForCategory() {
       const cat = catEl.value;
-      const list = Object.keys(sources[cat] || {});
+      const list = Object.keys(await loadCategorySources(cat));
+      if (cat !== catEl.value) return;  // the category changed while its page was loading
       srcEl.innerHTML = '';
       // load saved selections fresh for this category (fallback to legacy key)
       let savedSelectedNow = [];
@@ -171,7 +236,52 @@ document.addEventListener('DOMContentLoaded', async () => {
       });
     }
 
-    populateSourcesForCategory();
+    await populateSourcesForCategory();
+
+    // autocomplete: suggestions come from the server's prefix index, one request per pause in typing
+    const findEl = document.getElementById('sourceFind');
+    const suggestionsEl = document.getElementById('sourceSuggestions');
+    let suggested = {};
+    let suggestTimer = null;
+    findEl.addEventListener('input', () => {
+      const value = findEl.value.trim();
+      const pick = suggested[value];
+      if (pick) {
+        // a suggestion was chosen: show its category and add it to the selection
+        catEl.value = pick.category;
+        localStorage.setItem(STORAGE_CAT, pick.category);
+        populateSourcesForCategory().then(() => {
+          const opt = Array.from(srcEl.options).find(o => o.value === pick.name);
+          if (opt) {
+            opt.selected = true;
+            opt.scrollIntoView({ block: 'nearest' });
+            const sel = Array.from(srcEl.selectedOptions).map(o => o.value);
+            localStorage.setItem(STORAGE_SELECTED + '_' + pick.category, JSON.stringify(sel));
+            prevSelections[pick.category] = sel.slice();
+          }
+        });
+        return;
+      }
+      clearTimeout(suggestTimer);
+      if (!value) return;
+      suggestTimer = setTimeout(async () => {
+        try {
+          const matches = await fetchSourceSuggestions(value);
+          if (findEl.value.trim() !== value) return;
+          suggested = {};
+          suggestionsEl.innerHTML = '';
+          for (const m of matches) {
+            const label = `${m.name} — ${m.category}`;
+            suggested[label] = m;
+            const o = document.createElement('option');
+            o.value = label;
+            suggestionsEl.appendChild(o);
+          }
+        } catch (e) {
+          console.error('Failed to fetch source suggestions', e);
+        }
+      }, 150);
+    });
 
     document.getElementById('openSourceBtn').addEventListener('click', async () => {
       const category = catEl.value;
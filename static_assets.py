@@ -0,0 +1,77 @@
+import hashlib
+import mimetypes
+import os
+from typing import Dict
+
+from serialization import PrecomputedBody
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# unversioned URLs (e.g. /static/link_hub.html opened from main.js) revalidate via ETag
+REVALIDATE = "no-cache"
+
+# Media types worth compressing; images and fonts are already compressed
+COMPRESSIBLE_PREFIXES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+# Only web assets are served; anything else under the directory (e.g. Python sources) is not
+ASSET_EXTENSIONS = frozenset((
+    ".html", ".css", ".js", ".mjs", ".map", ".json", ".txt", ".svg", ".png", ".jpg", ".jpeg",
+    ".gif", ".webp", ".avif", ".ico", ".woff", ".woff2",
+))
+
+
+class AssetManifest:
+    """Every web asset under a static directory, loaded, fingerprinted and compressed once.
+
+    Each asset is reachable as `<prefix>/<name>` and as `<prefix>/<stem>.<hash>.<ext>`,
+    where `hash` is derived from the file contents. Templates link the fingerprinted URL
+    (see `url`), which is served with an immutable, year-long Cache-Control, so browsers
+    never re-request it; a changed file gets a new URL.
+    """
+
+    def __init__(self, directory: str, prefix: str = "/static"):
+        self.directory = directory
+        self.prefix = prefix.rstrip("/")
+        self.urls: Dict[str, str] = {}
+        self._by_name: Dict[str, PrecomputedBody] = {}
+        self._fingerprinted: Dict[str, PrecomputedBody] = {}
+        for root, dirs, files in os.walk(directory):
+            # skip hidden and cache directories such as __pycache__
+            dirs[:] = [d for d in dirs if not d.startswith((".", "__"))]
+            for filename in sorted(files):
+                if filename.startswith(".") or os.path.splitext(filename)[1].lower() not in ASSET_EXTENSIONS:
+                    continue
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, directory).replace(os.sep, "/")
+                self._add(name, path)
+
+    def _add(self, name: str, path: str):
+        with open(path, "rb") as f:
+            body = f.read()
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        compressible = media_type.startswith(COMPRESSIBLE_PREFIXES)
+        asset = PrecomputedBody(body, media_type, REVALIDATE, compressible=compressible)
+        stem, ext = os.path.splitext(name)
+        digest = hashlib.blake2b(body, digest_size=6).hexdigest()
+        fingerprinted = f"{stem}.{digest}{ext}"
+        self._by_name[name] = asset
+        self._fingerprinted[fingerprinted] = asset
+        self.urls[name] = f"{self.prefix}/{fingerprinted}"
+
+    def url(self, name: str) -> str:
+        """Return the fingerprinted URL for `name` (the plain URL if it is not a known asset)."""
+        return self.urls.get(name, f"{self.prefix}/{name}")
+
+    def lookup(self, name: str):
+        """Return `(asset, cache_control)` for a request path below the prefix, or `(None, None)`."""
+        asset = self._fingerprinted.get(name)
+        if asset is not None:
+            return asset, IMMUTABLE
+        asset = self._by_name.get(name)
+        if asset is not None:
+            return asset, REVALIDATE
+        return None, None
+
+
+def render_page(templates, name: str, manifest: AssetManifest, cache_control: str = REVALIDATE) -> PrecomputedBody:
+    """Render a template with no per-request data once; it gets `asset(name)` for asset URLs."""
+    html = templates.get_template(name).render(asset=manifest.url)
+    return PrecomputedBody(html.encode("utf-8"), "text/html; charset=utf-8", cache_control)
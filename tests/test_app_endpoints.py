@@ -0,0 +1,104 @@
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+import app as app_module
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, "ARTICLE_STORE_ENABLED", False)
+    monkeypatch.setattr(app_module, "ENRICH_ENABLED", False)
+    with TestClient(app_module.app) as c:
+        yield c
+
+
+def test_quota_reports_circuit_breakers(client, monkeypatch):
+    breaker = app_module.CircuitBreaker("everything", failure_threshold=1)
+    monkeypatch.setattr(app_module, "UPSTREAM_BREAKERS", {"everything": breaker})
+    breaker.record_failure()
+    body = client.get("/api/quota").json()
+    assert "keys" in body
+    assert body["breakers"] == {"everything": {"state": "open", "consecutive_failures": 1, "times_opened": 1}}
+
+
+def art(url, title, published):
+    return {"url": url, "title": title, "description": "", "publishedAt": published, "source": {"id": None, "name": url.split("/")[2]}}
+
+
+SHARED = art("https://a.example/shared", "Shared story about both topics", "2024-03-02T00:00:00Z")
+COPY = art("https://b.example/copy", "Syndicated rate decision story", "2024-03-01T00:00:00Z")
+ORIGINAL = art("https://c.example/orig", "Syndicated rate decision story", "2024-03-01T01:00:00Z")
+
+
+@pytest.fixture
+def multi_upstream(monkeypatch):
+    responses = {
+        "rates": [SHARED, ORIGINAL],
+        "inflation": [SHARED, COPY],
+    }
+
+    async def cached_newsapi_get(path, params):
+        if params["q"] == "broken":
+            raise app_module.HTTPException(status_code=502, detail="upstream down")
+        articles = responses[params["q"]]
+        return {"status": "ok", "totalResults": 1000, "articles": articles}, "MISS", 0.0
+
+    monkeypatch.setattr(app_module, "cached_newsapi_get", cached_newsapi_get)
+    monkeypatch.setattr(app_module, "upstream_scheduler", object())
+
+
+def test_multi_search_merges_overlapping_queries(client, multi_upstream):
+    body = client.get("/api/multi-search", params=[("q", "rates"), ("q", "inflation"), ("q", "broken")]).json()
+    assert body["totalResults"] == 3
+    assert body["complete"] is False
+    assert [(r["query"], r["status"]) for r in body["queries"]] == [("q:rates", "ok"), ("q:inflation", "ok"), ("q:broken", "error")]
+    matched = {a["url"]: a["matched"] for a in body["articles"]}
+    assert matched == {SHARED["url"]: ["q:rates", "q:inflation"], ORIGINAL["url"]: ["q:rates"], COPY["url"]: ["q:inflation"]}
+
+
+def test_multi_search_dedupe_keeps_labels_of_absorbed_copies(client, multi_upstream):
+    body = client.get("/api/multi-search", params=[("q", "rates"), ("q", "inflation"), ("dedupe", "true")]).json()
+    assert body["totalResults"] == 3
+    assert body["clusters"] == 2
+    kept = {a["url"]: a for a in body["articles"]}
+    assert set(kept) == {SHARED["url"], ORIGINAL["url"]}
+    assert kept[ORIGINAL["url"]]["matched"] == ["q:rates", "q:inflation"]
+    assert kept[ORIGINAL["url"]]["duplicates"] == [{"source": "b.example", "url": COPY["url"]}]
+
+
+def test_source_search_batch_mixes_known_and_unknown_sources(client):
+    ok = client.get("/api/source-search/batch", params=[("q", "rate cut"), ("source", "Reuters"), ("source", "CNN")])
+    assert ok.status_code == 200
+    assert ok.json()["urls"] == {
+        "Global Agencies": {"Reuters": "https://www.reuters.com/site-search/?query=rate+cut"},
+        "United States": {"CNN": "https://www.cnn.com/search?q=rate+cut"},
+    }
+    mixed = client.get("/api/source-search/batch", params=[("q", "x"), ("source", "Reuters"), ("source", "Nope"), ("source", "Nada")])
+    assert mixed.status_code == 400
+    assert "Nada, Nope" in mixed.json()["detail"]
+    unknown_category = client.get("/api/source-search/batch", params={"q": "x", "category": "Atlantis"})
+    assert unknown_category.status_code == 400
+
+
+def test_source_search_batch_size_cap(client, monkeypatch):
+    whole_catalog = client.get("/api/source-search/batch", params={"q": "x"})
+    assert whole_catalog.status_code == 200
+    total = sum(len(v) for v in whole_catalog.json()["urls"].values())
+
+    monkeypatch.setattr(app_module, "SOURCE_SEARCH_BATCH_MAX", total - 1)
+    assert client.get("/api/source-search/batch", params={"q": "x"}).status_code == 400
+    one_category = client.get("/api/source-search/batch", params={"q": "x", "category": "Global Agencies"})
+    assert one_category.status_code == 200
+
+    monkeypatch.setattr(app_module, "SOURCE_SEARCH_BATCH_MAX", 2)
+    too_many = client.get("/api/source-search/batch", params=[("q", "x")] + [("source", n) for n in ("Reuters", "CNN", "AFP")])
+    assert too_many.status_code == 400
+    assert client.get("/api/source-search/batch", params={"q": "x" * 501}).status_code == 422
+
+
+def test_suggest_filters_by_category(client):
+    body = client.get("/api/sources/suggest", params={"prefix": "the", "category": "United Kingdom"}).json()
+    assert body["suggestions"] and {s["category"] for s in body["suggestions"]} == {"United Kingdom"}
+    assert client.get("/api/sources/suggest", params={"prefix": "the", "category": "Atlantis"}).status_code == 400
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import app as app_module
+
+
+def page_of(n: int, total: int = 120, size: int = 50):
+    start = (n - 1) * size
+    articles = [{"title": f"t{i}", "url": f"https://example.com/{i}"} for i in range(start, min(start + size, total))]
+    return {"status": "ok", "totalResults": total, "articles": articles}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, "ARTICLE_STORE_ENABLED", False)
+    monkeypatch.setattr(app_module, "ENRICH_ENABLED", False)
+    with TestClient(app_module.app) as c:
+        yield c
+
+
+def fake_upstream(monkeypatch, fail_pages=()):
+    calls = []
+
+    async def cached_newsapi_get(path, params):
+        page = params.get("page", 1)
+        calls.append(page)
+        if page in fail_pages:
+            raise HTTPException(status_code=429, detail="quota", headers={"Retry-After": "5"})
+        return page_of(page), "MISS", 0.0
+
+    monkeypatch.setattr(app_module, "cached_newsapi_get", cached_newsapi_get)
+    return calls
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_stream_returns_every_page_up_to_total_results(client, monkeypatch):
+    calls = fake_upstream(monkeypatch)
+    r = client.get("/api/search", params={"q": "x", "pages": 5})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert len(ndjson(r)) == 120
+    # totalResults=120 means 3 pages; pages 4-5 are never requested
+    assert sorted(calls) == [1, 2, 3]
+
+
+def test_stream_stops_at_limit(client, monkeypatch):
+    fake_upstream(monkeypatch)
+    r = client.get("/api/search", params={"q": "x", "limit": 60, "fields": "title"})
+    lines = ndjson(r)
+    assert len(lines) == 60
+    assert set(lines[0]) == {"title"}
+
+
+def test_stream_first_page_error_keeps_its_status(client, monkeypatch):
+    fake_upstream(monkeypatch, fail_pages=(1,))
+    r = client.get("/api/search", params={"q": "x", "pages": 3})
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "5"
+
+
+def test_stream_later_page_error_is_reported_in_band(client, monkeypatch):
+    fake_upstream(monkeypatch, fail_pages=(2,))
+    r = client.get("/api/search", params={"q": "x", "pages": 3})
+    assert r.status_code == 200
+    lines = ndjson(r)
+    assert {"error": {"status": 429, "detail": "quota"}} in lines
+
+
+@pytest.mark.parametrize("flag", ["dedupe", "enrich"])
+def test_stream_rejects_whole_response_options(client, monkeypatch, flag):
+    calls = fake_upstream(monkeypatch)
+    r = client.get("/api/search", params={"q": "x", "pages": 2, flag: "true"})
+    assert r.status_code == 400
+    assert flag in r.json()["detail"]
+    assert calls == []
@@ -0,0 +1,47 @@
+import pytest
+
+from article_store import ArticleStore, fts_query
+
+
+def article(i: int, title: str, source: str = "Wire", published: str = "2024-01-01T00:00:00Z"):
+    return {
+        "source": {"id": None, "name": source},
+        "title": title,
+        "description": f"description {i}",
+        "url": f"https://example.com/{i}",
+        "publishedAt": published,
+        "content": None,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    store.ingest_batch(
+        [article(i, f"climate report {i}", published=f"2024-01-{i + 1:02d}T00:00:00Z") for i in range(25)]
+        + [article(100 + i, f"election night {i}", source="Other") for i in range(5)]
+    )
+    return store
+
+
+def test_fts_query_quotes_terms():
+    assert fts_query('AT&T "covid-19"') == '"AT&T" """covid-19"""'
+
+
+def test_ingest_is_deduplicated_by_url(store):
+    assert store.ingest_batch([article(0, "climate report 0", published="2024-01-01T00:00:00Z")]) == 1
+    assert store.count() == 30
+
+
+def test_search_pages_and_count_matches(store):
+    first = store.search("climate", limit=10)
+    last = store.search("climate", limit=10, offset=20)
+    assert len(first) == 10 and len(last) == 5
+    assert first[0]["publishedAt"] > first[-1]["publishedAt"]
+    assert store.count_matches("climate") == 25
+
+
+def test_count_matches_applies_every_filter(store):
+    assert store.count_matches(source="other") == 5
+    assert store.count_matches("climate", date_from="2024-01-10", date_to="2024-01-12") == 3
+    assert store.count_matches("nothing-matches") == 0
@@ -0,0 +1,60 @@
+import dedupe
+from dedupe import MAX_DISTANCE, cluster_articles, dedupe_response, simhash
+
+ORIGINAL = "Central bank raises interest rates by a quarter point to fight persistent inflation"
+# same tokens after lower-casing and dropping punctuation, so the signature is identical
+REFORMATTED = "CENTRAL BANK RAISES INTEREST RATES BY A QUARTER-POINT TO FIGHT PERSISTENT INFLATION!"
+UNRELATED = "Local team wins the championship after dramatic overtime final"
+
+
+def article(title, url, source="Wire", description=""):
+    return {"title": title, "description": description, "url": url, "source": {"id": None, "name": source}}
+
+
+def test_simhash_ignores_case_and_punctuation():
+    assert simhash(ORIGINAL) == simhash(REFORMATTED)
+    assert (simhash(ORIGINAL) ^ simhash(UNRELATED)).bit_count() > MAX_DISTANCE
+    assert simhash("") == 0
+    assert simhash("...") == 0
+
+
+def test_near_duplicates_cluster_with_earliest_as_representative():
+    articles = [
+        article(ORIGINAL, "https://a.example/1", "Agency"),
+        article(UNRELATED, "https://b.example/2"),
+        article(REFORMATTED, "https://c.example/3", "Reuters"),
+    ]
+    assert cluster_articles(articles) == [[0, 2], [1]]
+
+
+def test_clusters_by_hamming_distance_across_bands(monkeypatch):
+    # simhash is seeded per process, so pin signatures to exercise the band lookup exactly
+    near = sum(1 << shift for shift, _ in dedupe._BANDS[:MAX_DISTANCE])  # one bit in five bands
+    far = near | 1 << dedupe._BANDS[-1][0]  # one bit in every band
+    sigs = {"base": 0, "near": near, "far": far}
+    monkeypatch.setattr(dedupe, "simhash", sigs.__getitem__)
+    assert cluster_articles([article("base", "https://x/1"), article("near", "https://x/2")]) == [[0, 1]]
+    assert cluster_articles([article("base", "https://x/1"), article("far", "https://x/2")]) == [[0], [1]]
+    assert cluster_articles([article("base", "https://x/1"), article("near", "https://x/2")], max_distance=4) == [[0], [1]]
+
+
+def test_same_url_clusters_even_with_different_text():
+    articles = [article("First headline about markets", "https://a.example/x"), article("Completely different words here", "https://a.example/x")]
+    assert cluster_articles(articles) == [[0, 1]]
+
+
+def test_articles_without_text_or_url_stay_separate():
+    articles = [{"title": None}, {"title": None}]
+    assert cluster_articles(articles) == [[0], [1]]
+
+
+def test_dedupe_response_lists_duplicates_and_leaves_input_untouched():
+    data = {
+        "status": "ok",
+        "articles": [article(ORIGINAL, "https://a.example/1", "Agency"), article(REFORMATTED, "https://c.example/3", "Reuters")],
+    }
+    out = dedupe_response(data)
+    assert out["clusters"] == 1
+    assert out["articles"][0]["duplicates"] == [{"source": "Reuters", "url": "https://c.example/3"}]
+    assert "duplicates" not in data["articles"][0]
+    assert len(data["articles"]) == 2
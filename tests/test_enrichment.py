@@ -0,0 +1,81 @@
+import asyncio
+
+from enrichment import EnrichmentPipeline, RollingCorpus, analyze_article, article_text, tag_entities
+
+
+def test_article_text_drops_newsapi_truncation_marker():
+    text = article_text({"title": "T", "description": None, "content": "Body text… [+1234 chars]"})
+    assert text == "T\nBody text"
+
+
+def test_language_detection():
+    assert analyze_article("The minister said that the talks with the union were not over")[0] == "en"
+    assert analyze_article("El presidente dijo que los ciudadanos de la capital no están de acuerdo")[0] == "es"
+    assert analyze_article("Москва заявила о новых санкциях против")[0] == "ru"
+    assert analyze_article("Zzz")[0] is None
+
+
+def test_entity_rules():
+    entities = {e["text"]: e["type"] for e in tag_entities(
+        "President Joe Biden met officials of the Bank of England and NATO in London."
+    )}
+    assert entities == {"Joe Biden": "person", "Bank of England": "organization", "NATO": "organization", "London": "location"}
+
+
+def test_keywords_prefer_terms_rare_in_the_corpus():
+    corpus = RollingCorpus(size=10)
+    for _ in range(5):
+        corpus.add(frozenset({"government", "report"}))
+    counts = {"government": 1, "report": 1, "glacier": 1}
+    corpus.add(frozenset(counts))
+    assert corpus.keywords(counts, 1) == ["glacier"]
+
+
+def test_rolling_corpus_forgets_old_documents():
+    corpus = RollingCorpus(size=2)
+    corpus.add(frozenset({"a"}))
+    corpus.add(frozenset({"b"}))
+    corpus.add(frozenset({"c"}))
+    assert "a" not in corpus.df and corpus.df["c"] == 1
+
+
+def test_pipeline_enriches_a_batch_on_the_process_pool():
+    articles = [
+        {"url": "https://example.com/1", "title": "Prime Minister Keir Starmer visits Paris", "description": "The talks were about trade."},
+        {"url": "https://example.com/2", "title": "Microsoft Corp reports earnings", "description": "Shares rose after the results."},
+    ]
+
+    async def run():
+        pipeline = EnrichmentPipeline(workers=1, batch_size=8)
+        pipeline.start()
+        try:
+            pipeline.submit(articles)
+            pipeline.submit(articles)  # already pending: not queued twice
+            assert pipeline.pending() == 2
+            for _ in range(300):
+                if pipeline.pending() == 0:
+                    break
+                await asyncio.sleep(0.05)
+            return pipeline, pipeline.enrich_response({"articles": articles})
+        finally:
+            await pipeline.stop()
+
+    pipeline, response = asyncio.run(run())
+    assert pipeline.enriched == 2 and pipeline.failed == 0
+    first, second = (a["enrichment"] for a in response["articles"])
+    assert first["language"] == "en"
+    assert {"text": "Keir Starmer", "type": "person"} in first["entities"]
+    assert {"text": "Microsoft Corp", "type": "organization"} in second["entities"]
+    assert first["keywords"] and second["keywords"]
+    # the input response is not modified
+    assert "enrichment" not in articles[0]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    async def run():
+        pipeline = EnrichmentPipeline(workers=1, max_pending=1)
+        pipeline.submit([{"url": "https://example.com/1"}, {"url": "https://example.com/2"}])
+        return pipeline
+
+    pipeline = asyncio.run(run())
+    assert pipeline.pending() == 1 and pipeline.dropped == 1
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from live_feed import DROPPED, LiveFeedHub, TopicFeed
+
+
+def page(*urls):
+    return {"status": "ok", "articles": [{"url": u, "title": u} for u in urls]}
+
+
+def decode(event: bytes):
+    name, data = event.decode().strip().split("\n")
+    return name[len("event: "):], json.loads(data[len("data: "):])
+
+
+class FakePoller:
+    """Returns the queued responses in order, then repeats the last one; with none, never returns."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if not self.responses:
+            await asyncio.Event().wait()
+        return self.responses[min(self.calls, len(self.responses)) - 1]
+
+
+def test_poller_publishes_only_new_urls():
+    poller = FakePoller(page("a", "b"), page("b", "c", "a"), page("c", "d"))
+
+    async def run():
+        feed = TopicFeed("us", poller, interval=0.001, queue_size=10)
+        sub = feed.subscribe()
+        events = [decode(await asyncio.wait_for(sub.queue.get(), 1)) for _ in range(3)]
+        feed.unsubscribe(sub)
+        await feed.stop()
+        return events
+
+    events = asyncio.run(run())
+    assert events[0] == ("snapshot", {"articles": page("a", "b")["articles"]})
+    assert events[1] == ("articles", {"articles": page("c")["articles"]})
+    assert events[2] == ("articles", {"articles": page("d")["articles"]})
+
+
+def test_seen_set_is_capped_oldest_first():
+    feed = TopicFeed("us", FakePoller(), interval=1, queue_size=1)
+    urls = [f"https://x.example/{i}" for i in range(2001)]
+    assert len(feed.diff([{"url": u} for u in urls])) == 2001
+    assert len(feed._seen) == 2000
+    # the oldest URL was forgotten, the newest are still known
+    assert feed.diff([{"url": urls[0]}, {"url": urls[-1]}]) == [{"url": urls[0]}]
+
+
+def test_slow_subscriber_is_dropped_with_a_notice():
+    async def run():
+        feed = TopicFeed("us", FakePoller(), interval=60, queue_size=2)
+        slow = feed.subscribe()
+        fast = feed.subscribe()
+        feed.publish(page("a"))
+        await fast.queue.get()
+        feed.publish(page("b"))
+        await fast.queue.get()
+        feed.publish(page("c"))  # slow already holds two events; this one overflows it
+        await feed.stop()
+        backlog = []
+        while not slow.queue.empty():
+            backlog.append(slow.queue.get_nowait())
+        return feed, slow, fast, backlog
+
+    feed, slow, fast, backlog = asyncio.run(run())
+    assert backlog == [DROPPED]
+    assert slow.dropped and slow not in feed.subscribers
+    assert fast in feed.subscribers and decode(fast.queue.get_nowait())[0] == "articles"
+    assert feed.dropped == 1
+
+
+def test_hub_stream_ends_after_dropped():
+    async def run():
+        hub = LiveFeedHub(interval=60, queue_size=1, heartbeat=5)
+        feed = hub.feed(("us", None), FakePoller())
+        stream = hub.stream(feed)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        (sub,) = feed.subscribers
+        sub.drop()
+        events = [await first]
+        async for event in stream:
+            events.append(event)
+        await hub.stop()
+        return events, hub.subscriber_counts()
+
+    events, counts = asyncio.run(run())
+    assert events == [DROPPED]
+    assert counts == {("us", None): 0}
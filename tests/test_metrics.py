@@ -0,0 +1,71 @@
+import re
+
+import pytest
+
+from metrics import Counter, Gauge, Histogram, Registry
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="(\\.|[^"\\])*",?)*\})? -?[0-9.e+-]+$')
+
+
+def assert_exposition(text: str):
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        if line.startswith("# "):
+            assert re.match(r"^# (HELP|TYPE) [a-zA-Z_:][a-zA-Z0-9_:]* .+$", line), line
+        else:
+            assert SAMPLE.match(line), line
+
+
+def test_registry_renders_counters_gauges_and_cumulative_histograms():
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Jobs run.", ("kind",)))
+    gauge = registry.register(Gauge("queue_depth", "Queued jobs."))
+    histogram = registry.register(Histogram("job_seconds", "Job duration.", ("kind",), buckets=(0.1, 1.0)))
+    registry.register(Counter("hits_total", "Collected at scrape time.", ("path",), collect=lambda: {('a"b',): 3}))
+    counter.inc("fetch")
+    counter.inc("fetch", amount=2)
+    gauge.inc()
+    gauge.dec(amount=0.5)
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "fetch")
+
+    text = registry.render()
+    assert_exposition(text)
+    lines = text.splitlines()
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{kind="fetch"} 3.0' in lines
+    assert "# TYPE queue_depth gauge" in lines
+    assert "queue_depth 0.5" in lines
+    assert 'hits_total{path="a\\"b"} 3' in lines
+    assert "# TYPE job_seconds histogram" in lines
+    assert [line for line in lines if line.startswith("job_seconds_")] == [
+        'job_seconds_bucket{kind="fetch",le="0.1"} 1',
+        'job_seconds_bucket{kind="fetch",le="1.0"} 2',
+        'job_seconds_bucket{kind="fetch",le="+Inf"} 3',
+        'job_seconds_sum{kind="fetch"} 5.55',
+        'job_seconds_count{kind="fetch"} 3',
+    ]
+
+
+def test_requests_are_labelled_by_route_template(monkeypatch):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    import app as app_module
+
+    monkeypatch.setattr(app_module, "ARTICLE_STORE_ENABLED", False)
+
+    with TestClient(app_module.app) as client:
+        for category in ("Global Agencies", "United States", "No Such Category"):
+            client.get(f"/api/sources/categories/{category}")
+        text = client.get("/metrics").text
+
+    assert_exposition(text)
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    routes = set(re.findall(r'http_request_duration_seconds_count\{route="([^"]*)"', text))
+    assert "/api/sources/categories/{category}" in routes
+    assert not any("Agencies" in r or "United" in r or "No Such" in r for r in routes)
+    template = 'route="/api/sources/categories/{category}",method="GET"'
+    assert re.search(r'http_request_duration_seconds_bucket\{' + re.escape(template) + r',status="200",le="\+Inf"\} [1-9]', text)
+    assert re.search(r'http_request_duration_seconds_sum\{' + re.escape(template) + r',status="404"\} ', text)
+    assert re.search(r'http_request_duration_seconds_count\{' + re.escape(template) + r',status="200"\} [1-9]', text)
@@ -0,0 +1,61 @@
+import pytest
+
+from news_source import SourceCatalog, fold
+
+RECORDS = [
+    {"category": "United States", "name": "The New York Times", "url": "https://www.nytimes.com/search/?query={query}"},
+    {"category": "United States", "name": "New York Post", "url": "https://nypost.com/search/{query}/"},
+    {"category": "United States", "name": "Newsweek", "url": "https://www.newsweek.com/search/site/{query}"},
+    {"category": "United Kingdom", "name": "BBC News", "url": "https://www.bbc.co.uk/search?q={query}"},
+    {"category": "Europe", "name": "Le Monde", "url": "https://www.lemonde.fr/recherche/?search_keywords={query}"},
+    {"category": "Germany", "name": "Süddeutsche Zeitung", "url": "https://www.sueddeutsche.de/suche?search={query}"},
+]
+
+
+@pytest.fixture
+def catalog():
+    return SourceCatalog(RECORDS)
+
+
+def names(sources):
+    return [s.name for s in sources]
+
+
+def test_fold_strips_accents_case_and_extra_spaces():
+    assert fold("  Süddeutsche   ZEITUNG ") == "suddeutsche zeitung"
+
+
+def test_suggest_ranks_name_prefixes_before_word_and_domain_prefixes(catalog):
+    # whole-name matches first, then later-word matches; shorter names win ties
+    assert names(catalog.suggest("new")) == ["Newsweek", "New York Post", "BBC News", "The New York Times"]
+    assert names(catalog.suggest("york")) == ["New York Post", "The New York Times"]
+    assert names(catalog.suggest("nyp")) == ["New York Post"]
+
+
+def test_suggest_puts_exact_name_first_and_folds_accents(catalog):
+    assert names(catalog.suggest("NEWSWEEK")) == ["Newsweek"]
+    assert names(catalog.suggest("sudd")) == ["Süddeutsche Zeitung"]
+    assert names(catalog.suggest("new york post"))[0] == "New York Post"
+
+
+def test_suggest_respects_limit_category_and_empty_input(catalog):
+    assert len(catalog.suggest("new", limit=2)) == 2
+    assert catalog.suggest("") == []
+    assert catalog.suggest("new", limit=0) == []
+    assert names(catalog.suggest("le", category="Europe")) == ["Le Monde"]
+    assert catalog.suggest("le", category="Germany") == []
+    assert catalog.suggest("zzz") == []
+
+
+def test_page_and_unknown_category(catalog):
+    total, sources = catalog.page("United States", offset=1, limit=1)
+    assert total == 3
+    assert names(sources) == ["New York Post"]
+    with pytest.raises(KeyError):
+        catalog.page("Nowhere")
+
+
+def test_lookup_domain_falls_back_to_parent_domain(catalog):
+    assert names(catalog.lookup_domain("https://news.bbc.co.uk/world")) == ["BBC News"]
+    assert names(catalog.lookup_domain("www.nytimes.com")) == ["The New York Times"]
+    assert catalog.lookup_domain("example.org") == []
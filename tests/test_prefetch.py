@@ -0,0 +1,95 @@
+import asyncio
+import random
+
+import pytest
+
+from prefetch import HeadlinePrefetcher, build_schedule
+
+
+def test_build_schedule_is_countries_by_categories():
+    assert build_schedule(["us", "gb"], ["business", "sports"]) == [
+        {"country": "us", "category": "business"},
+        {"country": "us", "category": "sports"},
+        {"country": "gb", "category": "business"},
+        {"country": "gb", "category": "sports"},
+    ]
+    assert build_schedule(["us", "gb"], []) == [{"country": "us"}, {"country": "gb"}]
+    assert build_schedule([], ["business"]) == []
+
+
+class FixedRandom(random.Random):
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def uniform(self, a, b):
+        return self.value
+
+
+def test_next_delay_doubles_per_failed_run_up_to_max_backoff_with_jitter():
+    prefetcher = HeadlinePrefetcher([{}], None, interval=100, jitter=0.1, max_backoff=350, rng=FixedRandom(0.0))
+    delays = []
+    for failures in range(4):
+        prefetcher.consecutive_failures = failures
+        delays.append(prefetcher.next_delay())
+    assert delays == [100, 200, 350, 350]
+    prefetcher.consecutive_failures = 0
+    prefetcher._rng = FixedRandom(0.1)
+    assert prefetcher.next_delay() == pytest.approx(110)
+    prefetcher._rng = FixedRandom(-0.1)
+    assert prefetcher.next_delay() == pytest.approx(90)
+
+
+def make_prefetcher(failing, **kwargs):
+    calls = []
+
+    async def refresh(params):
+        calls.append(params["category"])
+        if params["category"] in failing:
+            raise RuntimeError("upstream said no")
+
+    queries = [{"category": c} for c in ("business", "health", "sports")]
+    return HeadlinePrefetcher(queries, refresh, interval=10, rng=FixedRandom(0.0), **kwargs), calls
+
+
+def run_and_record(prefetcher, calls, n):
+    async def run():
+        seen = []
+        for _ in range(n):
+            calls.clear()
+            await prefetcher.run_once()
+            seen.append(sorted(calls))
+        return seen
+
+    return asyncio.run(run())
+
+
+def test_one_failing_query_backs_off_alone():
+    prefetcher, calls = make_prefetcher({"health"}, max_backoff=1000)
+    runs = run_and_record(prefetcher, calls, 7)
+    # health fails in run 0, sits out 1 run, fails in run 2, sits out 3 runs, fails in run 6
+    assert [("health" in c) for c in runs] == [True, False, True, False, False, False, True]
+    assert all({"business", "sports"} <= set(c) for c in runs)
+    assert prefetcher.consecutive_failures == 0
+    assert prefetcher.next_delay() == 10
+    assert prefetcher.status()["backing_off"] == 1
+
+
+def test_query_back_off_is_capped_by_max_backoff_and_resets_on_success():
+    failing = {"health"}
+    prefetcher, calls = make_prefetcher(failing, max_backoff=20)
+    # at most max_backoff / interval = 2 runs skipped
+    runs = run_and_record(prefetcher, calls, 7)
+    assert [("health" in c) for c in runs] == [True, False, True, False, False, True, False]
+    failing.clear()
+    runs = run_and_record(prefetcher, calls, 3)
+    assert [("health" in c) for c in runs] == [False, True, True]
+    assert prefetcher.status()["backing_off"] == 0
+
+
+def test_whole_schedule_backs_off_when_most_queries_fail():
+    prefetcher, _ = make_prefetcher({"business", "health"})
+    asyncio.run(prefetcher.run_once())
+    assert prefetcher.consecutive_failures == 1
+    assert prefetcher.next_delay() == 20
+    assert prefetcher.last_run_errors == 2
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+import quota
+from quota import BACKGROUND, INTERACTIVE, QuotaExhausted, UpstreamScheduler
+
+
+def test_acquire_takes_tokens_and_counts_usage():
+    scheduler = UpstreamScheduler(["k1"], rate=1.0, burst=2.0)
+
+    async def run():
+        return [await scheduler.acquire() for _ in range(2)]
+
+    states = asyncio.run(run())
+    assert states[0] is states[1] is scheduler.keys[0]
+    assert scheduler.keys[0].used_today == 2
+    assert scheduler.keys[0].tokens < 1
+
+
+def test_acquire_raises_when_rate_limit_outlasts_max_wait():
+    scheduler = UpstreamScheduler(["k1"], rate=0.01, burst=1.0, max_wait={INTERACTIVE: 0.1})
+
+    async def run():
+        await scheduler.acquire()
+        await scheduler.acquire()
+
+    with pytest.raises(QuotaExhausted) as info:
+        asyncio.run(run())
+    assert info.value.retry_after > 0.1
+
+
+def test_acquire_rotates_to_key_with_most_budget_left():
+    scheduler = UpstreamScheduler(["k1", "k2"], daily_budget=10)
+    scheduler.keys[0].used_today = 5
+    state = asyncio.run(scheduler.acquire())
+    assert state is scheduler.keys[1]
+
+
+def test_background_keeps_reserve_for_interactive():
+    scheduler = UpstreamScheduler(["k1"], daily_budget=10, background_reserve=0.2)
+    scheduler.keys[0].used_today = 8
+    with pytest.raises(QuotaExhausted):
+        asyncio.run(scheduler.acquire(BACKGROUND))
+    assert asyncio.run(scheduler.acquire(INTERACTIVE)) is scheduler.keys[0]
+
+
+def test_rate_limited_key_cools_down_instead_of_retiring_for_the_day():
+    scheduler = UpstreamScheduler(["k1"], max_wait={INTERACTIVE: 0.1})
+    state = scheduler.keys[0]
+    scheduler.report_rate_limited(state)
+    assert state.exhausted_day is None
+    assert state.remaining() is None
+    assert 0 < state.cooldown(time.monotonic()) <= quota.COOLDOWN_BASE
+    with pytest.raises(QuotaExhausted):
+        asyncio.run(scheduler.acquire())
+    # once the cooldown has passed the key is handed out again
+    state.cooldown_until = time.monotonic()
+    assert asyncio.run(scheduler.acquire()) is state
+
+
+def test_cooldown_doubles_per_consecutive_429_and_resets_on_success():
+    scheduler = UpstreamScheduler(["k1"])
+    state = scheduler.keys[0]
+    cooldowns = []
+    for _ in range(3):
+        scheduler.report_rate_limited(state)
+        cooldowns.append(state.cooldown_until - time.monotonic())
+    assert cooldowns[1] == pytest.approx(2 * cooldowns[0], abs=0.1)
+    assert cooldowns[2] == pytest.approx(4 * cooldowns[0], abs=0.1)
+    scheduler.report_success(state)
+    scheduler.report_rate_limited(state)
+    assert state.cooldown_until - time.monotonic() == pytest.approx(cooldowns[0], abs=0.1)
+
+
+def test_upstream_retry_after_extends_cooldown():
+    scheduler = UpstreamScheduler(["k1"])
+    state = scheduler.keys[0]
+    scheduler.report_rate_limited(state, retry_after=120)
+    assert state.cooldown(time.monotonic()) > 100
+
+
+def test_exhausted_key_is_retired_until_utc_midnight():
+    scheduler = UpstreamScheduler(["k1", "k2"])
+    scheduler.report_rate_limited(scheduler.keys[0], exhausted=True)
+    assert scheduler.keys[0].remaining() == 0
+    assert asyncio.run(scheduler.acquire()) is scheduler.keys[1]
+
+
+def test_status_never_exposes_key_material():
+    scheduler = UpstreamScheduler(["abcdef0123456789", "fedcba9876543210"])
+    status = scheduler.status()
+    assert [s["key"] for s in status] == ["key0", "key1"]
+    for s in status:
+        assert "abcd" not in s["key"] and "fedc" not in s["key"]
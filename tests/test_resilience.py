@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+import resilience
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, breaker_status, hedged
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_threshold_and_fails_fast(clock):
+    breaker = CircuitBreaker("top", failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.check() is False
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock[0] += 10
+    with pytest.raises(CircuitOpen) as info:
+        breaker.check()
+    assert info.value.status_code == 503
+    assert info.value.retry_after == pytest.approx(20)
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("top", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_one_probe_and_closes_on_success(clock):
+    breaker = CircuitBreaker("top", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 31
+    assert breaker.check() is True
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.check() is False
+
+
+def test_failed_probe_reopens_and_released_probe_can_retry(clock):
+    breaker = CircuitBreaker("top", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 31
+    assert breaker.check() is True
+    breaker.release()
+    assert breaker.check() is True
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+    assert breaker_status({"top": breaker}) == {"top": {"state": OPEN, "consecutive_failures": 2, "times_opened": 2}}
+
+
+def test_hedged_returns_the_faster_attempt_and_cancels_the_other():
+    calls = []
+    wins = []
+
+    async def slow():
+        calls.append("slow")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            calls.append("slow cancelled")
+            raise
+        return "slow"
+
+    async def fast():
+        calls.append("fast")
+        return "fast"
+
+    async def run():
+        result = await hedged(slow, 0.01, hedge=lambda: fast, on_hedge_won=lambda: wins.append(1))
+        await asyncio.sleep(0)  # let the cancellation be delivered
+        return result
+
+    assert asyncio.run(run()) == "fast"
+    assert calls == ["slow", "fast", "slow cancelled"]
+    assert wins == [1]
+
+
+def test_hedge_that_only_outlives_a_failed_primary_is_not_counted_as_a_win():
+    wins = []
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise ValueError("primary")
+
+    async def backup():
+        await asyncio.sleep(0.05)
+        return "backup"
+
+    assert asyncio.run(hedged(failing, 0.01, hedge=lambda: backup, on_hedge_won=lambda: wins.append(1))) == "backup"
+    assert wins == []
+
+
+def test_hedged_skips_the_second_attempt_when_hedge_declines():
+    async def call():
+        await asyncio.sleep(0.02)
+        return "only"
+
+    assert asyncio.run(hedged(call, 0.001, hedge=lambda: None)) == "only"
+
+
+def test_hedged_raises_only_when_both_attempts_fail():
+    attempts = iter([ValueError("first"), "second"])
+
+    async def call():
+        await asyncio.sleep(0.01)
+        outcome = next(attempts)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert asyncio.run(hedged(call, 0.001)) == "second"
+
+    async def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(hedged(failing, 0.001))
@@ -0,0 +1,188 @@
+import asyncio
+import time
+
+import pytest
+
+from response_cache import HIT, MISS, STALE, MemoryBackend, ResponseCache, cache_key
+from shared_cache import SharedCacheBackend
+
+
+class Upstream:
+    def __init__(self, value="fresh", delay=0.0, error=None):
+        self.value = value
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def age_entry(cache, key, seconds):
+    entry = cache.backend.get(key)
+    entry.stored_at -= seconds
+    if cache.backend.shared:
+        cache.backend.set(key, entry, 0)
+
+
+def test_cache_key_normalizes_params():
+    assert cache_key("top", {"country": "US", "q": ""}) == cache_key("top", {"q": None, "country": "us"})
+
+
+def test_miss_then_hit():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    upstream = Upstream()
+
+    async def run():
+        first = await cache.get_or_fetch("k", upstream)
+        second = await cache.get_or_fetch("k", upstream)
+        return first, second
+
+    (value, state, _), (value2, state2, _) = asyncio.run(run())
+    assert (value, state) == ("fresh", MISS)
+    assert (value2, state2) == ("fresh", HIT)
+    assert upstream.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    cache = ResponseCache(maxsize=10, ttl=60, stale_ttl=60)
+    cache.set("k", "old")
+    age_entry(cache, "k", 90)
+    upstream = Upstream("new")
+
+    async def run():
+        result = await cache.get_or_fetch("k", upstream)
+        await asyncio.sleep(0.01)
+        return result
+
+    value, state, age = asyncio.run(run())
+    assert (value, state) == ("old", STALE)
+    assert age >= 90
+    assert upstream.calls == 1
+    assert cache.lookup("k")[0].value == "new"
+
+
+def test_expired_entry_is_a_miss():
+    cache = ResponseCache(maxsize=10, ttl=60, stale_ttl=60)
+    cache.set("k", "old")
+    age_entry(cache, "k", 200)
+    value, state, _ = asyncio.run(cache.get_or_fetch("k", Upstream("new")))
+    assert (value, state) == ("new", MISS)
+
+
+def test_stale_if_error_serves_expired_entry():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    cache.set("k", "old")
+    age_entry(cache, "k", 200)
+    value, state, _ = asyncio.run(cache.get_or_fetch("k", Upstream(error=ValueError("down")), stale_if_error=(ValueError,)))
+    assert (value, state) == ("old", STALE)
+
+
+def test_stale_if_error_without_entry_raises():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    with pytest.raises(ValueError):
+        asyncio.run(cache.get_or_fetch("k", Upstream(error=ValueError("down")), stale_if_error=(ValueError,)))
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    upstream = Upstream(delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("k", upstream) for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert upstream.calls == 1
+    assert {r[0] for r in results} == {"fresh"}
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.lookup("a")
+    cache.set("c", 3)
+    assert cache.lookup("b") == (None, MISS)
+    assert cache.lookup("a")[1] == HIT
+
+
+def test_memory_unlock_requires_the_holders_token():
+    backend = MemoryBackend(10)
+    token = backend.try_lock("k", 30)
+    assert token is not None
+    assert backend.try_lock("k", 30) is None
+    backend.unlock("k", object())
+    assert backend.try_lock("k", 30) is None
+    backend.unlock("k", token)
+    assert backend.try_lock("k", 30) is not None
+
+
+def test_shared_lease_is_not_released_by_another_caller_in_the_same_process(tmp_path):
+    backend = SharedCacheBackend(str(tmp_path / "cache.db"), "top", maxsize=10)
+    holder = backend.try_lock("k", 30)
+    assert holder is not None
+    assert backend.try_lock("k", 30) is None
+    # a caller that gave up waiting never got a token, so it has nothing to release
+    backend.unlock("k", f"{backend.owner}-999")
+    assert backend.try_lock("k", 30) is None
+    backend.unlock("k", holder)
+    assert backend.try_lock("k", 30) is not None
+
+
+def test_shared_lease_expires(tmp_path):
+    backend = SharedCacheBackend(str(tmp_path / "cache.db"), "top", maxsize=10)
+    assert backend.try_lock("k", -1) is not None
+    assert backend.try_lock("k", 30) is not None
+
+
+def test_shared_backend_between_two_caches(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ResponseCache(maxsize=10, ttl=60, backend=SharedCacheBackend(path, "top", 10))
+    second = ResponseCache(maxsize=10, ttl=60, backend=SharedCacheBackend(path, "top", 10))
+    upstream = Upstream({"articles": [1, 2]})
+
+    async def run():
+        await first.get_or_fetch(("top", (("country", "us"),)), upstream)
+        return await second.get_or_fetch(("top", (("country", "us"),)), upstream)
+
+    value, state, _ = asyncio.run(run())
+    assert (value, state) == ({"articles": [1, 2]}, HIT)
+    assert upstream.calls == 1
+
+
+def test_waiting_caller_does_not_release_the_holders_lease(tmp_path):
+    # worker A holds the lease; this worker times out waiting, fetches anyway, and must
+    # leave A's lease in place so other workers keep waiting on A
+    path = str(tmp_path / "cache.db")
+    other_worker = SharedCacheBackend(path, "top", 10)
+    cache = ResponseCache(maxsize=10, ttl=60, backend=SharedCacheBackend(path, "top", 10), lock_wait=0.1)
+    held = other_worker.try_lock("k", 30)
+    started = time.monotonic()
+    value, state, _ = asyncio.run(cache.get_or_fetch("k", Upstream()))
+    assert (value, state) == ("fresh", MISS)
+    assert time.monotonic() - started >= 0.1
+    assert other_worker.try_lock("k", 30) is None
+    other_worker.unlock("k", held)
+
+
+def test_shared_approx_len_tracks_writes_without_querying(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    backend = SharedCacheBackend(path, "top", maxsize=3)
+    cache = ResponseCache(maxsize=3, ttl=60, backend=backend)
+    for i in range(5):
+        cache.set(("k", i), {"i": i})
+    cache.set(("k", 4), {"i": 4})
+    assert cache.approx_len() == 5
+    backend.evict()
+    assert cache.approx_len() == len(cache) == 3
+    # a new process starts from the count already in the file
+    assert SharedCacheBackend(path, "top", maxsize=3).approx_len() == 3
+    monkeypatch.setattr(SharedCacheBackend, "__len__", lambda self: pytest.fail("approx_len must not query SQLite"))
+    assert cache.approx_len() == 3
+    cache.clear()
+    assert cache.approx_len() == 0
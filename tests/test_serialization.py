@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+import app as app_module
+import serialization
+from serialization import negotiate_encoding, parse_fields, project_articles
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    # negotiation only checks that brotli is importable
+    monkeypatch.setattr(serialization, "brotli", object())
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(serialization, "brotli", None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.1, gzip;q=1.0", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("GZIP;Q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("br;q=0, gzip ; q=0", None),
+    ("gzip;q=oops", None),
+    ("identity", None),
+    ("deflate", None),
+    ("", None),
+])
+def test_negotiate_encoding_with_brotli(with_brotli, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiate_encoding_without_brotli_falls_back_to_gzip(without_brotli):
+    assert negotiate_encoding("br, gzip") == "gzip"
+    assert negotiate_encoding("br") is None
+
+
+def test_parse_fields_and_projection():
+    assert parse_fields(None) is None
+    assert parse_fields(" , ") is None
+    assert parse_fields("title, url,title") == ("title", "url")
+    with pytest.raises(ValueError, match="body"):
+        parse_fields("title,body")
+    data = {"status": "ok", "articles": [{"title": "t", "url": "u", "content": "c", "matched": ["q:x"]}]}
+    projected = project_articles(data, ("url", "author"))
+    assert projected["articles"] == [{"url": "u", "author": None, "matched": ["q:x"]}]
+    assert data["articles"][0]["content"] == "c"
+    assert project_articles(data, None) is data
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, "ARTICLE_STORE_ENABLED", False)
+    with TestClient(app_module.app) as c:
+        yield c
+
+
+def test_sources_revalidates_with_weak_etag(client, without_brotli):
+    first = client.get("/api/sources", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert first.headers["Content-Encoding"] == "gzip"
+
+    for candidate in (etag, etag[2:], f'"other", {etag}', "*"):
+        again = client.get("/api/sources", headers={"If-None-Match": candidate})
+        assert again.status_code == 304, candidate
+        assert again.content == b""
+        assert again.headers["ETag"] == etag
+
+    changed = client.get("/api/sources", headers={"If-None-Match": '"other"', "Accept-Encoding": "identity"})
+    assert changed.status_code == 200
+    assert "Content-Encoding" not in changed.headers
+
+
+def test_json_response_etag_on_paged_categories(client):
+    first = client.get("/api/sources/categories")
+    again = client.get("/api/sources/categories", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.headers["Cache-Control"] == first.headers["Cache-Control"]
@@ -0,0 +1,100 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from snapshots import SnapshotStore, fetch_snapshots
+
+PAGES = {"/a": b"<html>page a</html>", "/b": b"<html>page b</html>", "/same": b"<html>page a</html>"}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    yield store
+    store.close()
+
+
+def unused_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_fetch_stores_bodies_and_records_each_url(stub_server, store):
+    urls = [f"{stub_server}/a", f"{stub_server}/b", f"{stub_server}/a"]
+    progress = []
+    results = fetch_snapshots(urls, store, "session-1", concurrency=4, timeout=5, progress=lambda done, total, r: progress.append((done, total)))
+    assert len(results) == 2
+    assert sorted(progress) == [(1, 2), (2, 2)]
+    by_url = {r["url"]: r for r in results}
+    for path in ("/a", "/b"):
+        result = by_url[stub_server + path]
+        assert result["status"] == 200 and result["error"] == ""
+        assert store.read(result["sha256"]) == PAGES[path]
+    listed = store.list_snapshots("session-1")
+    assert {s["url"] for s in listed} == {f"{stub_server}/a", f"{stub_server}/b"}
+
+
+def test_identical_bodies_are_stored_once_and_refresh_adds_records(stub_server, store):
+    first = fetch_snapshots([f"{stub_server}/a", f"{stub_server}/same"], store, "s", timeout=5)
+    assert len({r["sha256"] for r in first}) == 1
+    again = fetch_snapshots([f"{stub_server}/a"], store, "s", timeout=5)
+    assert again[0]["sha256"] == first[0]["sha256"]
+    assert len(store.list_snapshots("s")) == 3
+
+
+def test_failed_fetches_are_recorded_not_raised(stub_server, store):
+    missing = f"{stub_server}/missing"
+    refused = f"http://127.0.0.1:{unused_port()}/down"
+    results = {r["url"]: r for r in fetch_snapshots([missing, refused], store, "s", timeout=2)}
+    # an HTTP error page is still a snapshot, with its status
+    assert results[missing]["status"] == 404 and results[missing]["sha256"]
+    assert results[refused]["status"] is None and results[refused]["sha256"] is None
+    assert "ConnectionError" in results[refused]["error"]
+    recorded = {s["url"]: s for s in store.list_snapshots("s")}
+    assert recorded[refused]["error"] and recorded[refused]["sha256"] is None
+
+
+def test_empty_url_list():
+    assert fetch_snapshots(["", None], None, "s") == []
+
+
+def test_stored_snapshots_can_be_listed_by_session_and_opened_offline(stub_server, store, tmp_path):
+    fetch_snapshots([f"{stub_server}/a"], store, "first", timeout=5)
+    fetch_snapshots([f"{stub_server}/b", f"{stub_server}/same"], store, "second", timeout=5)
+    assert [(s["session"], s["count"]) for s in store.sessions()] == [("second", 2), ("first", 1)]
+
+    snap = store.list_snapshots("first")[0]
+    path = store.open_copy(snap["sha256"], snap["content_type"], directory=str(tmp_path / "open"))
+    assert path.endswith(".html")
+    with open(path, "rb") as f:
+        assert f.read() == PAGES["/a"]
+    assert store.open_copy(snap["sha256"], "text/html; charset=utf-8", directory=str(tmp_path / "open")) == path
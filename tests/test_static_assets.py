@@ -0,0 +1,23 @@
+from static_assets import IMMUTABLE, REVALIDATE, AssetManifest
+
+
+def test_manifest_serves_only_web_assets(tmp_path):
+    (tmp_path / "main.js").write_text("console.log(1);")
+    (tmp_path / "tool.py").write_text("print(1)")
+    (tmp_path / ".env").write_text("SECRET=1")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "tool.cpython-311.pyc").write_bytes(b"\0")
+    manifest = AssetManifest(str(tmp_path))
+    assert sorted(manifest.urls) == ["main.js"]
+    assert manifest.lookup("tool.py") == (None, None)
+    assert manifest.lookup("__pycache__/tool.cpython-311.pyc") == (None, None)
+
+
+def test_fingerprinted_url_is_immutable(tmp_path):
+    (tmp_path / "styles.css").write_text("body{}")
+    manifest = AssetManifest(str(tmp_path))
+    url = manifest.url("styles.css")
+    assert url.startswith("/static/styles.") and url.endswith(".css")
+    _, cache_control = manifest.lookup(url[len("/static/"):])
+    assert cache_control == IMMUTABLE
+    assert manifest.lookup("styles.css")[1] == REVALIDATE
@@ -0,0 +1,191 @@
+import json
+import queue
+from types import SimpleNamespace
+
+import pytest
+
+tk_client = pytest.importorskip("tk_client")
+
+
+class FinishingWorker:
+    """A worker whose result lands in the queue just as the poller checks is_alive()."""
+
+    def __init__(self, results, result):
+        self.results = results
+        self.result = result
+
+    def is_alive(self):
+        self.results.put(self.result)
+        return False
+
+
+def make_client(results):
+    client = SimpleNamespace(
+        _sources_results=results,
+        news_sources={},
+        sources_validators={},
+        rebuilt=0,
+        root=SimpleNamespace(after=lambda *args: pytest.fail("should not poll again")),
+    )
+    client.rebuild_news_panel = lambda: setattr(client, "rebuilt", client.rebuilt + 1)
+    client._poll_sources_result = lambda worker: tk_client.TkClient._poll_sources_result(client, worker)
+    return client
+
+
+def test_poll_picks_up_result_put_just_before_worker_exits():
+    results = queue.Queue()
+    client = make_client(results)
+    catalog = {"Europe": {"Le Monde": "https://www.lemonde.fr/recherche/?search_keywords={query}"}}
+    client._poll_sources_result(FinishingWorker(results, (catalog, {"etag": "x"}, None)))
+    assert client.news_sources == catalog
+    assert client.sources_validators == {"etag": "x"}
+    assert client.rebuilt == 1
+
+
+def test_poll_reschedules_while_worker_runs():
+    results = queue.Queue()
+    client = make_client(results)
+    scheduled = []
+    client.root.after = lambda delay, fn, worker: scheduled.append(delay)
+    client._poll_sources_result(SimpleNamespace(is_alive=lambda: True))
+    assert scheduled == [100]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(tk_client, "DB_FILE", str(tmp_path / "sessions.db"))
+    yield tk_client.DB_FILE
+    tk_client.close_db()
+
+
+def create_legacy_db(path, rows):
+    import sqlite3
+
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE sessions (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL, data TEXT NOT NULL, created_at TEXT NOT NULL)"
+    )
+    conn.executemany("INSERT INTO sessions (name, data, created_at) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_init_db_migrates_blobs_and_keeps_unmigratable_rows(db):
+    good = {"rows": [{"url": "https://a.example", "keyword": "rates"}], "global_keyword": "rates"}
+    create_legacy_db(db, [
+        ("good", json.dumps(good), "2024-01-02T00:00:00"),
+        ("list", json.dumps([1, 2]), "2024-01-03T00:00:00"),
+        ("broken", "{not json", "2024-01-04T00:00:00"),
+    ])
+    assert tk_client.init_db() == ["list", "broken"]
+    assert tk_client.load_session_from_db("good") == good
+    assert [name for name, _ in tk_client.list_sessions()] == ["good"]
+    conn = tk_client.get_db()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == tk_client.DB_SCHEMA_VERSION
+    kept = conn.execute("SELECT name, data FROM sessions_unmigrated ORDER BY name").fetchall()
+    assert kept == [("broken", "{not json"), ("list", "[1, 2]")]
+    # a second start neither re-migrates nor reports anything
+    assert tk_client.init_db() == []
+
+
+def test_init_db_refuses_a_newer_schema(db):
+    tk_client.get_db().execute(f"PRAGMA user_version = {tk_client.DB_SCHEMA_VERSION + 1}")
+    with pytest.raises(RuntimeError):
+        tk_client.init_db()
+
+
+def test_save_and_load_round_trip_keeps_row_order_and_extra_fields(db):
+    tk_client.init_db()
+    data = {"rows": [{"url": f"https://x.example/{i}", "keyword": f"k{i}"} for i in range(5)], "global_date": "2024-05-01"}
+    tk_client.save_session_to_db("s", data)
+    assert tk_client.load_session_from_db("s") == data
+    tk_client.save_session_to_db("s", {"rows": [{"url": "https://y.example"}]})
+    assert tk_client.load_session_from_db("s") == {"rows": [{"url": "https://y.example", "keyword": ""}]}
+    assert tk_client.load_session_from_db("missing") is None
+
+
+def test_import_overwrites_or_skips_existing_sessions(db):
+    tk_client.init_db()
+    tk_client.save_session_to_db("a", {"rows": [{"url": "old", "keyword": ""}]})
+    incoming = [
+        {"name": "a", "data": {"rows": [{"url": "new", "keyword": ""}]}},
+        {"name": "b", "data": {"rows": []}},
+        {"name": "bad", "data": [1]},
+    ]
+    assert tk_client.import_sessions_list_to_db(incoming, overwrite_existing=False) == 1
+    assert tk_client.load_session_from_db("a")["rows"][0]["url"] == "old"
+    assert tk_client.import_sessions_list_to_db(incoming, overwrite_existing=True) == 2
+    assert tk_client.load_session_from_db("a")["rows"][0]["url"] == "new"
+    assert tk_client.count_sessions() == 2
+
+
+def test_iter_all_sessions_pages_newest_first_across_equal_timestamps(db):
+    tk_client.init_db()
+    sessions = [
+        {"name": f"s{i}", "created_at": f"2024-01-0{1 + i // 3}T00:00:00", "data": {"rows": [{"url": f"u{i}", "keyword": ""}]}}
+        for i in range(7)
+    ]
+    tk_client.import_sessions_list_to_db(sessions, overwrite_existing=True)
+    paged = list(tk_client.iter_all_sessions(batch_size=2))
+    assert [s["name"] for s in paged] == ["s6", "s5", "s4", "s3", "s2", "s1", "s0"]
+    assert paged[0]["data"] == {"rows": [{"url": "u6", "keyword": ""}]}
+
+
+def make_sessions(n, prefix="s"):
+    return [
+        {"name": f"{prefix}{i}", "created_at": f"2024-02-{1 + i:02d}T00:00:00", "data": {"rows": [{"url": f"https://x.example/{i}", "keyword": "k"}]}}
+        for i in range(n)
+    ]
+
+
+def test_archive_round_trip_into_a_fresh_db(db, tmp_path, monkeypatch):
+    tk_client.init_db()
+    tk_client.import_sessions_list_to_db(make_sessions(5), overwrite_existing=True)
+    archive = str(tmp_path / "sessions.ndjson")
+    exported = []
+    assert tk_client.export_sessions_archive(archive, progress=exported.append, batch_size=2) == 5
+    assert exported == [2, 4, 5]
+    before = tk_client.load_all_sessions()
+
+    tk_client.close_db()
+    monkeypatch.setattr(tk_client, "DB_FILE", str(tmp_path / "fresh.db"))
+    tk_client.init_db()
+    imported = []
+    assert tk_client.import_sessions_archive(archive, overwrite_existing=False, progress=imported.append, batch_size=2) == (5, 5)
+    assert imported == [2, 4, 5]
+    assert tk_client.load_all_sessions() == before
+
+
+def test_archive_import_overwrite_flag(db, tmp_path):
+    tk_client.init_db()
+    archive = tmp_path / "sessions.ndjson"
+    sessions = make_sessions(3)
+    archive.write_text("\n".join(json.dumps(s) for s in [{"format": tk_client.ARCHIVE_FORMAT, "version": 1}] + sessions), encoding="utf-8")
+    tk_client.save_session_to_db("s0", {"rows": [], "note": "local"})
+    assert tk_client.import_sessions_archive(str(archive), overwrite_existing=False, batch_size=3) == (3, 2)
+    assert tk_client.load_session_from_db("s0") == {"rows": [], "note": "local"}
+    assert tk_client.import_sessions_archive(str(archive), overwrite_existing=True, batch_size=3) == (3, 3)
+    assert tk_client.load_session_from_db("s0") == sessions[0]["data"]
+
+
+@pytest.mark.parametrize("document", [make_sessions(2), {"sessions": make_sessions(2)}])
+def test_archive_import_reads_legacy_documents(db, tmp_path, document):
+    tk_client.init_db()
+    path = tmp_path / "legacy.json"
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    assert tk_client.import_sessions_archive(str(path), overwrite_existing=True) == (2, 2)
+    assert tk_client.load_session_from_db("s1") == make_sessions(2)[1]["data"]
+
+
+@pytest.mark.parametrize("content", [
+    json.dumps({"exported_at": "2024-01-01T00:00:00", "rows": [{"url": "u", "keyword": "k"}]}),
+    json.dumps({"name": "stray"}) + "\n" + json.dumps({"name": "other"}),
+    json.dumps({"format": "news-source-sessions", "version": 2}),
+])
+def test_archive_import_rejects_unrecognized_files(db, tmp_path, content):
+    tk_client.init_db()
+    path = tmp_path / "other.json"
+    path.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError):
+        tk_client.import_sessions_archive(str(path), overwrite_existing=True)
+    assert tk_client.count_sessions() == 0
@@ -1,116 +1,401 @@
 import os
 import json
+import queue
 import sqlite3
+import threading
 import webbrowser
-from datetime import datetime, date
-from urllib.parse import quote_plus, quote
+from datetime import datetime, date, timezone
+from pathlib import Path
 
 import requests
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 
+from news_source import compile_template
+from snapshots import SnapshotStore, fetch_snapshots
+
 # Basic config
 API_BASE = os.getenv("NEWS_API_BASE", "http://127.0.0.1:8000")
 DB_FILE = "websearch_sessions.db"
+# Sessions per transaction / query when importing or exporting archives
+SESSION_BATCH_SIZE = int(os.getenv("SESSION_BATCH_SIZE", "500"))
+# Last catalog received from /api/sources, shown immediately on the next start
+SOURCES_CACHE_FILE = os.getenv("NEWS_SOURCES_CACHE", "news_sources_cache.json")
+SOURCES_TIMEOUT = float(os.getenv("NEWS_SOURCES_TIMEOUT", "10"))
 DOCK_PANEL_WIDTH = 520
+FILTER_DEBOUNCE_MS = 150
 
 
 # ---------------------------
 # Database helpers (from pasted script)
 # ---------------------------
 
+# Schema version stored in PRAGMA user_version; 0 is the original one-JSON-blob-per-session table
+DB_SCHEMA_VERSION = 1
+
+_db_conn = None
+_db_path = None
+_db_lock = threading.RLock()
+
+
+def get_db():
+    """Return the process-wide connection to DB_FILE, opening it (in WAL mode) on first use."""
+    global _db_conn, _db_path
+    with _db_lock:
+        if _db_conn is None or _db_path != DB_FILE:
+            close_db()
+            conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            _db_conn, _db_path = conn, DB_FILE
+        return _db_conn
+
+
+def close_db():
+    global _db_conn, _db_path
+    with _db_lock:
+        if _db_conn is not None:
+            _db_conn.close()
+        _db_conn, _db_path = None, None
+
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        created_at TEXT NOT NULL,
+        extra TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions(created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS session_rows (
+        session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        url TEXT NOT NULL DEFAULT '',
+        keyword TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (session_id, position)
+    ) WITHOUT ROWID
+    """,
+)
+
 
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            data TEXT NOT NULL,
-            created_at TEXT NOT NULL
+    """Create the schema, migrating older databases; returns names of legacy sessions that could not be migrated.
+
+    Unmigratable sessions are kept verbatim in `sessions_unmigrated` rather than dropped.
+    """
+    conn = get_db()
+    skipped = []
+    with _db_lock, conn:
+        # one transaction, so an interrupted migration leaves the legacy table untouched
+        conn.execute("BEGIN")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > DB_SCHEMA_VERSION:
+            raise RuntimeError(f"{DB_FILE} has schema version {version}; this client supports up to {DB_SCHEMA_VERSION}")
+        # version 0 is either a new file or the one-JSON-blob-per-session table
+        legacy = version == 0 and "data" in [r[1] for r in conn.execute("PRAGMA table_info(sessions)")]
+        if legacy:
+            conn.execute("ALTER TABLE sessions RENAME TO sessions_legacy")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        if legacy:
+            skipped = _migrate_blob_sessions(conn)
+        if version != DB_SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+    return skipped
+
+
+def _migrate_blob_sessions(conn):
+    """Move sessions from the legacy one-JSON-blob-per-session table into sessions/session_rows.
+
+    Rows whose blob is not a JSON object are copied to `sessions_unmigrated`; returns their names.
+    """
+    legacy = []
+    skipped = []
+    for name, data, created_at in conn.execute("SELECT name, data, created_at FROM sessions_legacy ORDER BY id"):
+        try:
+            parsed = json.loads(data)
+        except (TypeError, json.JSONDecodeError):
+            parsed = None
+        if isinstance(parsed, dict) and name:
+            legacy.append({'name': name, 'created_at': created_at, 'data': parsed})
+        else:
+            skipped.append(name)
+    _write_sessions(conn, legacy, overwrite_existing=True)
+    if skipped:
+        conn.execute("CREATE TABLE IF NOT EXISTS sessions_unmigrated (name TEXT, data TEXT, created_at TEXT)")
+        conn.execute(
+            "INSERT INTO sessions_unmigrated (name, data, created_at) SELECT name, data, created_at FROM sessions_legacy "
+            "WHERE name IS NULL OR name NOT IN (SELECT name FROM sessions)"
         )
+    conn.execute("DROP TABLE sessions_legacy")
+    return skipped
+
+
+def _split_session(data: dict):
+    """Return `(extra_json, rows)` for a session payload; rows are `(url, keyword)` pairs."""
+    rows = []
+    for row in data.get('rows') or []:
+        if isinstance(row, dict):
+            rows.append((str(row.get('url') or ''), str(row.get('keyword') or '')))
+    extra = {k: v for k, v in data.items() if k != 'rows'}
+    return (json.dumps(extra) if extra else None), rows
+
+
+def _join_session(extra, rows) -> dict:
+    data = json.loads(extra) if extra else {}
+    data['rows'] = [{'url': url, 'keyword': keyword} for url, keyword in rows]
+    return data
+
+
+def _write_sessions(conn, sessions, overwrite_existing: bool) -> int:
+    """Upsert `{'name', 'created_at', 'data'}` dicts with a fixed number of statements; returns sessions written."""
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    records = {}
+    for sess in sessions:
+        name = sess.get("name")
+        data = sess.get("data")
+        if not name or not isinstance(data, dict):
+            continue
+        extra, rows = _split_session(data)
+        if name in records and not overwrite_existing:
+            continue
+        records[name] = (sess.get("created_at") or now, extra, rows)
+    if not records:
+        return 0
+
+    names = json.dumps(list(records))
+    if not overwrite_existing:
+        existing = {r[0] for r in conn.execute("SELECT name FROM sessions WHERE name IN (SELECT value FROM json_each(?))", (names,))}
+        for name in existing:
+            del records[name]
+        if not records:
+            return 0
+        names = json.dumps(list(records))
+
+    conn.executemany(
         """
+        INSERT INTO sessions (name, created_at, extra)
+        VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            created_at=excluded.created_at,
+            extra=excluded.extra
+        """,
+        [(name, created_at, extra) for name, (created_at, extra, _) in records.items()],
+    )
+    ids = dict(conn.execute("SELECT name, id FROM sessions WHERE name IN (SELECT value FROM json_each(?))", (names,)))
+    conn.execute("DELETE FROM session_rows WHERE session_id IN (SELECT value FROM json_each(?))", (json.dumps(list(ids.values())),))
+    conn.executemany(
+        "INSERT INTO session_rows (session_id, position, url, keyword) VALUES (?, ?, ?, ?)",
+        [(ids[name], i, url, keyword) for name, (_, _, rows) in records.items() for i, (url, keyword) in enumerate(rows)],
     )
-    conn.commit()
-    conn.close()
+    return len(records)
 
 
 def save_session_to_db(name: str, data: dict):
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cur = conn.cursor()
-        payload = json.dumps(data)
-        created_at = datetime.utcnow().isoformat(timespec="seconds")
-        cur.execute(
-            """
-            INSERT INTO sessions (name, data, created_at)
-            VALUES (?, ?, ?)
-            ON CONFLICT(name) DO UPDATE SET
-                data=excluded.data,
-                created_at=excluded.created_at
-            """,
-            (name, payload, created_at),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    conn = get_db()
+    with _db_lock, conn:
+        _write_sessions(conn, [{'name': name, 'data': data}], overwrite_existing=True)
 
 
 def load_session_from_db(name: str):
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute("SELECT data FROM sessions WHERE name = ?", (name,))
-    row = cur.fetchone()
-    conn.close()
-    if not row:
-        return None
+    conn = get_db()
+    with _db_lock:
+        row = conn.execute("SELECT id, extra FROM sessions WHERE name = ?", (name,)).fetchone()
+        if not row:
+            return None
+        rows = conn.execute("SELECT url, keyword FROM session_rows WHERE session_id = ? ORDER BY position", (row[0],)).fetchall()
     try:
-        return json.loads(row[0])
+        return _join_session(row[1], rows)
     except json.JSONDecodeError:
         return None
 
 
 def list_sessions():
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    cur.execute("SELECT name, created_at FROM sessions ORDER BY created_at DESC")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with _db_lock:
+        return get_db().execute("SELECT name, created_at FROM sessions ORDER BY created_at DESC").fetchall()
+
+
+def iter_all_sessions(batch_size: int = SESSION_BATCH_SIZE):
+    """Yield every session as `{'name', 'created_at', 'data'}`, newest first, `batch_size` sessions per query.
+
+    Pages are keyset-paginated on `(created_at, id)`, so memory stays bounded by one batch
+    and the database lock is released between batches.
+    """
+    cursor = None
+    while True:
+        with _db_lock:
+            conn = get_db()
+            if cursor is None:
+                heads = conn.execute(
+                    "SELECT id, name, created_at, extra FROM sessions ORDER BY created_at DESC, id DESC LIMIT ?", (batch_size,)
+                ).fetchall()
+            else:
+                heads = conn.execute(
+                    "SELECT id, name, created_at, extra FROM sessions WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (*cursor, batch_size),
+                ).fetchall()
+            if not heads:
+                return
+            rows = {}
+            for session_id, url, keyword in conn.execute(
+                "SELECT session_id, url, keyword FROM session_rows WHERE session_id IN (SELECT value FROM json_each(?)) ORDER BY session_id, position",
+                (json.dumps([h[0] for h in heads]),),
+            ):
+                rows.setdefault(session_id, []).append((url, keyword))
+        for session_id, name, created_at, extra in heads:
+            try:
+                yield {'name': name, 'created_at': created_at, 'data': _join_session(extra, rows.get(session_id, []))}
+            except json.JSONDecodeError:
+                continue
+        cursor = (heads[-1][2], heads[-1][0])
+
+
+def load_all_sessions():
+    """Return every session as `{'name', 'created_at', 'data'}`, newest first."""
+    return list(iter_all_sessions())
+
+
+def count_sessions() -> int:
+    with _db_lock:
+        return get_db().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
 
 
 def import_sessions_list_to_db(sessions_list, overwrite_existing: bool):
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
+    conn = get_db()
+    with _db_lock, conn:
+        return _write_sessions(conn, sessions_list, overwrite_existing)
+
+
+# ---------------------------
+# Session archives
+# ---------------------------
+
+# NDJSON archives: one header object, then one session object per line
+ARCHIVE_FORMAT = "news-source-sessions"
+
+
+def export_sessions_archive(path: str, progress=None, batch_size: int = SESSION_BATCH_SIZE) -> int:
+    """Stream every session to an NDJSON archive at `path`; returns the number written.
+
+    The file is written to a temporary name and renamed, so a failed export never leaves a
+    truncated archive behind. `progress(written)` is called after each batch.
+    """
+    tmp = f"{path}.tmp"
+    written = 0
     try:
-        for sess in sessions_list:
-            name = sess.get("name")
-            data = sess.get("data")
-            created_at = sess.get("created_at") or datetime.utcnow().isoformat(timespec="seconds")
-            if not name or data is None:
-                continue
-            payload = json.dumps(data)
-            if overwrite_existing:
-                cur.execute(
-                    """
-                    INSERT INTO sessions (name, data, created_at)
-                    VALUES (?, ?, ?)
-                    ON CONFLICT(name) DO UPDATE SET
-                        data=excluded.data,
-                        created_at=excluded.created_at
-                    """,
-                    (name, payload, created_at),
-                )
-            else:
-                cur.execute(
-                    "INSERT OR IGNORE INTO sessions (name, data, created_at) VALUES (?, ?, ?)",
-                    (name, payload, created_at),
-                )
-        conn.commit()
-    finally:
-        conn.close()
+        with open(tmp, 'w', encoding='utf-8') as f:
+            header = {'format': ARCHIVE_FORMAT, 'version': 1, 'exported_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+            f.write(json.dumps(header, ensure_ascii=False) + '\n')
+            for sess in iter_all_sessions(batch_size):
+                f.write(json.dumps(sess, ensure_ascii=False) + '\n')
+                written += 1
+                if progress is not None and written % batch_size == 0:
+                    progress(written)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if progress is not None:
+        progress(written)
+    return written
+
+
+def iter_archive_sessions(path: str):
+    """Yield session dicts from an NDJSON archive or a legacy single-document JSON export.
+
+    NDJSON is recognized only by its ARCHIVE_FORMAT header and parsed line by line. Legacy
+    files (a list, or an object with a 'sessions' list) have to be loaded whole, as before.
+    Raises ValueError for anything else, e.g. a single-session rows export.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+        try:
+            head = json.loads(first) if first.strip() else None
+        except json.JSONDecodeError:
+            head = None
+        if isinstance(head, dict) and head.get('format') == ARCHIVE_FORMAT:
+            if head.get('version') != 1:
+                raise ValueError(f"Unsupported archive version: {head.get('version')}")
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        f.seek(0)
+        data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get('sessions'), list):
+        yield from data['sessions']
+    elif isinstance(data, list):
+        yield from data
+    else:
+        raise ValueError("JSON format not recognized. Must be a list or contain 'sessions' key.")
+
+
+def import_sessions_archive(path: str, overwrite_existing: bool, progress=None, batch_size: int = SESSION_BATCH_SIZE):
+    """Import an archive in transactions of `batch_size` sessions; returns `(read, imported)`."""
+    read = imported = 0
+    batch = []
+    for sess in iter_archive_sessions(path):
+        if isinstance(sess, dict):
+            batch.append(sess)
+        read += 1
+        if len(batch) >= batch_size:
+            imported += import_sessions_list_to_db(batch, overwrite_existing)
+            batch = []
+            if progress is not None:
+                progress(read)
+    if batch:
+        imported += import_sessions_list_to_db(batch, overwrite_existing)
+    if progress is not None:
+        progress(read)
+    return read, imported
+
+
+# ---------------------------
+# Source catalog cache
+# ---------------------------
+
+
+def load_cached_sources():
+    """Return `(sources, validators)` from SOURCES_CACHE_FILE, or `({}, {})` if missing or unreadable."""
+    try:
+        with open(SOURCES_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached['sources'], cached.get('validators') or {}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}, {}
+
+
+def save_cached_sources(sources: dict, validators: dict):
+    tmp = f"{SOURCES_CACHE_FILE}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'validators': validators, 'sources': sources}, f, ensure_ascii=False)
+    # atomic replace, so a crash mid-write never leaves a truncated cache
+    os.replace(tmp, SOURCES_CACHE_FILE)
+
+
+def revalidate_sources(api_base: str, validators: dict):
+    """Fetch /api/sources conditionally.
+
+    Returns `(sources, validators)` when the catalog changed, or `(None, validators)` on a
+    304. Network and HTTP errors propagate to the caller.
+    """
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    r = requests.get(f"{api_base}/api/sources", headers=headers, timeout=SOURCES_TIMEOUT)
+    if r.status_code == 304:
+        return None, validators
+    r.raise_for_status()
+    fresh = {k: v for k, v in (('etag', r.headers.get('ETag')), ('last_modified', r.headers.get('Last-Modified'))) if v}
+    # expected mapping: {category: {source: template}}
+    return r.json(), fresh
 
 
 # ---------------------------
@@ -132,20 +417,8 @@ def build_query(keyword: str, date_str: str = "", domain: str = "") -> str:
 def route_query(query: str, base_url: str) -> str:
     if not base_url:
         return ""
-
-    if "{query}" in base_url:
-        pos_placeholder = base_url.find("{query}")
-        pos_qmark = base_url.find('?')
-        if pos_qmark == -1 or pos_placeholder < pos_qmark:
-            q_encoded = quote(query, safe='') if query else ""
-        else:
-            q_encoded = quote_plus(query) if query else ""
-        return base_url.replace("{query}", q_encoded)
-
-    if "?" in base_url:
-        return f"{base_url}&q={quote_plus(query)}" if query else base_url
-
-    return f"{base_url}?q={quote_plus(query)}" if query else base_url
+    # compiled templates are cached, so repeated rows/sources skip the parsing
+    return compile_template(base_url).render(query)
 
 
 # ---------------------------
@@ -153,13 +426,96 @@ def route_query(query: str, base_url: str) -> str:
 # ---------------------------
 
 
+class VirtualCheckList(tk.Frame):
+    """A scrollable checkbox list that only creates widgets for the rows on screen.
+
+    A fixed pool of Checkbuttons (one per visible row) is re-labelled as the view scrolls,
+    so the widget count is independent of the number of items. Checked state lives in
+    `selected` (a set of item names shared with the caller), not in the widgets.
+    """
+
+    def __init__(self, parent, selected: set, row_height: int = 24):
+        super().__init__(parent)
+        self.items = []
+        self.selected = selected
+        self.row_height = row_height
+        self.top = 0
+        self.rows = []
+        self.body = tk.Frame(self)
+        self.body.pack(side='left', fill='both', expand=True)
+        self.vsb = tk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.vsb.pack(side='right', fill='y')
+        self.body.bind('<Configure>', self._on_resize)
+        self._bind_wheel(self.body)
+
+    def set_items(self, names):
+        self.items = names
+        self.top = 0
+        self.render()
+
+    def render(self):
+        visible = len(self.rows)
+        self.top = max(0, min(self.top, len(self.items) - visible))
+        for i, (cb, var) in enumerate(self.rows):
+            idx = self.top + i
+            if idx < len(self.items):
+                name = self.items[idx]
+                cb.config(text=name)
+                var.set(name in self.selected)
+                cb.grid()
+            else:
+                cb.grid_remove()
+        total = len(self.items) or 1
+        self.vsb.set(self.top / total, min(1.0, (self.top + visible) / total))
+
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.items))
+        elif args[0] == 'scroll':
+            step = len(self.rows) if args[2] == 'pages' else 1
+            self.top += int(args[1]) * step
+        self.render()
+
+    def _on_resize(self, event):
+        wanted = max(1, event.height // self.row_height)
+        while len(self.rows) < wanted:
+            i = len(self.rows)
+            var = tk.BooleanVar(value=False)
+            cb = tk.Checkbutton(self.body, variable=var, anchor='w', command=lambda i=i: self._toggle(i))
+            cb.grid(row=i, column=0, sticky='ew', padx=2)
+            self._bind_wheel(cb)
+            self.rows.append((cb, var))
+        while len(self.rows) > wanted:
+            cb, _var = self.rows.pop()
+            cb.destroy()
+        self.body.columnconfigure(0, weight=1)
+        self.render()
+
+    def _toggle(self, i: int):
+        name = self.items[self.top + i]
+        if self.rows[i][1].get():
+            self.selected.add(name)
+        else:
+            self.selected.discard(name)
+
+    def _bind_wheel(self, widget):
+        widget.bind('<MouseWheel>', lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        widget.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        widget.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+
+
 class TkClient:
     def __init__(self, api_base=API_BASE):
         self.api_base = api_base.rstrip('/')
         self.root = tk.Tk()
         self.root.title('Web Search Tool (Tk client)')
         self.root.geometry('1200x900')
-        self.news_sources = {}
+        self.news_sources, self.sources_validators = load_cached_sources()
+        self.news_panel = None
+        self.panes = None
+        self._sources_results = queue.Queue()
+        self.status_var = tk.StringVar()
+        self._snapshot_store = None
 
         # UI state
         self.row_entries = []
@@ -168,20 +524,61 @@ class TkClient:
         self.session_name_var = tk.StringVar()
         self.sessions_combobox = None
 
-        init_db()
+        unmigrated = init_db()
         self.build_ui()
+        if unmigrated:
+            messagebox.showwarning(
+                'Sessions',
+                f'{len(unmigrated)} saved session(s) could not be migrated and were kept in the '
+                f'sessions_unmigrated table:\n' + '\n'.join(str(n) for n in unmigrated[:20]),
+            )
 
     def fetch_sources(self):
+        """Revalidate the catalog in a background thread; the cached copy is already on screen."""
+        worker = threading.Thread(target=self._revalidate_sources_worker, args=(dict(self.sources_validators),), daemon=True)
+        worker.start()
+        self.root.after(100, self._poll_sources_result, worker)
+
+    def _revalidate_sources_worker(self, validators: dict):
+        # runs off the Tk thread: no widget access here, results go through the queue
         try:
-            r = requests.get(f"{self.api_base}/api/sources", timeout=5)
-            r.raise_for_status()
-            data = r.json()
-            # expected mapping: {category: {source: template}}
-            self.news_sources = data
-            return True
+            sources, fresh = revalidate_sources(self.api_base, validators)
+            if sources is not None and sources != self.news_sources:
+                save_cached_sources(sources, fresh)
+            self._sources_results.put((sources, fresh, None))
         except Exception as e:
-            messagebox.showerror('Error', f'Failed to fetch sources from API: {e}')
-            return False
+            self._sources_results.put((None, validators, e))
+
+    def _poll_sources_result(self, worker: threading.Thread):
+        try:
+            result = self._sources_results.get_nowait()
+        except queue.Empty:
+            if worker.is_alive():
+                self.root.after(100, self._poll_sources_result, worker)
+                return
+            # the worker may have put its result and exited after the get above; look once more
+            try:
+                result = self._sources_results.get_nowait()
+            except queue.Empty:
+                return
+        sources, validators, error = result
+        if error is not None:
+            # a cached catalog is still usable; only complain when there is nothing to show
+            if not self.news_sources:
+                messagebox.showerror('Error', f'Failed to fetch sources from API: {error}')
+            return
+        self.sources_validators = validators
+        if sources is not None and sources != self.news_sources:
+            self.news_sources = sources
+            self.rebuild_news_panel()
+
+    def rebuild_news_panel(self):
+        old = self.news_panel
+        self.news_panel = self.build_news_sources_panel(self.panes)
+        self.panes.add(self.news_panel)
+        if old is not None:
+            self.panes.forget(old)
+            old.destroy()
 
     def add_row(self):
         frame = tk.Frame(self.rows_frame)
@@ -224,20 +621,103 @@ class TkClient:
         r['keyword'].set(keyword)
 
     def open_all(self):
-        date_val = self.global_date_var.get().strip()
-        for r in self.row_entries:
-            url_template = r['url'].get().strip()
-            keyword = r['keyword'].get().strip()
-            if not url_template:
-                continue
-            query = build_query(keyword, date_val, '')
-            final_url = route_query(query, url_template)
+        for final_url in self.row_urls():
             # open in a new browser tab when possible
             try:
                 webbrowser.open(final_url, new=2)
             except Exception:
                 webbrowser.open(final_url)
 
+    def row_urls(self):
+        """Return the final URL (template plus query) of every non-empty row."""
+        date_val = self.global_date_var.get().strip()
+        urls = []
+        for r in self.row_entries:
+            url_template = r['url'].get().strip()
+            if url_template:
+                urls.append(route_query(build_query(r['keyword'].get().strip(), date_val, ''), url_template))
+        return urls
+
+    def fetch_snapshots(self):
+        urls = self.row_urls()
+        if not urls:
+            messagebox.showinfo('Snapshots', 'No rows with a URL to fetch.')
+            return
+        if self._snapshot_store is None:
+            self._snapshot_store = SnapshotStore()
+        session = self.session_name_var.get().strip() or 'unsaved'
+        self.status_var.set(f'Fetching 0/{len(urls)}...')
+
+        def on_done(results):
+            failed = sum(1 for r in results if r['error'])
+            self.status_var.set(f"Snapshots for '{session}': {len(results) - failed} saved, {failed} failed")
+
+        def on_error(e):
+            self.status_var.set('')
+            messagebox.showerror('Snapshots', f'Snapshot fetch failed: {e}')
+
+        self.run_in_background(
+            lambda report: fetch_snapshots(urls, self._snapshot_store, session, progress=lambda done, total, _r: report(done, total)),
+            on_progress=lambda done, total: self.status_var.set(f'Fetching {done}/{total}...'),
+            on_done=on_done,
+            on_error=on_error,
+        )
+
+    def show_snapshots(self):
+        """Browse stored snapshots by session and open them offline in the browser."""
+        if self._snapshot_store is None:
+            self._snapshot_store = SnapshotStore()
+        store = self._snapshot_store
+        sessions = [s['session'] for s in store.sessions()]
+        if not sessions:
+            messagebox.showinfo('Snapshots', 'No snapshots stored yet. Use Fetch Snapshots first.')
+            return
+
+        win = tk.Toplevel(self.root)
+        win.title('Snapshots')
+        win.geometry('900x420')
+        top = tk.Frame(win)
+        top.pack(fill='x', padx=5, pady=5)
+        tk.Label(top, text='Session:').pack(side='left')
+        session_box = ttk.Combobox(top, values=sessions, width=40, state='readonly')
+        current = self.session_name_var.get().strip()
+        session_box.set(current if current in sessions else sessions[0])
+        session_box.pack(side='left', padx=5)
+
+        columns = ('fetched_at', 'status', 'size', 'url')
+        tree = ttk.Treeview(win, columns=columns, show='headings')
+        for col, width in zip(columns, (150, 60, 80, 580)):
+            tree.heading(col, text=col.replace('_', ' ').title())
+            tree.column(col, width=width, stretch=(col == 'url'))
+        tree.pack(fill='both', expand=True, padx=5)
+        snapshots = {}
+
+        def refresh(*_):
+            tree.delete(*tree.get_children())
+            snapshots.clear()
+            for snap in store.list_snapshots(session_box.get()):
+                status = snap['status'] if snap['sha256'] else 'failed'
+                iid = tree.insert('', 'end', values=(snap['fetched_at'], status, snap['size'], snap['url']))
+                snapshots[iid] = snap
+
+        def open_selected(*_):
+            for iid in tree.selection():
+                snap = snapshots[iid]
+                if not snap['sha256']:
+                    messagebox.showerror('Snapshots', f"No stored page for {snap['url']}:\n{snap['error']}", parent=win)
+                    continue
+                try:
+                    path = store.open_copy(snap['sha256'], snap['content_type'] or '')
+                except OSError as e:
+                    messagebox.showerror('Snapshots', f'Failed to open snapshot: {e}', parent=win)
+                    continue
+                webbrowser.open(Path(path).resolve().as_uri(), new=2)
+
+        session_box.bind('<<ComboboxSelected>>', refresh)
+        tree.bind('<Double-1>', open_selected)
+        tk.Button(top, text='Open Selected', command=open_selected).pack(side='left', padx=5)
+        refresh()
+
     def export_current_rows_to_file(self):
         rows_data = []
         for r in self.row_entries:
@@ -252,7 +732,7 @@ class TkClient:
         path = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('JSON files', '*.json')])
         if not path:
             return
-        payload = {'exported_at': datetime.utcnow().isoformat(timespec='seconds'), 'rows': rows_data}
+        payload = {'exported_at': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'rows': rows_data}
         try:
             with open(path, 'w', encoding='utf-8') as f:
                 json.dump(payload, f, indent=2, ensure_ascii=False)
@@ -261,55 +741,99 @@ class TkClient:
             messagebox.showerror('Export Error', f'Failed to export rows: {e}')
 
     def export_all_sessions_to_file(self):
-        sessions = list_sessions()
-        if not sessions:
+        total = count_sessions()
+        if not total:
             messagebox.showinfo('Export', 'No saved sessions to export.')
             return
-        sessions_payload = []
-        for name, created_at in sessions:
-            sess = load_session_from_db(name)
-            if sess is None:
-                continue
-            sessions_payload.append({'name': name, 'created_at': created_at, 'data': sess})
-        path = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('JSON files', '*.json')])
+        path = filedialog.asksaveasfilename(
+            defaultextension='.ndjson', filetypes=[('Session archives', '*.ndjson'), ('All files', '*.*')]
+        )
         if not path:
             return
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump({'exported_at': datetime.utcnow().isoformat(timespec='seconds'), 'sessions': sessions_payload}, f, indent=2, ensure_ascii=False)
-            messagebox.showinfo('Export', f'All sessions exported to:\n{path}')
-        except Exception as e:
+        self.status_var.set(f'Exporting 0/{total} sessions...')
+
+        def on_done(written):
+            self.status_var.set('')
+            messagebox.showinfo('Export', f'{written} session(s) exported to:\n{path}')
+
+        def on_error(e):
+            self.status_var.set('')
             messagebox.showerror('Export Error', f'Failed to export sessions: {e}')
 
+        self.run_in_background(
+            lambda report: export_sessions_archive(path, progress=report),
+            on_progress=lambda written: self.status_var.set(f'Exporting {written}/{total} sessions...'),
+            on_done=on_done,
+            on_error=on_error,
+        )
+
     def import_sessions_from_file(self):
-        path = filedialog.askopenfilename(filetypes=[('JSON files', '*.json'), ('All files', '*.*')])
+        path = filedialog.askopenfilename(
+            filetypes=[('Session archives', '*.ndjson *.json'), ('All files', '*.*')]
+        )
         if not path:
             return
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception as e:
-            messagebox.showerror('Import Error', f'Failed to read file: {e}')
-            return
-        sessions_list = None
-        if isinstance(data, dict) and 'sessions' in data and isinstance(data['sessions'], list):
-            sessions_list = data['sessions']
-        elif isinstance(data, list):
-            sessions_list = data
-        else:
-            messagebox.showerror('Import Error', "JSON format not recognized. Must be a list or contain 'sessions' key.")
-            return
-        if not sessions_list:
-            messagebox.showinfo('Import', 'No sessions found in the file.')
-            return
         overwrite = messagebox.askyesno('Import Sessions', 'Overwrite existing sessions with the same name?')
-        try:
-            import_sessions_list_to_db(sessions_list, overwrite)
+        self.status_var.set('Importing sessions...')
+
+        def on_done(counts):
+            read, imported = counts
+            self.status_var.set('')
+            self.refresh_sessions_combobox()
+            if not read:
+                messagebox.showinfo('Import', 'No sessions found in the file.')
+            else:
+                messagebox.showinfo('Import', f'Imported {imported} of {read} session(s) from:\n{path}')
+
+        def on_error(e):
+            self.status_var.set('')
             self.refresh_sessions_combobox()
-            messagebox.showinfo('Import', f'Imported {len(sessions_list)} session(s) from:\n{path}')
-        except Exception as e:
             messagebox.showerror('Import Error', f'Failed to import sessions: {e}')
 
+        self.run_in_background(
+            lambda report: import_sessions_archive(path, overwrite, progress=report),
+            on_progress=lambda read: self.status_var.set(f'Importing... {read} session(s) read'),
+            on_done=on_done,
+            on_error=on_error,
+        )
+
+    def run_in_background(self, work, on_progress=None, on_done=None, on_error=None):
+        """Run `work(report)` on a daemon thread and deliver its outcome on the Tk thread.
+
+        `report(*args)` may be called from the worker; only the latest report per poll tick
+        reaches `on_progress(*args)`. Then `on_done(result)` or `on_error(exception)` runs.
+        """
+        events = queue.Queue()
+
+        def target():
+            try:
+                result = work(lambda *args: events.put(('progress', args)))
+            except Exception as e:
+                events.put(('error', e))
+            else:
+                events.put(('done', result))
+
+        def poll():
+            latest = None
+            while True:
+                try:
+                    kind, payload = events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'progress':
+                    latest = payload
+                    continue
+                callback = on_done if kind == 'done' else on_error
+                if callback is not None:
+                    callback(payload)
+                return
+            if latest is not None and on_progress is not None:
+                on_progress(*latest)
+            self.root.after(100, poll)
+
+        threading.Thread(target=target, daemon=True).start()
+        self.root.after(100, poll)
+
     def save_session_with_name(self, name: str):
         if not name:
             messagebox.showerror('Save Session', 'Session name cannot be empty.')
@@ -352,96 +876,93 @@ class TkClient:
         nb = ttk.Notebook(panel)
         nb.pack(fill='both', expand=True, padx=4, pady=4)
 
-        self.news_vars = {}
+        self.news_selected = {}
         self.region_kw_vars = {}
-
-        cb_wrap = DOCK_PANEL_WIDTH - 60
+        # region -> (names, lowercased names), built once so filtering is a plain scan
+        self.news_index = {}
+        pending_tabs = {}
 
         for region, sources in self.news_sources.items():
             tab = tk.Frame(nb)
             nb.add(tab, text=region)
-
-            search_frame = tk.Frame(tab)
-            search_frame.pack(fill='x', padx=6, pady=(6, 2))
-            tk.Label(search_frame, text='Filter:').pack(side='left')
-            search_var = tk.StringVar()
-            tk.Entry(search_frame, textvariable=search_var, width=30).pack(side='left', padx=(6, 4))
-
-            sc_container, sc_inner, _ = self.make_scrollable_frame(tab)
-            sc_container.pack(fill='both', expand=True, padx=6, pady=4)
-
-            region_map = {}
-            for name, url in sources.items():
-                var = tk.BooleanVar(value=False)
-                cb = tk.Checkbutton(sc_inner, text=name, variable=var, anchor='w', justify='left', wraplength=cb_wrap)
-                cb.pack(anchor='w', fill='x', padx=2, pady=1)
-                region_map[name] = (var, url, cb)
-            self.news_vars[region] = region_map
-
-            controls = tk.Frame(tab)
-            controls.pack(fill='x', padx=6, pady=6)
-
-            tk.Label(controls, text='Keyword:').grid(row=0, column=0, sticky='w')
-            kw_var = tk.StringVar()
-            tk.Entry(controls, textvariable=kw_var, width=30).grid(row=0, column=1, sticky='w', padx=(6, 4))
-            self.region_kw_vars[region] = kw_var
-
-            def select_all_region(r=region):
-                for v, _u, _cb in self.news_vars[r].values():
-                    v.set(True)
-
-            def clear_all_region(r=region):
-                for v, _u, _cb in self.news_vars[r].values():
-                    v.set(False)
-
-            def add_selected_region(r=region):
-                keyword = self.region_kw_vars[r].get().strip() or self.global_keyword_var.get().strip()
-                added = 0
-                for name, (v, url_template, _cb) in self.news_vars[r].items():
-                    if v.get():
-                        self.insert_source_bottom(url_template, keyword)
-                        added += 1
-                if added == 0:
-                    messagebox.showinfo('No selection', 'No sources selected.')
-                else:
-                    messagebox.showinfo('Added', f'Added {added} source(s) to the rows.')
-
-            btn_frame = tk.Frame(tab)
-            btn_frame.pack(fill='x', padx=6, pady=(0, 6))
-            tk.Button(btn_frame, text='Select All', command=select_all_region).pack(side='left', padx=2)
-            tk.Button(btn_frame, text='Clear All', command=clear_all_region).pack(side='left', padx=2)
-            tk.Button(btn_frame, text='Add Selected', command=add_selected_region).pack(side='left', padx=8)
-
-            def make_filter_callback(sv, r=region):
-                def on_change(*a):
-                    q = sv.get().strip().lower()
-                    for name, (_v, _u, cb) in self.news_vars[r].items():
-                        visible = (q == '') or (q in name.lower())
-                        if visible:
-                            cb.pack(anchor='w', fill='x', padx=2, pady=1)
-                        else:
-                            cb.pack_forget()
-                return on_change
-
-            search_var.trace_add('write', make_filter_callback(search_var, region))
-
+            names = list(sources)
+            self.news_index[region] = (names, [n.lower() for n in names])
+            self.news_selected[region] = set()
+            self.region_kw_vars[region] = tk.StringVar()
+            pending_tabs[str(tab)] = (tab, region)
+
+        def on_tab_changed(_event=None):
+            # tab contents are only built the first time the tab is shown
+            current = nb.select()
+            if current in pending_tabs:
+                tab, region = pending_tabs.pop(current)
+                self.build_region_tab(tab, region)
+
+        nb.bind('<<NotebookTabChanged>>', on_tab_changed)
+        on_tab_changed()
         return panel
 
-    def make_scrollable_frame(self, parent):
-        container = tk.Frame(parent)
-        canvas = tk.Canvas(container, borderwidth=0, highlightthickness=0)
-        vsb = tk.Scrollbar(container, orient='vertical', command=canvas.yview)
-        inner = tk.Frame(canvas)
+    def build_region_tab(self, tab, region: str):
+        sources = self.news_sources[region]
+        names, lowered = self.news_index[region]
+        selected = self.news_selected[region]
+
+        search_frame = tk.Frame(tab)
+        search_frame.pack(fill='x', padx=6, pady=(6, 2))
+        tk.Label(search_frame, text='Filter:').pack(side='left')
+        search_var = tk.StringVar()
+        tk.Entry(search_frame, textvariable=search_var, width=30).pack(side='left', padx=(6, 4))
+
+        source_list = VirtualCheckList(tab, selected)
+        source_list.pack(fill='both', expand=True, padx=6, pady=4)
+        source_list.set_items(names)
+
+        controls = tk.Frame(tab)
+        controls.pack(fill='x', padx=6, pady=6)
+
+        tk.Label(controls, text='Keyword:').grid(row=0, column=0, sticky='w')
+        tk.Entry(controls, textvariable=self.region_kw_vars[region], width=30).grid(row=0, column=1, sticky='w', padx=(6, 4))
+
+        def select_all_region():
+            selected.update(names)
+            source_list.render()
+
+        def clear_all_region():
+            selected.clear()
+            source_list.render()
+
+        def add_selected_region():
+            keyword = self.region_kw_vars[region].get().strip() or self.global_keyword_var.get().strip()
+            added = 0
+            for name in names:
+                if name in selected:
+                    self.insert_source_bottom(sources[name], keyword)
+                    added += 1
+            if added == 0:
+                messagebox.showinfo('No selection', 'No sources selected.')
+            else:
+                messagebox.showinfo('Added', f'Added {added} source(s) to the rows.')
+
+        btn_frame = tk.Frame(tab)
+        btn_frame.pack(fill='x', padx=6, pady=(0, 6))
+        tk.Button(btn_frame, text='Select All', command=select_all_region).pack(side='left', padx=2)
+        tk.Button(btn_frame, text='Clear All', command=clear_all_region).pack(side='left', padx=2)
+        tk.Button(btn_frame, text='Add Selected', command=add_selected_region).pack(side='left', padx=8)
 
-        inner.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
+        pending = [None]
 
-        canvas.create_window((0, 0), window=inner, anchor='nw')
-        canvas.configure(yscrollcommand=vsb.set)
+        def apply_filter():
+            pending[0] = None
+            q = search_var.get().strip().lower()
+            source_list.set_items([n for n, low in zip(names, lowered) if q in low] if q else names)
 
-        canvas.pack(side='left', fill='both', expand=True)
-        vsb.pack(side='right', fill='y')
+        def on_change(*a):
+            # debounce: refilter once typing pauses instead of on every keystroke
+            if pending[0] is not None:
+                tab.after_cancel(pending[0])
+            pending[0] = tab.after(FILTER_DEBOUNCE_MS, apply_filter)
 
-        return container, inner, canvas
+        search_var.trace_add('write', on_change)
 
     def build_ui(self):
         top_frame = tk.Frame(self.root)
@@ -469,6 +990,9 @@ class TkClient:
         news_btn.config(menu=news_menu)
 
         tk.Button(top_frame, text='Open All', command=self.open_all, bg='red', fg='yellow').pack(side='left', padx=10)
+        tk.Button(top_frame, text='Fetch Snapshots', command=self.fetch_snapshots).pack(side='left', padx=5)
+        tk.Button(top_frame, text='Snapshots...', command=self.show_snapshots).pack(side='left', padx=5)
+        tk.Label(top_frame, textvariable=self.status_var).pack(side='left', padx=5)
         tk.Button(top_frame, text='Clear All', command=self.clear_all_rows).pack(side='left', padx=5)
 
         tk.Label(top_frame, text='Date:').pack(side='left', padx=(8, 2))
@@ -478,14 +1002,13 @@ class TkClient:
 
         pw = tk.PanedWindow(self.root, orient='horizontal')
         pw.pack(fill='both', expand=True)
+        self.panes = pw
 
         right_container = tk.Frame(pw)
         pw.add(right_container)
 
-        # fetch sources and build news panel
-        ok = self.fetch_sources()
-        news_panel = self.build_news_sources_panel(pw) if ok else tk.Frame(pw)
-        pw.add(news_panel)
+        # show the cached catalog now; fetch_sources swaps in a newer one if the server has it
+        self.rebuild_news_panel()
 
         container = tk.Frame(right_container)
         container.pack(fill='both', expand=True)
@@ -501,13 +1024,17 @@ class TkClient:
 
         self.ensure_rows(6)
         self.refresh_sessions_combobox()
+        self.fetch_sources()
 
     def run(self):
         try:
             self.root.state('zoomed')
         except Exception:
             pass
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            close_db()
 
 
 if __name__ == '__main__':